@@ -0,0 +1,114 @@
+"""Micro-benchmarks for the WORDLE helper.
+
+The inputs are deterministic: the vocabulary and the first rounds of the WORDLE history, with the results each
+guess would have got worked out from the round's answer. Run it on the same machine at two commits and compare:
+
+    python benchmark.py --output before.json
+    ... check out the other commit ...
+    python benchmark.py --compare before.json
+"""
+import argparse
+import json
+import platform
+import time
+
+import main as wordle
+
+BENCHMARK_FILENAME = "benchmark.json"
+BENCHMARK_ROUNDS = 100
+BENCHMARK_REPEAT = 5
+
+
+def best_time(function, repeat) -> float:
+    """Return the best wall time, in seconds, of a number of calls of a function."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def replay_rounds(solver, rounds) -> int:
+    """Play every guess of every round on a game, returning the total number of words left."""
+    left = 0
+    for guesses, results in rounds:
+        solver.rewind(0)
+        for guess, result in zip(guesses, results):
+            left += solver.apply(guess, result)
+    return left
+
+
+def benchmark(setup_filename, round_limit=BENCHMARK_ROUNDS, repeat=BENCHMARK_REPEAT) -> dict:
+    """Time each phase of the helper on the same inputs, returning the best time for each one."""
+    wordle.apply_setup_values(wordle.read_setup(setup_filename))
+    # build the vocabulary cache first, so every run times loading from it
+    word_list = wordle.Vocabulary(wordle.WORD_FILENAME).words(wordle.WORDLE_LENGTH)
+    WORDLE_list, WORDLE_rounds = wordle.read_WORDLE_list(wordle.WORDLE_FILENAME, wordle.PREVIOUS_WORDLE_FILENAME)
+    word_set = set(word_list)
+
+    # the first rounds whose words are all in the vocabulary, with the result of each guess against the answer
+    rounds = []
+    for a_round in WORDLE_rounds:
+        if len(rounds) >= round_limit:
+            break
+        if len(a_round) > 0 and all(word in word_set for word in a_round):
+            answer = a_round[-1]
+            results = [wordle.code_to_result(wordle.feedback_code(guess, answer)) for guess in a_round]
+            rounds.append((a_round, results))
+    solver = wordle.Solver(wordle.WordIndex(word_list), WORDLE_list)
+    # a game that hasn't started, so every word is split
+    start = solver.copy()
+
+    phases = {
+        "load vocabulary": lambda: wordle.Vocabulary(wordle.WORD_FILENAME).words(wordle.WORDLE_LENGTH),
+        "load history": lambda: wordle.read_WORDLE_list(wordle.WORDLE_FILENAME, wordle.PREVIOUS_WORDLE_FILENAME),
+        "build index": lambda: wordle.WordIndex(word_list),
+        "filter": lambda: replay_rounds(solver, rounds),
+        "score": lambda: wordle.score_possibles(word_list, WORDLE_list, wordle.FrequencyModel(WORDLE_list)),
+        "split": start.split,
+        "feedback": lambda: wordle.pattern_row(rounds[0][0][0] if rounds else word_list[0], word_list),
+        "render": lambda: list(wordle.word_lines(word_list)),
+    }
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "words": len(word_list),
+        "rounds": len(rounds),
+        "repeat": repeat,
+        "seconds": {name: best_time(function, repeat) for name, function in phases.items()},
+    }
+
+
+def show_benchmark(results, baseline=None) -> None:
+    """Print the benchmark times, and how they compare with an earlier run if one is given."""
+    print(f"{results['words']:,} words, {results['rounds']:,} rounds, best of {results['repeat']} "
+          f"(Python {results['python']})")
+    for name, seconds in results["seconds"].items():
+        line = f"  {name:<16} {seconds * 1000:10.3f} ms"
+        if baseline is not None and baseline["seconds"].get(name):
+            line += f"  {seconds / baseline['seconds'][name]:6.2f}x"
+        print(line)
+
+
+def parse_arguments(args=None):
+    """Read the command line options."""
+    parser = argparse.ArgumentParser(description="Micro-benchmarks for the WORDLE helper")
+    parser.add_argument("--setup", default=wordle.SETUP_FILENAME, help="setup file to read")
+    parser.add_argument("--rounds", type=int, default=BENCHMARK_ROUNDS, help="how many history rounds to replay")
+    parser.add_argument("--repeat", type=int, default=BENCHMARK_REPEAT, help="runs of each phase (the best is kept)")
+    parser.add_argument("--output", default=BENCHMARK_FILENAME, help="JSON file to write the results to")
+    parser.add_argument("--compare", metavar="FILE", default="", help="earlier results to compare with")
+    return parser.parse_args(args)
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    baseline = None
+    if arguments.compare != "":
+        with open(arguments.compare, wordle.READ_FILE) as f:
+            baseline = json.load(f)
+    results = benchmark(arguments.setup, arguments.rounds, arguments.repeat)
+    show_benchmark(results, baseline)
+    with open(arguments.output, wordle.WRITE_FILE) as f:
+        json.dump(results, f, indent=1)
@@ -4,27 +4,288 @@
 # TODO: allow user to mark words as good/bad (e.g. acceptable to MS WORD or not)
 # fix bug when one letter is found in the correct position, and another position contains the same letter
 
+import argparse
+import array
+import asyncio
+import bz2
+import concurrent.futures
+import contextlib
+import copy
+import cProfile
+import functools
+import glob
+import gzip
+import hashlib
+import heapq
+import http.client
+import io
+import itertools
+import json
+import math
+import mmap
+import multiprocessing
+import operator
+import os
+import pstats
+import random
+import socket
+import socketserver
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter, OrderedDict, namedtuple
+
 # CONSTANTS (almost, some are setup values that can be overridden by setup file entries
 SETUP_FILENAME = "setup.txt"
 WORDLE_LENGTH = 5
 PREVIOUS_WORDLE_FILENAME = "Previous WORDLEs.txt"
 WORDLE_FILENAME = "WORDLEs.txt"
-WORD_FILENAME = "Scrabble Words.txt"
+HISTORY_LENGTH = 5  # the length of the words in the WORDLE files above, other lengths have their own (WORDLEs.6.txt)
+ROUND_LOG_SUFFIX = ".log"  # rounds are appended here, and folded back into the WORDLE file by --compact
+COMPACTING_SUFFIX = ".compacting"  # the round log is set aside under this name while --compact folds it in
+FOLDING_SUFFIX = ".rounds"  # added to the set aside log's name for the marker of how many rounds it is folded onto
+STATS_SUFFIX = ".stats"  # running totals of the rounds, so they don't have to be counted again at startup
+WORD_FILENAME = "Scrabble Words.txt"  # the vocabulary word sources, separated by commas (see read_source)
+ANSWER_FILENAME = ""  # the sources of the words that can be the answer, empty means any vocabulary word can be
+HISTORY_SOURCE = "history"  # a word source that stands for the previous WORDLE words
+VOCABULARY_CACHE_FILENAME = ""  # an empty name means 'first vocabulary file name + CACHE_SUFFIX'
+CACHE_SUFFIX = ".cache"
+DAWG_SUFFIX = ".dawg"  # the vocabulary as a word graph, for pattern queries across all word lengths
+PATTERN_FILENAME = ""  # an empty name means 'vocabulary file name + word length + PATTERN_SUFFIX'
+PATTERN_SUFFIX = ".patterns"
+BOOK_FILENAME = ""  # an empty name means 'vocabulary file name + word length (+ answer source) + BOOK_SUFFIX'
+BOOK_SUFFIX = ".book"
+TREE_FILENAME = ""  # an empty name means 'vocabulary file name + word length (+ answer source) + TREE_SUFFIX'
+TREE_SUFFIX = ".tree"
 LINE_LENGTH = 80
 RIGHT_RIGHT = "."
 RIGHT_WRONG = "V"
 WRONG_WRONG = " "
 CANCEL_WORD = "-"
 RIGHT_WORD = "+"
+# commands that can be entered instead of a guess word
+UNDO_GUESS = "<"  # take back the last guess
+EDIT_RESULT = "="  # followed by a guess number, re-enter the result of that guess
+WHAT_IF = "?"  # try a guess and result out without playing it
+# other spellings of result letters accepted from JSON clients (green, yellow, black/grey)
+RESULT_ALIASES = {"G": RIGHT_RIGHT, "Y": RIGHT_WRONG, "B": WRONG_WRONG, "_": WRONG_WRONG}
 READ_FILE = "r"
 WRITE_FILE = "w"
+READ_BINARY = "rb"
+WRITE_BINARY = "wb"
 ALPHABET = "abcdefghijklmnopqrstuvwxyz".upper()
 LETTER_MULTIPLIER = 10
 FIRST_MULTIPLIER = 20
 LAST_MULTIPLIER = 15
+PLURAL_PENALTY = 1.0  # taken off the score of possible plurals and past-tense verbs
+DUPLICATE_PENALTY = 0.5  # taken off the score for each letter of a word that is repeated
 RECOMMENDED_WORDS = 20
+STATS_TRIES = 12  # number of bars in the win tries chart
+STATS_VERSION = 1
+FREQUENCY = "FREQUENCY"  # recommend the possible words with the most common letters (score_possibles)
+ENTROPY = "ENTROPY"  # recommend any vocabulary word by the expected information of its result
+MINIMAX = "MINIMAX"  # recommend any vocabulary word by the size of the biggest group of words it can leave
+RECOMMENDER = FREQUENCY
+BOARDS = 1  # boards played at once with the same guesses (4 for Quordle, 8 for Octordle)
+BOARD_WORDS_SHOWN = 24  # possible words shown for each board in multi-board rounds
+BOARD_RANK_LIMIT = 2_000_000  # most results worked out to rank a multi-board turn without a pattern matrix
+WORDLE_TRIES = 6  # a game that takes more tries than this counts as a failure
+SIMULATION_TRY_LIMIT = 12  # a simulated game is abandoned after this many tries
+SIMULATION_FILENAME = "simulation.json"
+TUNING_FILENAME = "Tuned setup.txt"  # the setup file a tuning sweep writes, with the best weights it found
+TUNING_SAMPLES = 60  # weight sets tried by a random tuning sweep
+TUNING_SHOWN = 10  # best weight sets shown at the end of a tuning sweep
+# the values a tuning sweep tries for each scoring weight, in ScoreWeights order (a grid sweep tries every mix)
+TUNING_GRID = (("Letter multiplier", range(0, 31, 5)),
+               ("First multiplier", range(0, 41, 5)),
+               ("Last multiplier", range(0, 31, 5)),
+               ("Plural penalty", (0.0, 0.5, 1.0, 1.5, 2.0)),
+               ("Duplicate penalty", (0.0, 0.25, 0.5, 1.0)))
+SERVICE_HOST = "127.0.0.1"  # the suggestion service only listens locally
+SERVICE_PORT = 8765
+SERVICE_CACHE_SIZE = 4096  # responses the suggestion service remembers
+SERVICE_CANDIDATES = 100  # most candidate words in a suggestion service response (unless the request asks)
+SERVICE_TIMEOUT = 60  # seconds a service client waits for a response
+PROFILE_LINES = 25  # how many functions/allocations --cprofile and --tracemalloc report
+OPENERS = ""  # opening words for the opening book, an empty list means the most used openers in the history
+BOOK_OPENERS = 3  # how many of the most used openers go in the opening book by default
+BOOK_DEPTH = 2  # how many guesses (including the opener) the opening book covers
+EXPECTED = "EXPECTED"  # strategy tree with the fewest guesses on average
+WORST = "WORST"  # strategy tree with the fewest guesses in the worst case (then on average)
+TREE_OBJECTIVE = EXPECTED
+TREE_ANSWERS = "vocabulary"  # the answers the strategy tree covers: vocabulary (the words that can be the answer),
+# unused (those that aren't previous WORDLE words) or history (the previous WORDLE words)
+TREE_OPENER = ""  # opening word of the strategy tree, an empty opener means try the TREE_OPENERS best openers
+TREE_OPENERS = 5
+TREE_BEAM = 12  # guesses tried at each node of the strategy tree (the ones with the most expected information)
+TREE_PROBES = 300  # vocabulary words (besides the answers themselves) that the strategy tree may guess anywhere
+TREE_SUBSET_PROBES = 30  # more vocabulary words tried for each set of answers: those with the most letters that only
+# some of the answers have (the global probes can't tell apart endings like ?ILLS)
 WORD_LIST_INDENT = "    "
+WORDS_SHOWN = 1000  # most words shown in a list of possible words (the rest are counted), 0 shows them all
+PAGE_LINES = 0  # lines shown at a time on a terminal before waiting for Enter, 0 shows everything at once
 COMMA = ","
+# flags kept for each vocabulary word
+WORD_ANSWER = 1  # the word can be the answer (the other words can only be guessed)
+# vocabulary cache layout: header, then one entry per word source and one per word length, then for each word length
+# fixed-width ASCII records followed by a flags byte per word
+CACHE_MAGIC = b"WGVC"
+CACHE_VERSION = 2
+CACHE_HEADER = struct.Struct("<4sHHH32s")  # magic, version, group count, source count, sha256 of the source names
+CACHE_SOURCE = struct.Struct("<qq32s")  # source size, source mtime (ns), source sha256
+CACHE_GROUP = struct.Struct("<HIII")  # word length, word count, offset of the first record, offset of the flags
+# vocabulary word graph layout: header, then the first edge of each node (and the end of the last node's edges),
+# whether each node ends a word, and the letter and target node of each edge
+DAWG_MAGIC = b"WGDW"
+DAWG_VERSION = 1
+DAWG_HEADER = struct.Struct("<4sHqq32sIII")  # magic, version, source size, mtime (ns), sha256, words, nodes, edges
+BIT_FLAGS = bytes.maketrans(b"01", b"\x00\x01")  # turns a string of binary digits into compress() selectors
+# a result is coded as a base 3 number, one digit per letter (first letter lowest): 0 wrong, 1 wrong place, 2 right
+PATTERN_WEIGHTS = tuple(3 ** j for j in range(16))
+PATTERN_DIGITS = {WRONG_WRONG: 0, RIGHT_WRONG: 1, RIGHT_RIGHT: 2}
+# pattern matrix layout: header, then one code per (probe word, answer word) pair, a row per probe word
+# (a code takes one byte for words of up to 5 letters, and two or four bytes for longer words)
+PATTERN_MAGIC = b"WGPM"
+PATTERN_VERSION = 1
+PATTERN_HEADER = struct.Struct("<4sHHII32s")  # magic, version, word length, probe count, answer count, word list sha256
+PATTERN_ROWS_PER_TASK = 64
+# opening book layout: header, then one entry per known sequence of guesses and results:
+# guess count, (word, pattern code) per guess, scored word count, (word, score) per word,
+# ranked word count, (word, expected bits, worst case) per word -- words are vocabulary positions
+BOOK_MAGIC = b"WGOB"
+BOOK_VERSION = 2
+BOOK_HEADER = struct.Struct("<4sH32sII")  # magic, version, key (vocabulary/history/weights hash), words, entries
+BOOK_COUNT = struct.Struct("<B")
+BOOK_GUESS = struct.Struct("<HH")
+BOOK_SCORED = struct.Struct("<Hf")
+BOOK_RANKED = struct.Struct("<HfI")
+# strategy tree layout: header, then the nodes in depth-first order, each one followed by its children:
+# (guess, child count) per node, with the pattern code that leads to each child in front of it
+TREE_MAGIC = b"WGDT"
+TREE_VERSION = 1
+TREE_HEADER = struct.Struct("<4sH32sIIIIH")  # magic, version, vocabulary hash, words, answers, nodes, guesses, depth
+TREE_NODE = struct.Struct("<HH")
+TREE_CODE = struct.Struct("<H")
+
+
+class Metrics:
+    """Wall time and call counts for each phase of the program (loading, filtering, scoring, rendering, etc.).
+        nothing is recorded unless enabled, so the phase timers cost a single check when metrics are off"""
+
+    def __init__(self):
+        self.enabled = False
+        self.seconds = {}
+        self.calls = {}
+        # milestones, in seconds since the program started (e.g. time to the first prompt)
+        self.started = time.perf_counter()
+        self.marks = {}
+        # phases can run on background threads too
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds) -> None:
+        """Add one call of a phase that took this many seconds."""
+        with self.lock:
+            self.seconds[name] = self.seconds.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def mark(self, name) -> None:
+        """Note the time a milestone was first reached (when metrics are enabled)."""
+        if self.enabled and name not in self.marks:
+            self.marks[name] = time.perf_counter() - self.started
+
+    @contextlib.contextmanager
+    def phase(self, name):
+        """Time the body of a with statement as one call of a phase."""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def to_dict(self) -> dict:
+        """Return the metrics in a form that can be saved as JSON."""
+        return {"phases": {name: {"seconds": self.seconds[name], "calls": self.calls[name]} for name in sorted(self.seconds)},
+                "marks": {name: self.marks[name] for name in sorted(self.marks)}}
+
+    def to_prometheus(self) -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = ["# HELP wordle_phase_seconds_total Wall time spent in each phase.",
+                 "# TYPE wordle_phase_seconds_total counter"]
+        lines += [f'wordle_phase_seconds_total{{phase="{name}"}} {self.seconds[name]:.6f}' for name in sorted(self.seconds)]
+        lines += ["# HELP wordle_phase_calls_total Number of times each phase ran.",
+                  "# TYPE wordle_phase_calls_total counter"]
+        lines += [f'wordle_phase_calls_total{{phase="{name}"}} {self.calls[name]}' for name in sorted(self.calls)]
+        for name in sorted(self.marks):
+            lines += [f"# HELP wordle_{name}_seconds Seconds from the start of the program to {name.replace('_', ' ')}.",
+                      f"# TYPE wordle_{name}_seconds gauge",
+                      f"wordle_{name}_seconds {self.marks[name]:.6f}"]
+        return "\n".join(lines) + "\n"
+
+    def report(self) -> str:
+        """Return a table of the phases, slowest first."""
+        lines = [f"{'phase':<16} {'calls':>8} {'total ms':>12} {'mean ms':>10}"]
+        for name in sorted(self.seconds, key=self.seconds.get, reverse=True):
+            seconds, calls = self.seconds[name], self.calls[name]
+            lines.append(f"{name:<16} {calls:8,} {seconds * 1000:12.2f} {seconds * 1000 / calls:10.3f}")
+        lines += [f"{name.replace('_', ' ')}: {self.marks[name] * 1000:,.1f} ms" for name in sorted(self.marks)]
+        return "\n".join(lines)
+
+
+METRICS = Metrics()
+
+
+def timed(name):
+    """Decorator that records each call of a function as one call of a phase (when metrics are enabled)."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not METRICS.enabled:
+                return function(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                METRICS.record(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class Deferred:
+    """A value worked out on a background thread, which starts straight away so the work overlaps whatever comes next.
+        get() waits for the value (and raises whatever went wrong working it out)"""
+
+    def __init__(self, function, *args):
+        self.value = None
+        self.error = None
+        self.thread = threading.Thread(target=self.run, args=(function,) + args, daemon=True)
+        self.thread.start()
+
+    def run(self, function, *args) -> None:
+        try:
+            self.value = function(*args)
+        except BaseException as e:
+            self.error = e
+
+    def ready(self) -> bool:
+        """Has the value been worked out?"""
+        return not self.thread.is_alive()
+
+    def get(self):
+        """Return the value, waiting for it if need be."""
+        self.thread.join()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+def resolve(value):
+    """Return a value, waiting for it first if it is Deferred."""
+    return value.get() if isinstance(value, Deferred) else value
 
 
 def apply_one_setup(setup, name, def_value) -> str:
@@ -42,23 +303,81 @@ def apply_one_setup_int(setup, name, def_value) -> int:
         return def_value
 
 
+def apply_one_setup_float(setup, name, def_value) -> float:
+    """Get a number value from the setup dictionary or use the default value, if setup value is an invalid number."""
+    value = apply_one_setup(setup, name, def_value)
+    try:
+        return float(value)
+    except ValueError:
+        return def_value
+
+
 def apply_setup_values(setup) -> None:
     """Set select GLOBAL values from name/value pairs in the setup dictionary, or keep default values."""
     global PREVIOUS_WORDLE_FILENAME
     global WORDLE_FILENAME
     global WORD_FILENAME
+    global ANSWER_FILENAME
+    global VOCABULARY_CACHE_FILENAME
+    global WORDLE_LENGTH
     global LINE_LENGTH
+    global WORDS_SHOWN
+    global PAGE_LINES
     global LETTER_MULTIPLIER
     global FIRST_MULTIPLIER
     global LAST_MULTIPLIER
+    global PLURAL_PENALTY
+    global DUPLICATE_PENALTY
+    global RECOMMENDER
+    global PATTERN_FILENAME
+    global BOOK_FILENAME
+    global OPENERS
+    global BOOK_DEPTH
+    global BOARDS
+    global TREE_FILENAME
+    global TREE_ANSWERS
+    global TREE_OBJECTIVE
+    global TREE_OPENER
+    global TREE_BEAM
+    global SERVICE_PORT
+    global SERVICE_CACHE_SIZE
 
     PREVIOUS_WORDLE_FILENAME = apply_one_setup(setup, "Previous", PREVIOUS_WORDLE_FILENAME)
     WORDLE_FILENAME = apply_one_setup(setup, "Current", WORDLE_FILENAME)
     WORD_FILENAME = apply_one_setup(setup, "Vocabulary", WORD_FILENAME)
+    ANSWER_FILENAME = apply_one_setup(setup, "Answers", ANSWER_FILENAME)
+    VOCABULARY_CACHE_FILENAME = apply_one_setup(setup, "Vocabulary cache", VOCABULARY_CACHE_FILENAME)
+    WORDLE_LENGTH = apply_one_setup_int(setup, "Word length", WORDLE_LENGTH)
     LINE_LENGTH = apply_one_setup_int(setup, "Line length", LINE_LENGTH)
+    WORDS_SHOWN = max(0, apply_one_setup_int(setup, "Words shown", WORDS_SHOWN))
+    PAGE_LINES = max(0, apply_one_setup_int(setup, "Page lines", PAGE_LINES))
     LETTER_MULTIPLIER = apply_one_setup_int(setup, "Letter multiplier", LETTER_MULTIPLIER)
     FIRST_MULTIPLIER = apply_one_setup_int(setup, "First multiplier", FIRST_MULTIPLIER)
     LAST_MULTIPLIER = apply_one_setup_int(setup, "Last multiplier", LAST_MULTIPLIER)
+    PLURAL_PENALTY = apply_one_setup_float(setup, "Plural penalty", PLURAL_PENALTY)
+    DUPLICATE_PENALTY = apply_one_setup_float(setup, "Duplicate penalty", DUPLICATE_PENALTY)
+    RECOMMENDER = apply_one_setup(setup, "Recommender", RECOMMENDER).upper()
+    if RECOMMENDER not in (FREQUENCY, ENTROPY, MINIMAX):
+        print(f"Unknown recommender '{RECOMMENDER}' in setup file, using {FREQUENCY.lower()}")
+        RECOMMENDER = FREQUENCY
+    PATTERN_FILENAME = apply_one_setup(setup, "Pattern matrix", PATTERN_FILENAME)
+    BOOK_FILENAME = apply_one_setup(setup, "Opening book", BOOK_FILENAME)
+    OPENERS = apply_one_setup(setup, "Openers", OPENERS)
+    BOOK_DEPTH = apply_one_setup_int(setup, "Book depth", BOOK_DEPTH)
+    BOARDS = max(1, apply_one_setup_int(setup, "Boards", BOARDS))
+    TREE_FILENAME = apply_one_setup(setup, "Strategy tree", TREE_FILENAME)
+    TREE_ANSWERS = apply_one_setup(setup, "Tree answers", TREE_ANSWERS).lower()
+    if TREE_ANSWERS not in ("vocabulary", "unused", "history"):
+        print(f"Unknown tree answers '{TREE_ANSWERS}' in setup file, using vocabulary")
+        TREE_ANSWERS = "vocabulary"
+    TREE_OBJECTIVE = apply_one_setup(setup, "Tree objective", TREE_OBJECTIVE).upper()
+    if TREE_OBJECTIVE not in (EXPECTED, WORST):
+        print(f"Unknown tree objective '{TREE_OBJECTIVE}' in setup file, using {EXPECTED.lower()}")
+        TREE_OBJECTIVE = EXPECTED
+    TREE_OPENER = apply_one_setup(setup, "Tree opener", TREE_OPENER).upper()
+    TREE_BEAM = max(1, apply_one_setup_int(setup, "Tree beam", TREE_BEAM))
+    SERVICE_PORT = apply_one_setup_int(setup, "Service port", SERVICE_PORT)
+    SERVICE_CACHE_SIZE = max(1, apply_one_setup_int(setup, "Service cache", SERVICE_CACHE_SIZE))
 
 
 def read_setup(setup_filename):
@@ -93,8 +412,8 @@ def read_setup(setup_filename):
     return setup
 
 
-def read_WORDLE_list(filename, old_filename) -> tuple:
-    """Read history of WORDLE guesses and successful words-list of previous WORDLE words for hinting analysis."""
+def read_WORDLE_rounds(filename, old_filename) -> list:
+    """Read the rounds in the WORDLE file, or in the old style WORDLE file if that is all there is (not the logs)."""
     wordles_all = []
     # if there is a current WORDLE list, use that
     try:
@@ -108,11 +427,61 @@ def read_WORDLE_list(filename, old_filename) -> tuple:
         except FileNotFoundError:
             # couldn't find either a current or old WORDLE list file, carry on without
             pass
+    return wordles_all
+
+
+@timed("load_history")
+def read_WORDLE_list(filename, old_filename) -> tuple:
+    """Read history of WORDLE guesses and successful words-list of previous WORDLE words for hinting analysis."""
+    wordles_all = read_WORDLE_rounds(filename, old_filename)
+    # add the rounds played since the WORDLE file was last compacted (a log set aside by a compaction that didn't
+    # finish comes first, unless the compacted file already has its rounds)
+    wordles_all = fold_logged_rounds(wordles_all, read_logged_rounds(compacting_filename_for(filename)),
+                                     read_folding_marker(filename))
+    wordles_all.extend(read_logged_rounds(log_filename_for(filename)))
     # create the successful WORDLE list from the WORDLE attempts list
     wordles = [entry[-1] for entry in wordles_all]
     return wordles, wordles_all
 
 
+def read_logged_rounds(log_filename) -> list:
+    """Read the rounds in a round log (an empty list if there is no log)."""
+    try:
+        with open(log_filename, READ_FILE) as f:
+            return [line.upper().split() for line in f if len(line.strip()) > 0]
+    except FileNotFoundError:
+        return []
+
+
+def fold_logged_rounds(rounds, logged, base=-1) -> list:
+    """Return the rounds with the logged rounds after them, or as they are if the log has already been folded in.
+        base is the number of rounds the WORDLE file had when a compaction set the log aside (-1 if not known), only
+    a compaction changes the WORDLE file, so more rounds than that means it wrote the file but stopped before it
+    removed the log"""
+    if len(logged) == 0 or 0 <= base < len(rounds):
+        return rounds
+    return rounds + logged
+
+
+def read_folding_marker(filename) -> int:
+    """Return the number of rounds the WORDLE file had when its round log was set aside (-1 if there is no marker)."""
+    try:
+        with open(folding_filename_for(filename), READ_FILE) as f:
+            return int(f.read())
+    except (OSError, ValueError):
+        return -1
+
+
+def write_folding_marker(filename, base) -> None:
+    """Record the number of rounds the WORDLE file has before its round log is set aside."""
+    temp_filename = folding_filename_for(filename) + ".tmp"
+    with open(temp_filename, WRITE_FILE) as f:
+        f.write(f"{base}\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_filename, folding_filename_for(filename))
+
+
 def save_WORDLE_file(filename, rounds):
     """Write all the previous rounds of WORDLE, plus the current round, to the WORDLE file."""
     with open(filename, WRITE_FILE) as f:
@@ -120,24 +489,307 @@ def save_WORDLE_file(filename, rounds):
             f.write(f"{' '.join(a_round)}\n")
 
 
-def read_word_list(filename, word_length=0):
-    """Read the list of possible words, but filter it for only the words of the right length."""
-    with open(filename, READ_FILE) as f:
-        word_list = [word.strip().upper() for word in f if word_length == 0 or len(word.strip()) == word_length]
-    return word_list
+def log_filename_for(filename) -> str:
+    """Return the name of the round log that goes with a WORDLE file."""
+    return filename + ROUND_LOG_SUFFIX
+
+
+def compacting_filename_for(filename) -> str:
+    """Return the name the round log of a WORDLE file is set aside under while it is being compacted."""
+    return log_filename_for(filename) + COMPACTING_SUFFIX
+
+
+def folding_filename_for(filename) -> str:
+    """Return the name of the marker that goes with the set aside round log of a WORDLE file."""
+    return compacting_filename_for(filename) + FOLDING_SUFFIX
+
+
+def stats_filename_for(filename) -> str:
+    """Return the name of the stats sidecar that goes with a WORDLE file."""
+    return filename + STATS_SUFFIX
+
+
+def history_signature(filename) -> list:
+    """Return what the stats sidecar records about the WORDLE file and round log it was counted from."""
+    try:
+        size, mtime = file_signature(filename)
+    except OSError:
+        size, mtime = -1, 0
+    try:
+        log_size = os.path.getsize(log_filename_for(filename))
+    except OSError:
+        log_size = 0
+    return [size, mtime, log_size]
+
+
+def append_WORDLE_round(filename, a_round, stats=None) -> None:
+    """Save one more round by appending it to the round log with a single write, and update the stats sidecar."""
+    fd = os.open(log_filename_for(filename), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, f"{' '.join(a_round)}\n".encode("utf-8"))
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+    if stats is not None:
+        stats.add_round(a_round)
+        save_round_stats(filename, stats)
+
+
+def compact_WORDLE_file(filename, old_filename) -> int:
+    """Fold the round log back into the plain WORDLE file (importing an old style WORDLE file if that is all there is).
+        the number of rounds in the WORDLE file is recorded and the log set aside before the WORDLE file is replaced,
+    and the log removed after, so a crash at any point leaves every round read exactly once (rounds logged meanwhile go
+    to a new log, which is kept)
+        returns the number of rounds in the compacted file"""
+    log_filename = log_filename_for(filename)
+    compacting_filename = compacting_filename_for(filename)
+    rounds = read_WORDLE_rounds(filename, old_filename)
+    # a log already set aside by a compaction that didn't finish is folded in first, then the current log
+    finishing = os.path.exists(compacting_filename)
+    if not finishing and os.path.exists(log_filename):
+        write_folding_marker(filename, len(rounds))
+        os.replace(log_filename, compacting_filename)
+    rounds = fold_logged_rounds(rounds, read_logged_rounds(compacting_filename), read_folding_marker(filename))
+    temp_filename = filename + ".tmp"
+    save_WORDLE_file(temp_filename, rounds)
+    os.replace(temp_filename, filename)
+    for done_filename in (compacting_filename, folding_filename_for(filename)):
+        try:
+            os.remove(done_filename)
+        except FileNotFoundError:
+            pass
+    if finishing and os.path.exists(log_filename):
+        return compact_WORDLE_file(filename, old_filename)
+    save_round_stats(filename, RoundStats(rounds + read_logged_rounds(log_filename)))
+    return len(rounds)
+
+
+def file_signature(filename) -> tuple:
+    """Return the (size, modification time in ns) pair used to tell whether a file has changed."""
+    status = os.stat(filename)
+    return status.st_size, status.st_mtime_ns
+
+
+def file_hash(filename) -> bytes:
+    """Return the SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(filename, READ_BINARY) as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.digest()
+
+
+def source_list(sources) -> list:
+    """Split a list of word sources (as written in the setup file, separated by commas) into names."""
+    return [source.strip() for source in sources.split(COMMA) if source.strip() != ""]
+
+
+def vocabulary_name(filename="") -> str:
+    """Return the name the vocabulary's other files are named after: its first word source."""
+    filename = filename or WORD_FILENAME
+    sources = source_list(filename)
+    return sources[0] if len(sources) > 0 else filename
+
+
+def history_filenames(word_len=0) -> tuple:
+    """Return the names of the (WORDLE, previous WORDLE) files that hold the history of words of a length (default
+    WORDLE_LENGTH): the setup's files for HISTORY_LENGTH, and for any other length the same names with the length
+    before the extension, so rounds of different lengths never share a history or its stats."""
+    word_len = word_len or WORDLE_LENGTH
+    if word_len == HISTORY_LENGTH:
+        return WORDLE_FILENAME, PREVIOUS_WORDLE_FILENAME
+    return tuple(f"{root}.{word_len}{ext}" for root, ext in map(os.path.splitext,
+                                                                (WORDLE_FILENAME, PREVIOUS_WORDLE_FILENAME)))
+
+
+def history_lengths() -> list:
+    """Return the word lengths that have a history: HISTORY_LENGTH and every length with a WORDLE file or round log."""
+    root, ext = os.path.splitext(WORDLE_FILENAME)
+    lengths = {HISTORY_LENGTH}
+    for filename in glob.glob(f"{glob.escape(root)}.*{glob.escape(ext)}*"):
+        length = filename[len(root) + 1:].split(".", 1)[0]
+        if length.isdigit():
+            lengths.add(int(length))
+    return sorted(lengths)
+
+
+def history_files() -> list:
+    """Return the files the previous WORDLE words of every length are read from (the ones that exist)."""
+    filenames = []
+    for length in history_lengths():
+        filename, old_filename = history_filenames(length)
+        filenames += [filename, compacting_filename_for(filename), log_filename_for(filename), old_filename]
+    return [filename for filename in filenames if os.path.exists(filename)]
+
+
+def source_signature(source) -> tuple:
+    """Return the (size, modification time in ns) pair used to tell whether a word source has changed."""
+    if source.lower() == HISTORY_SOURCE:
+        signatures = [file_signature(filename) for filename in history_files()]
+        return sum(size for size, _ in signatures), max((mtime for _, mtime in signatures), default=0)
+    return file_signature(source)
+
+
+def source_hash(source) -> bytes:
+    """Return the SHA-256 digest of a word source's contents."""
+    if source.lower() == HISTORY_SOURCE:
+        digest = hashlib.sha256()
+        for filename in history_files():
+            digest.update(file_hash(filename))
+        return digest.digest()
+    return file_hash(source)
+
+
+def source_matches(source, size, mtime, digest) -> bool:
+    """Is a file (or word source) still the one a cache was built from?
+        a matching size and time stamp is trusted, otherwise only a matching hash will do"""
+    signature = source_signature(source)
+    return (size, mtime) == signature or (size == signature[0] and digest == source_hash(source))
+
+
+def read_source(source):
+    """Return an iterator over the words of a word source: a plain text file, a gzip (.gz) or bzip2 (.bz2) compressed
+    one (words separated by white space), or 'history' for the previous WORDLE words."""
+    if source.lower() == HISTORY_SOURCE:
+        histories = (read_WORDLE_list(*history_filenames(length))[0] for length in history_lengths())
+        return itertools.chain.from_iterable(histories)
+    if source.lower().endswith(".gz"):
+        f = gzip.open(source, "rt", encoding="utf-8")
+    elif source.lower().endswith(".bz2"):
+        f = bz2.open(source, "rt", encoding="utf-8")
+    else:
+        f = open(source, READ_FILE)
+
+    def stream():
+        with f:
+            yield from itertools.chain.from_iterable(map(str.split, map(str.upper, f)))
+    return stream()
+
+
+def sources_digest(sources, answer_sources) -> bytes:
+    """Return the hash of the names of the word sources, which a cache is only good for."""
+    names = [f"vocabulary:{source}" for source in sources] + [f"answers:{source}" for source in answer_sources]
+    return hashlib.sha256("\n".join(names).encode("utf-8")).digest()
+
+
+def cache_filename_for(filename) -> str:
+    """Return the name of the vocabulary cache file that goes with the vocabulary word sources."""
+    return VOCABULARY_CACHE_FILENAME if VOCABULARY_CACHE_FILENAME != "" else vocabulary_name(filename) + CACHE_SUFFIX
+
+
+def build_vocabulary_cache(sources, answer_sources, cache_filename) -> tuple:
+    """Stream the word sources once into one store of words, without duplicates, grouped by word length and with the
+    flags of each word, and write it to the cache file as fixed-width records.
+        every word of the answer sources can be the answer (and be guessed), the other words are probes, and without
+        answer sources every word can be the answer
+        returns ({word length: list of words}, {word length: flags of the words})"""
+    # group the words by length, keeping the order they first come in, and put together the flags each source gives
+    store = {}
+    for source, source_flags in [(source, 0) for source in sources] + \
+                                [(source, WORD_ANSWER) for source in answer_sources]:
+        added = dict.fromkeys(read_source(source), source_flags)
+        # a word that is already in the store keeps its place and gets the flags of both sources
+        for word in added.keys() & store.keys():
+            added[word] |= store[word]
+        store.update(added)
+    groups = {}
+    flags = {}
+    for word, word_flags in store.items():
+        if len(word) not in groups:
+            groups[len(word)], flags[len(word)] = [], bytearray()
+        groups[len(word)].append(word)
+        flags[len(word)].append(word_flags)
+    # without answer sources every word can be the answer
+    if len(answer_sources) == 0:
+        flags = {length: bytearray([WORD_ANSWER]) * len(word_flags) for length, word_flags in flags.items()}
+
+    # the records start right after the header, the source table and the group table
+    lengths = sorted(groups)
+    all_sources = sources + answer_sources
+    offset = CACHE_HEADER.size + CACHE_SOURCE.size * len(all_sources) + CACHE_GROUP.size * len(lengths)
+    group_table = []
+    for length in lengths:
+        count = len(groups[length])
+        group_table.append(CACHE_GROUP.pack(length, count, offset, offset + length * count))
+        offset += (length + 1) * count
+    try:
+        header = CACHE_HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(lengths), len(all_sources),
+                                   sources_digest(sources, answer_sources))
+        header += b"".join(CACHE_SOURCE.pack(*source_signature(source), source_hash(source))
+                           for source in all_sources)
+        # write to a temporary file and rename it, so a half-written cache is never picked up
+        temp_filename = cache_filename + ".tmp"
+        with open(temp_filename, WRITE_BINARY) as f:
+            f.write(header)
+            f.write(b"".join(group_table))
+            for length in lengths:
+                f.write("".join(groups[length]).encode("ascii"))
+                f.write(flags[length])
+        os.replace(temp_filename, cache_filename)
+    except (OSError, UnicodeEncodeError):
+        # can't write the cache, the word sources will just be read again next time
+        pass
+    return groups, {length: bytes(word_flags) for length, word_flags in flags.items()}
+
+
+def open_vocabulary_cache(sources, answer_sources, cache_filename):
+    """Memory-map the vocabulary cache and read its table of word-length groups.
+        returns (memory map, {word length: (word count, offset of the first record, offset of the flags)}), or None if
+        there is no usable cache or any of the word sources have changed since it was built"""
+    try:
+        with open(cache_filename, READ_BINARY) as f:
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        # missing or empty cache
+        return None
+    try:
+        magic, version, group_count, source_count, digest = CACHE_HEADER.unpack_from(mm, 0)
+        all_sources = sources + answer_sources
+        if magic == CACHE_MAGIC and version == CACHE_VERSION and source_count == len(all_sources) and \
+                digest == sources_digest(sources, answer_sources) and \
+                all(source_matches(source, *CACHE_SOURCE.unpack_from(mm, CACHE_HEADER.size + i * CACHE_SOURCE.size))
+                    for i, source in enumerate(all_sources)):
+            groups = {}
+            table = CACHE_HEADER.size + CACHE_SOURCE.size * source_count
+            for i in range(group_count):
+                length, count, offset, flags_offset = CACHE_GROUP.unpack_from(mm, table + i * CACHE_GROUP.size)
+                groups[length] = (count, offset, flags_offset)
+            return mm, groups
+    except (OSError, struct.error):
+        # damaged cache, or a word source has gone
+        pass
+    mm.close()
+    return None
+
 
+def cached_words(mm, length, count, offset) -> list:
+    """Return one word-length group of the memory-mapped vocabulary cache as a list of words."""
+    records = mm[offset:offset + length * count].decode("ascii")
+    return [records[j:j + length] for j in range(0, len(records), length)]
 
-def get_guess(word_list, WORDLE_list) -> str:
-    """Ask for the next word guess, allow user to change mind if word is not in vocab or previously used."""
+
+def cached_flags(mm, count, flags_offset) -> bytes:
+    """Return the flags of the words of one word-length group of the memory-mapped vocabulary cache."""
+    return mm[flags_offset:flags_offset + count]
+
+
+def get_guess(word_list, WORDLE_list, commands=False) -> str:
+    """Ask for the next word guess, allow user to change mind if word is not in vocab or previously used.
+        with commands=True an undo, edit or what-if command is returned as entered instead of a word
+        the word list and WORDLE list may be Deferred, they are only waited for once a word has been entered"""
     while True:
         # get the word for this guess and condition it (remove white space and make uppercase)
         print()
+        METRICS.mark("first_prompt")
         guess = input("Enter your guess word: ").strip().upper()
         print()
         # is the 'word' empty?
         if guess == "":
             print("Nothing entered, please try again")
             continue
+        # is it a command rather than a word?
+        if commands and guess[0] in (UNDO_GUESS, EDIT_RESULT, WHAT_IF):
+            return guess
         # is the 'word' all letters?
         if not guess.isalpha():
             print("Invalid guess, must be all alpha characters")
@@ -147,13 +799,13 @@ def get_guess(word_list, WORDLE_list) -> str:
             print(f"Invalid guess, must be {WORDLE_LENGTH} letters in length")
             continue
         # is the word in the valid vocabulary list?
-        if not (guess in word_list):
+        if not (guess in resolve(word_list)):
             answer = input(f"Your guess, {guess}, is not in the vocabulary list, are you sure you want to use it? ").\
                 strip().upper()
             if len(answer) < 1 or answer[0] != "Y":
                 continue
         # has this word already been a previous WORDLE word?
-        if guess in WORDLE_list:
+        if guess in resolve(WORDLE_list):
             answer = input(f"Your guess, {guess}, has already been used as a WORDLE word, are you sure you want to use it? ").\
                 strip().upper()
             if len(answer) < 1 or answer[0] != "Y":
@@ -179,7 +831,7 @@ def get_result(guess):
         print(guess)
         result = input().upper()
         if len(result) > WORDLE_LENGTH:
-            result = result[:5]
+            result = result[:WORDLE_LENGTH]
         while len(result) < WORDLE_LENGTH:
             result += WRONG_WRONG
         for c in result:
@@ -190,8 +842,411 @@ def get_result(guess):
     return result
 
 
-def reduce_words(possible_words, guess, result, can, at_least, definite):
-    """Reduce the list of remaining possible words based on the latest (and previous) guesses and results."""
+class WordIndex:
+    """Bitset index over a fixed list of words, so a whole word list can be filtered with a few integer operations.
+        bit i of every mask stands for words[i]"""
+
+    @timed("index")
+    def __init__(self, words, word_len=0):
+        self.words = list(words)
+        # the word length defaults to the length of the words
+        word_len = self.word_len = word_len or (len(self.words[0]) if len(self.words) > 0 else WORDLE_LENGTH)
+        self.position = {word: i for i, word in enumerate(self.words)}
+        self.all = (1 << len(self.words)) - 1
+        # build the masks as strings of binary digits (bit 0 first), then convert each one to an int in one go
+        empty = bytearray(b"0" * len(self.words))
+        at_flags = [{lett: empty.copy() for lett in ALPHABET} for _ in range(word_len)]
+        count_flags = {lett: [empty.copy() for _ in range(word_len)] for lett in ALPHABET}
+        for i, word in enumerate(self.words):
+            for j, lett in enumerate(word[:word_len]):
+                if lett in at_flags[j]:
+                    at_flags[j][lett][i] = ord("1")
+                    # the k-th occurrence of a letter puts the word in the 'at least k' mask for that letter
+                    count_flags[lett][word.count(lett, 0, j)][i] = ord("1")
+        # at[j][letter]: words with this letter in position j
+        self.at = [{lett: int(flags[::-1] or b"0", 2) for lett, flags in position.items()} for position in at_flags]
+        # at_least[letter][k]: words with at least k+1 of this letter
+        self.at_least = {lett: [int(flags[::-1] or b"0", 2) for flags in levels] for lett, levels in count_flags.items()}
+
+    def mask_of(self, words) -> int:
+        """Return the mask of the given words (words that are not in the index are ignored)."""
+        flags = bytearray(b"0" * len(self.words))
+        for word in words:
+            i = self.position.get(word)
+            if i is not None:
+                flags[i] = ord("1")
+        return int(flags[::-1] or b"0", 2)
+
+    def iter_words(self, mask):
+        """Return an iterator over the words selected by a mask, in index order."""
+        return itertools.compress(self.words, bin(mask)[:1:-1].encode().translate(BIT_FLAGS))
+
+    def words_of(self, mask) -> list:
+        """Return the words selected by a mask, in index order."""
+        return list(self.iter_words(mask))
+
+    def match(self, can, at_least, definite) -> int:
+        """Return the mask of all words that fit the can/at_least/definite patterns (see update_constraints)."""
+        mask = self.all
+        for j in range(self.word_len):
+            # is the definite letter in the right place?
+            if definite[j] != "":
+                mask &= self.at[j].get(definite[j], 0)
+            # is the letter in this position one of the possibles for the position?
+            allowed = 0
+            for lett in can[j]:
+                allowed |= self.at[j].get(lett, 0)
+            mask &= allowed
+        # does the word contain at least the number of each letter required so far?
+        for lett, count in at_least.items():
+            if count > 0:
+                levels = self.at_least.get(lett, [])
+                mask &= levels[count - 1] if count <= len(levels) else 0
+        return mask
+
+
+class Vocabulary:
+    """All the vocabulary words, partitioned by length and served from the memory-mapped vocabulary cache.
+        the words come from one or more word sources (filename, separated by commas) and each word has flags saying
+        whether it can be the answer (from the answer sources, answer_filename) or is only a probe
+        each length's word list, flags, answers and WordIndexes are built the first time they are asked for, then kept"""
+
+    @timed("load_vocabulary")
+    def __init__(self, filename, answer_filename=None):
+        self.filename = filename
+        self.sources = source_list(filename)
+        self.answer_sources = source_list(ANSWER_FILENAME if answer_filename is None else answer_filename)
+        self.cache_filename = cache_filename_for(filename)
+        self.word_lists = {}
+        self.word_flags = {}
+        self.answer_lists = {}
+        self.indexes = {}
+        self.answer_indexes = {}
+        self.lock = threading.Lock()
+        self.word_graph = None
+        self.mm = None
+        self.groups = {}
+        cache = open_vocabulary_cache(self.sources, self.answer_sources, self.cache_filename)
+        if cache is None:
+            # one pass over the word sources builds the cache, and gives us every word list while we're at it
+            self.word_lists, self.word_flags = build_vocabulary_cache(self.sources, self.answer_sources,
+                                                                      self.cache_filename)
+            self.groups = {length: (len(words), 0, 0) for length, words in self.word_lists.items()}
+        else:
+            self.mm, self.groups = cache
+
+    def lengths(self) -> list:
+        """Return the word lengths in the vocabulary, shortest first."""
+        return sorted(self.groups)
+
+    @timed("load_vocabulary")
+    def words(self, length) -> list:
+        """Return the vocabulary words of a length, in word source order (an empty list if there are none)."""
+        with self.lock:
+            if length not in self.word_lists:
+                if length not in self.groups or self.mm is None:
+                    return []
+                count, offset, _ = self.groups[length]
+                self.word_lists[length] = cached_words(self.mm, length, count, offset)
+            return self.word_lists[length]
+
+    def flags(self, length) -> bytes:
+        """Return the flags (WORD_ANSWER) of the vocabulary words of a length, one per word."""
+        with self.lock:
+            if length not in self.word_flags:
+                if length not in self.groups or self.mm is None:
+                    return b""
+                count, _, flags_offset = self.groups[length]
+                self.word_flags[length] = cached_flags(self.mm, count, flags_offset)
+            return self.word_flags[length]
+
+    def answers(self, length) -> list:
+        """Return the vocabulary words of a length that can be the answer (the word list itself if they all can).
+            the answer sources may only have words of some lengths, any word of another length can be the answer"""
+        words = self.words(length)
+        flags = self.flags(length)
+        with self.lock:
+            if length not in self.answer_lists:
+                answer_flags = [flag & WORD_ANSWER for flag in flags]
+                if all(answer_flags) or not any(answer_flags):
+                    self.answer_lists[length] = words
+                else:
+                    self.answer_lists[length] = [word for word, flag in zip(words, flags) if flag & WORD_ANSWER]
+            return self.answer_lists[length]
+
+    def index(self, length) -> WordIndex:
+        """Return the WordIndex of the vocabulary words of a length."""
+        words = self.words(length)
+        with self.lock:
+            if length not in self.indexes:
+                self.indexes[length] = WordIndex(words, length)
+            return self.indexes[length]
+
+    def answer_index(self, length) -> WordIndex:
+        """Return the WordIndex of the vocabulary words of a length that can be the answer, which is what a game
+        filters (the index of every word if they all can be the answer)"""
+        answers = self.answers(length)
+        if answers is self.words(length):
+            return self.index(length)
+        with self.lock:
+            if length not in self.answer_indexes:
+                self.answer_indexes[length] = WordIndex(answers, length)
+            return self.answer_indexes[length]
+
+    def graph(self):
+        """Return the WordGraph of all the vocabulary words, reading it from its file or building (and saving) it.
+            the graph is kept up to date with the vocabulary cache, which is rebuilt whenever a word source changes"""
+        with self.lock:
+            if self.word_graph is None:
+                graph_filename = vocabulary_name(self.filename) + DAWG_SUFFIX
+                if os.path.exists(self.cache_filename):
+                    self.word_graph = WordGraph.load(graph_filename, self.cache_filename)
+                if self.word_graph is None:
+                    words = []
+                    for length in self.lengths():
+                        words.extend(self.word_lists[length] if length in self.word_lists else
+                                     cached_words(self.mm, length, *self.groups[length][:2]))
+                    self.word_graph = WordGraph.build(words)
+                    if os.path.exists(self.cache_filename):
+                        self.word_graph.save(graph_filename, self.cache_filename)
+            return self.word_graph
+
+
+def load_word_list(filename, word_length=0) -> list:
+    """Return the vocabulary words of a length through the vocabulary cache (see Vocabulary).
+        with word_length=0 the words of every length are returned, shortest first"""
+    vocabulary = Vocabulary(filename)
+    lengths = [word_length] if word_length != 0 else vocabulary.lengths()
+    return [word for length in lengths for word in vocabulary.words(length)]
+
+
+def read_word_list(filename, word_length=0) -> list:
+    """Read the list of possible words, but filter it for only the words of the right length (see load_word_list)."""
+    return load_word_list(filename, word_length)
+
+
+class WordGraph:
+    """The vocabulary as a directed acyclic word graph: a trie whose identical endings are stored only once.
+        node i's edges are first[i] to first[i + 1] - 1, each with a letter (as a byte) and a target node,
+        node 0 is the root and final[i] says whether the path to node i spells a word"""
+
+    def __init__(self, first, final, letters, targets, word_count):
+        self.first = first
+        self.final = final
+        self.letters = letters
+        self.targets = targets
+        self.word_count = word_count
+
+    @classmethod
+    def build(cls, words):
+        """Build the graph of a list of words, merging identical endings as the words are added in sorted order."""
+        finals = [False]
+        edges = [[]]
+        register = {}
+        # the edges of the last word added, whose endings may still be merged: (parent, letter, child)
+        unchecked = []
+
+        def minimize(down_to):
+            # replace each unchecked child by an identical node already in the graph, if there is one
+            while len(unchecked) > down_to:
+                parent, letter, child = unchecked.pop()
+                key = (finals[child], tuple(edges[child]))
+                if key in register:
+                    edges[parent][-1] = (letter, register[key])
+                else:
+                    register[key] = child
+
+        previous = ""
+        words = sorted(set(words))
+        for word in words:
+            common = 0
+            for a, b in zip(word, previous):
+                if a != b:
+                    break
+                common += 1
+            minimize(common)
+            node = unchecked[-1][2] if len(unchecked) > 0 else 0
+            for letter in word[common:]:
+                finals.append(False)
+                edges.append([])
+                child = len(edges) - 1
+                edges[node].append((ord(letter), child))
+                unchecked.append((node, ord(letter), child))
+                node = child
+            finals[node] = True
+            previous = word
+        minimize(0)
+
+        # number the nodes that are left in depth-first order and lay their edges out one after another
+        numbers = {0: 0}
+        order = [0]
+        for node in order:
+            for _, child in edges[node]:
+                if child not in numbers:
+                    numbers[child] = len(order)
+                    order.append(child)
+        first = array.array("I", [0])
+        letters = bytearray()
+        targets = array.array("I")
+        for node in order:
+            for letter, child in edges[node]:
+                letters.append(letter)
+                targets.append(numbers[child])
+            first.append(len(targets))
+        final = bytearray(finals[node] for node in order)
+        return cls(first, final, bytes(letters), targets, len(words))
+
+    def save(self, filename, source_filename) -> None:
+        """Write the graph to a file, marked with the vocabulary file it was built from."""
+        size, mtime = file_signature(source_filename)
+        try:
+            temp_filename = filename + ".tmp"
+            with open(temp_filename, WRITE_BINARY) as f:
+                f.write(DAWG_HEADER.pack(DAWG_MAGIC, DAWG_VERSION, size, mtime, file_hash(source_filename),
+                                         self.word_count, len(self.final), len(self.letters)))
+                f.write(self.first.tobytes())
+                f.write(self.final)
+                f.write(self.letters)
+                f.write(self.targets.tobytes())
+            os.replace(temp_filename, filename)
+        except OSError:
+            # can't write the graph, it will just be built again next time
+            pass
+
+    @classmethod
+    def load(cls, filename, source_filename):
+        """Read a graph from a file, returning None if there is none or the vocabulary file has changed since."""
+        try:
+            with open(filename, READ_BINARY) as f:
+                data = f.read()
+            magic, version, size, mtime, source_hash, word_count, node_count, edge_count = \
+                DAWG_HEADER.unpack_from(data, 0)
+            if magic != DAWG_MAGIC or version != DAWG_VERSION or \
+                    not source_matches(source_filename, size, mtime, source_hash):
+                return None
+            offset = DAWG_HEADER.size
+            first = array.array("I")
+            first.frombytes(data[offset:offset + (node_count + 1) * first.itemsize])
+            offset += (node_count + 1) * first.itemsize
+            final = data[offset:offset + node_count]
+            offset += node_count
+            letters = data[offset:offset + edge_count]
+            offset += edge_count
+            targets = array.array("I")
+            targets.frombytes(data[offset:offset + edge_count * targets.itemsize])
+            if len(final) != node_count or len(letters) != edge_count or len(targets) != edge_count:
+                return None
+            return cls(first, final, letters, targets, word_count)
+        except (OSError, ValueError, struct.error):
+            # missing or damaged graph, or the vocabulary file has gone
+            return None
+
+    def __contains__(self, word) -> bool:
+        node = 0
+        for letter in word.encode("ascii", "replace"):
+            for e in range(self.first[node], self.first[node + 1]):
+                if self.letters[e] == letter:
+                    node = self.targets[e]
+                    break
+            else:
+                return False
+        return self.final[node] == 1
+
+    def search(self, length=0, positions=(), include=None, exclude=""):
+        """Yield the words that fit a pattern, in alphabetical order, pruning whole branches of the graph as it goes.
+            length: the word length (0 for any length, defaults to the number of positions if they are given)
+            positions: the letters allowed in each position ("" allows any letter)
+            include: {letter: minimum count}, exclude: letters that can't be anywhere in the word"""
+        length = length or len(positions)
+        allowed = [frozenset(map(ord, letters)) for letters in positions]
+        excluded = frozenset(map(ord, exclude))
+        need = {ord(letter): count for letter, count in (include or {}).items() if count > 0}
+        first, final, letters, targets = self.first, self.final, self.letters, self.targets
+
+        def walk(node, prefix, missing):
+            depth = len(prefix)
+            if length > 0 and length - depth < missing:
+                # not enough letters left for the letters the word still needs
+                return
+            if final[node] and missing == 0 and (length == 0 or depth == length):
+                yield prefix.decode("ascii")
+            if length > 0 and depth == length:
+                return
+            here = allowed[depth] if depth < len(allowed) else None
+            for e in range(first[node], first[node + 1]):
+                letter = letters[e]
+                if letter in excluded or (here and letter not in here):
+                    continue
+                if need.get(letter, 0) > 0:
+                    need[letter] -= 1
+                    yield from walk(targets[e], prefix + bytes((letter,)), missing - 1)
+                    need[letter] += 1
+                else:
+                    yield from walk(targets[e], prefix + bytes((letter,)), missing)
+
+        yield from walk(0, b"", sum(need.values()))
+
+
+def parse_query(query) -> dict:
+    """Turn a pattern query into WordGraph.search arguments, raising ValueError if it can't be understood.
+        "S?A?E +R -T": a pattern with ? for any letter (or [ABC] for one of some letters, [^ABC] for any other letter),
+        +letters that must be in the word (+RR for at least two), -letters that can't be, and a number for the length"""
+    length = 0
+    positions = []
+    include = {}
+    exclude = ""
+    for token in query.upper().split():
+        if token[0] == "+" and token[1:].isalpha():
+            for letter in token[1:]:
+                include[letter] = include.get(letter, 0) + 1
+        elif token[0] == "-" and token[1:].isalpha():
+            exclude += token[1:]
+        elif token.isdigit():
+            length = int(token)
+        elif len(positions) == 0:
+            i = 0
+            while i < len(token):
+                if token[i] == "?":
+                    positions.append("")
+                elif token[i].isalpha():
+                    positions.append(token[i])
+                elif token[i] == "[" and "]" in token[i:]:
+                    end = token.index("]", i)
+                    letters = token[i + 1:end]
+                    if letters.startswith("^"):
+                        letters = "".join(lett for lett in ALPHABET if lett not in letters[1:])
+                    if not letters.isalpha():
+                        raise ValueError(f"invalid letter set '{token[i:end + 1]}'")
+                    positions.append(letters)
+                    i = end
+                else:
+                    raise ValueError(f"invalid pattern '{token}'")
+                i += 1
+        else:
+            raise ValueError(f"invalid query term '{token}'")
+    if length > 0 and len(positions) > 0 and length != len(positions):
+        raise ValueError(f"the pattern has {len(positions)} letters, not {length}")
+    return {"length": length, "positions": positions, "include": include, "exclude": exclude}
+
+
+def run_query(setup_filename, query) -> list:
+    """Show the vocabulary words, of any length, that fit a pattern query (see parse_query)."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    try:
+        arguments = parse_query(query)
+    except ValueError as e:
+        print(f"Query '{query}' not understood: {e}")
+        return []
+    words = list(Vocabulary(WORD_FILENAME).graph().search(**arguments))
+    print(f"Vocabulary words that fit '{query}' ({len(words):,}):")
+    if len(words) > 0:
+        show_words(words, commas=False, word_len=max(map(len, words)))
+    return words
+
+
+def update_constraints(guess, result, can, at_least, definite) -> None:
+    """Fold the result of the latest guess into the can/at_least/definite patterns (changed in place)."""
     # adjust the at_least dictionary based on the results of the latest guess
     # count the number of each letter in the word (to handle doubles and triples)
     full_letter_count = {}
@@ -249,269 +1304,2515 @@ def reduce_words(possible_words, guess, result, can, at_least, definite):
 
             else:
                 # this letter is in the wrong_letter_count, so it goes somewhere in the word, but not here
-                can[j] = can[j].replace(lett, "")
-
-    # now filter out all the words that don't fit the patterns
-    new_word_list = []
-    for word in possible_words:
-        good_word = True
+                can[i] = can[i].replace(lett, "")
 
-        # is each of the definite letters in the word in the right place?
-        for j, c in enumerate(word):
-            if definite[j] != "" and c != definite[j]:
-                good_word = False
-                break
 
-        # is each letter in the list of possibles for that position?
-        # note that for definites, the only possible letter is the definite letter
-        if good_word:
-            for j, c in enumerate(word):
-                if can[j].find(c) < 0:
-                    good_word = False
-                    break
+def reduce_words(possible_words, guess, result, can, at_least, definite, index=None) -> list:
+    """Reduce the list of remaining possible words based on the latest (and previous) guesses and results.
+        the filtering is done with the bitsets of a WordIndex covering the possible words (built if not given)"""
+    update_constraints(guess, result, can, at_least, definite)
+    if index is None:
+        index = WordIndex(possible_words, len(guess))
+    mask = index.match(can, at_least, definite)
+    # only words that were still possible can stay possible
+    if possible_words is not index.words:
+        mask &= index.mask_of(possible_words)
+    return index.words_of(mask)
 
-        # does the word contain all required letters?
-        # note: definite letters are not counted in the required letters
-        if good_word:
-            # first, count all the letters in this word
-            full_letter_count = {}
-            for lett in word:
-                if lett not in full_letter_count:
-                    full_letter_count[lett] = 1
-                else:
-                    full_letter_count[lett] = full_letter_count[lett] + 1
 
-            # now see if the word contains at least the number of each letter required so far
-            for lett, count in at_least.items():
-                if lett not in full_letter_count or full_letter_count[lett] < count:
-                    good_word = False
-                    break
+def word_lines(words, commas=True, word_len=0, lowercase=False, upper_limit=-1, indent=True, count=None):
+    """Lay out a list of words in lines, as show_words shows them (see show_words for the options).
+        words can be any iterable (count is how many words it has if it has no len), only the words shown are taken
+        from it, and a list cut short at WORDS_SHOWN ends with a line counting the words that aren't shown"""
+    word_len = word_len or WORDLE_LENGTH
+    count = count if count is not None else len(words)
+    # an upper limit cuts the list short quietly, a long list is cut short with a count
+    shown = count if upper_limit < 0 else min(count, upper_limit)
+    if upper_limit < 0 and 0 < WORDS_SHOWN < count:
+        shown = WORDS_SHOWN
+    # calculate how many words to show on each line
+    words_per_line = max(1, LINE_LENGTH // (word_len + 2))
+    # select indentation and separator
+    indentation = WORD_LIST_INDENT if indent else ""
+    separator = COMMA if commas else ""
+    line = []
+    for i, word in enumerate(itertools.islice(words, shown)):
+        # all but the last word may be shown in lowercase
+        if lowercase and i < count - 1:
+            word = word.lower()
+        line.append(word)
+        if len(line) >= words_per_line and i < shown - 1:
+            yield indentation + f"{separator} ".join(line) + separator
+            line = []
+    if len(line) > 0:
+        yield indentation + f"{separator} ".join(line)
+    if shown < count and upper_limit < 0:
+        yield f"{indentation}... and {count - shown:,} more"
 
-            # if this word passed all tests, add it to the new word list
-            if good_word:
-                new_word_list.append(word)
 
-    return new_word_list
+def write_lines(lines) -> None:
+    """Write lines of output in one go, or a page (PAGE_LINES) at a time if the output is a terminal."""
+    if PAGE_LINES <= 0 or not sys.stdout.isatty():
+        sys.stdout.write("".join(line + "\n" for line in lines))
+        return
+    lines = iter(lines)
+    page = list(itertools.islice(lines, PAGE_LINES))
+    while len(page) > 0:
+        sys.stdout.write("".join(line + "\n" for line in page))
+        page = list(itertools.islice(lines, PAGE_LINES))
+        if len(page) > 0 and input("-- Enter for more, Q to skip the rest -- ").strip().upper() == "Q":
+            break
 
 
-def show_words(words, commas=True, word_len=WORDLE_LENGTH, lowercase=False, upper_limit=-1, indent=True):
+@timed("render")
+def show_words(words, commas=True, word_len=0, lowercase=False, upper_limit=-1, indent=True):
     """Show a list of words.
         list may be comma separated: commas=True (default)
         list may be shown in lowercase (except final word): lowercase=False (default)
-        an upper limit on number of words shown: upper_limit=# (default no limit)
-        list may be indented: indent=True (default)"""
-    # need to know how many words there are to show to treat the last word differently
-    word_count = len(words)
-    # calculate how many words to show on each line
-    words_per_line = LINE_LENGTH // (word_len + 2)
-    # keep track of the number of words printed on each line
-    words_on_line = 0
-    # select indentation
-    indentation = WORD_LIST_INDENT if indent else ""
-    # select separator
-    separator = ({COMMA} if commas else "") + " "
-    # print each word in the list, possibly separated by commas, possibly lower case except last word
-    print(indentation, end="")
-    for i, word in enumerate(words):
-        if (upper_limit >= 0) and (i >= upper_limit):
-            print()
-            break
-        if i < (word_count - 1):
-            # should all but last word be printed in lowercase?
-            if lowercase:
-                word = word.lower()
-            print(f"{word}{separator}", end="")
-            # if maximum words have been printed on this line, start a new line
-            words_on_line += 1
-            if words_on_line >= words_per_line:
-                words_on_line = 0
-                print(f"\n{indentation}", end="")
-        else:
-            # last word is always printed in uppercase without a trailing comma
-            print(f"{word}")
-
-
-def split_possibles(possibles, WORDLE_list):
-    """Split a list of possible words into two lists -- words that have been used before and those that haven't."""
-    unused_word_list = []
-    previously_used_word_list = []
-    for word in possibles:
-        previously_used_word_list.append(word) if word in WORDLE_list else unused_word_list.append(word)
-    return unused_word_list, previously_used_word_list
-
-
-def score_possibles(possibles, WORDLE_list):
-    """Analyze the previous rounds of WORDLE to make recommendations for the 'most likely' words."""
-    # analyze the previous WORDLES
-    all_letter_freq = [0.0, 0.0, 0.0, 0.0, 0.0,
-                       0.0, 0.0, 0.0, 0.0, 0.0,
-                       0.0, 0.0, 0.0, 0.0, 0.0,
-                       0.0, 0.0, 0.0, 0.0, 0.0,
-                       0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    first_letter_freq = [0.0, 0.0, 0.0, 0.0, 0.0,
-                         0.0, 0.0, 0.0, 0.0, 0.0,
-                         0.0, 0.0, 0.0, 0.0, 0.0,
-                         0.0, 0.0, 0.0, 0.0, 0.0,
-                         0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    last_letter_freq = [0.0, 0.0, 0.0, 0.0, 0.0,
-                        0.0, 0.0, 0.0, 0.0, 0.0,
-                        0.0, 0.0, 0.0, 0.0, 0.0,
-                        0.0, 0.0, 0.0, 0.0, 0.0,
-                        0.0, 0.0, 0.0, 0.0, 0.0, 0.0]
-    # count the occurrences of each letter and a total count of letters
-    total_letters = 0
-    total_words = len(WORDLE_list)
-    for word in WORDLE_list:
+        an upper limit on number of words shown: upper_limit=# (default no limit, but see WORDS_SHOWN)
+        list may be indented: indent=True (default)
+        words are laid out for the word length: word_len=# (default WORDLE_LENGTH)"""
+    write_lines(word_lines(words, commas, word_len, lowercase, upper_limit, indent))
+
+
+def split_possibles(possibles, WORDLE_list) -> tuple:
+    """Split a list of possible words into two lists -- words that have been used before and those that haven't
+    (what Solver.split does with bitsets).
+        pass a set of the previous WORDLE words to save hashing the list on every call"""
+    used = WORDLE_list if isinstance(WORDLE_list, (set, frozenset)) else set(WORDLE_list)
+    return [word for word in possibles if word not in used], [word for word in possibles if word in used]
+
+
+# the weights of the parts of a word's score (see FrequencyModel.features)
+ScoreWeights = namedtuple("ScoreWeights", "letter first last plural duplicate")
+
+
+class FrequencyModel:
+    """Letter frequencies of the previous WORDLE words, built once and kept up to date as rounds are added.
+        counts are kept for every letter position, the first and last positions are the ones used for scoring"""
+
+    def __init__(self, WORDLE_list=(), word_len=0):
+        self.word_len = word_len or WORDLE_LENGTH
+        self.total_words = 0
+        self.total_letters = 0
+        self.letter_counts = dict.fromkeys(ALPHABET, 0)
+        self.position_counts = [dict.fromkeys(ALPHABET, 0) for _ in range(self.word_len)]
+        self.last_counts = dict.fromkeys(ALPHABET, 0)
+        # what word scores are made of is worked out once for the current counts, and the scores themselves once
+        # for the current counts and weights, then looked up
+        self.features_cache = {}
+        self.scores = {}
+        self.weights_key = None
+        for word in WORDLE_list:
+            self.add(word)
+
+    def add(self, word) -> None:
+        """Count the letters of another previous WORDLE word."""
         word = word.upper()
-        first_letter_freq[ALPHABET.find(word[0])] += 1
-        last_letter_freq[ALPHABET.find(word[-1])] += 1
-        for letter in word:
-            all_letter_freq[ALPHABET.find(letter)] += 1
-            total_letters += 1
-    # calculate the probability of each letter and each first and last letter
-    for i in range(len(all_letter_freq)):
-        all_letter_freq[i] /= total_letters
-        first_letter_freq[i] /= total_words
-        last_letter_freq[i] /= total_words
+        if len(word) == 0:
+            return
+        self.total_words += 1
+        self.total_letters += len(word)
+        for j, letter in enumerate(word):
+            if letter in self.letter_counts:
+                self.letter_counts[letter] += 1
+                if j < self.word_len:
+                    self.position_counts[j][letter] += 1
+        if word[-1] in self.last_counts:
+            self.last_counts[word[-1]] += 1
+        self.features_cache.clear()
+        self.scores.clear()
+
+    def to_dict(self) -> dict:
+        """Return the letter counts in a form that can be saved as JSON."""
+        return {"words": self.total_words, "letters": self.total_letters, "letter": self.letter_counts,
+                "position": self.position_counts, "last": self.last_counts}
+
+    @classmethod
+    def from_dict(cls, values):
+        """Make a FrequencyModel from letter counts saved by to_dict."""
+        model = cls(word_len=len(values["position"]))
+        model.total_words = int(values["words"])
+        model.total_letters = int(values["letters"])
+        model.letter_counts.update(values["letter"])
+        for counts, saved in zip(model.position_counts, values["position"]):
+            counts.update(saved)
+        model.last_counts.update(values["last"])
+        return model
+
+    def features(self, word) -> tuple:
+        """Return what the score of a word is made of: the frequency of its letters, of its first letter and of its
+        last letter, whether it may be a plural or past-tense verb, and how many of its letters are repeated"""
+        if word in self.features_cache:
+            return self.features_cache[word]
+        total_letters = max(self.total_letters, 1)
+        total_words = max(self.total_words, 1)
+        letter = sum(self.letter_counts.get(lett, 0) for lett in word) / total_letters
+        first = self.position_counts[0].get(word[0], 0) / total_words
+        last = self.last_counts.get(word[-1], 0) / total_words
+        plural = 1 if word.endswith("ED") or word.endswith("S") else 0
+        letter_counts = Counter(word)
+        duplicates = sum(1 for lett in word if letter_counts[lett] > 1)
+        features = (letter, first, last, plural, duplicates)
+        self.features_cache[word] = features
+        return features
+
+    def score(self, word) -> float:
+        """Return the 'most likely' score of a word (higher is better)."""
+        weights = score_weights()
+        if self.weights_key != weights:
+            # the weights have been changed, so every score has to be worked out again
+            self.weights_key = weights
+            self.scores.clear()
+        if word in self.scores:
+            return self.scores[word]
+        score = weighted_score(self.features(word), weights)
+        self.scores[word] = score
+        return score
+
+
+def score_weights() -> ScoreWeights:
+    """Return the scoring weights from the setup."""
+    return ScoreWeights(LETTER_MULTIPLIER, FIRST_MULTIPLIER, LAST_MULTIPLIER, PLURAL_PENALTY, DUPLICATE_PENALTY)
+
+
+def weighted_score(features, weights) -> float:
+    """Return the score of a word from its FrequencyModel features and a set of ScoreWeights."""
+    letter, first, last, plural, duplicates = features
+    # more common first and last letters and more common letters overall raise the score, possible plurals or
+    # past-tense verbs and duplicate letters lower it
+    return (first * weights.first + last * weights.last + letter * weights.letter - plural * weights.plural -
+            duplicates * weights.duplicate)
+
+
+class RoundStats:
+    """Running totals of the WORDLE rounds played: the win tries histogram and the letter counts of the WORDLE words."""
 
+    def __init__(self, rounds=()):
+        self.total_rounds = 0
+        self.tries_table = [0] * STATS_TRIES
+        self.model = FrequencyModel()
+        for a_round in rounds:
+            self.add_round(a_round)
+
+    def add_round(self, a_round) -> None:
+        """Count one more round (the list of guesses, the last one being the WORDLE word)."""
+        self.total_rounds += 1
+        tries = len(a_round) - 1
+        if tries < len(self.tries_table):
+            self.tries_table[tries] += 1
+        self.model.add(a_round[-1])
+
+    def to_dict(self) -> dict:
+        """Return the totals in a form that can be saved as JSON."""
+        return {"rounds": self.total_rounds, "tries": self.tries_table, "letters": self.model.to_dict()}
+
+    @classmethod
+    def from_dict(cls, values):
+        """Make a RoundStats from totals saved by to_dict."""
+        stats = cls()
+        stats.total_rounds = int(values["rounds"])
+        stats.tries_table = [int(v) for v in values["tries"]]
+        stats.model = FrequencyModel.from_dict(values["letters"])
+        return stats
+
+
+def save_round_stats(filename, stats) -> None:
+    """Write the stats sidecar of a WORDLE file, recording the state of the files the totals were counted from."""
+    sidecar = {"version": STATS_VERSION, "source": history_signature(filename), **stats.to_dict()}
+    temp_filename = stats_filename_for(filename) + ".tmp"
+    try:
+        with open(temp_filename, WRITE_FILE) as f:
+            json.dump(sidecar, f)
+        os.replace(temp_filename, stats_filename_for(filename))
+    except OSError:
+        # can't write the sidecar, the totals will be counted again next time
+        pass
+
+
+def load_round_stats(filename, rounds=None):
+    """Read the stats sidecar of a WORDLE file, or count the rounds again if it is missing or out of date.
+        rounds are the rounds already read from the files (read again if needed and not given)"""
+    try:
+        with open(stats_filename_for(filename), READ_FILE) as f:
+            sidecar = json.load(f)
+        if sidecar.get("version") == STATS_VERSION and sidecar.get("source") == history_signature(filename):
+            return RoundStats.from_dict(sidecar)
+    except (OSError, ValueError, KeyError, TypeError):
+        # missing or damaged sidecar
+        pass
+    if rounds is None:
+        # the previous WORDLE file that goes with this WORDLE file (one word length's history)
+        old_filename = dict(map(history_filenames, history_lengths())).get(filename, "")
+        _, rounds = read_WORDLE_list(filename, old_filename)
+    stats = RoundStats(rounds)
+    save_round_stats(filename, stats)
+    return stats
+
+
+@timed("score")
+def score_possibles(possibles, WORDLE_list, model=None, top=0):
+    """Analyze the previous rounds of WORDLE to make recommendations for the 'most likely' words.
+        a FrequencyModel of the WORDLE list can be given to save analyzing the list again (default builds one)
+        only the best top words are returned, best first (default returns all the words)"""
+    if model is None:
+        model = FrequencyModel(WORDLE_list)
     # calculate a probability score for each word and build a list of tuples
-    scored_words = []
-    for word in possibles:
-        # raise the score for having more common first and last letters
-        score = first_letter_freq[ALPHABET.find(word[0])] * FIRST_MULTIPLIER + \
-                last_letter_freq[ALPHABET.find(word[-1])] * LAST_MULTIPLIER
-        # add scores for frequencies of all letters
-        for letter in word.upper():
-            score += all_letter_freq[ALPHABET.find(letter)] * LETTER_MULTIPLIER
-        # lower the score for possible plurals or past-tense verbs
-        if word.endswith("ED") or word.endswith("ES") or word.endswith("S"):
-            score -= 1
-        # lower the score for duplicate letters
-        for letter in word:
-            if word.count(letter) > 1:
-                score -= 0.5
-        scored_words.append((word, score))
-    scored_words.sort(reverse=True, key=lambda w: w[1])
-    return scored_words
-
-
-def show_scored_words(scored_words):
-    """Print out a short list of the highest scoring WORDLE word suggestions."""
+    scored_words = zip(possibles, map(model.score, possibles))
+    if top > 0:
+        return heapq.nlargest(top, scored_words, key=lambda w: w[1])
+    return sorted(scored_words, reverse=True, key=lambda w: w[1])
+
+
+def scored_word_lines(scored_words):
+    """Lay out a short list of the highest scoring WORDLE word suggestions."""
     top_words = min(RECOMMENDED_WORDS, len(scored_words))
     if top_words > 0:
         if top_words == 1:
-            print("There is only one word left in the recommended word list:")
+            yield "There is only one word left in the recommended word list:"
         else:
-            print(f"Top {top_words} recommended words:")
-        show_words(list(w[0] for w in scored_words), commas=False, upper_limit=top_words)
+            yield f"Top {top_words} recommended words:"
+        yield from word_lines([w[0] for w in scored_words[:top_words]], commas=False)
     else:
-        print("There are no words left in the recommended word list, sorry...you're on your own!")
+        yield "There are no words left in the recommended word list, sorry...you're on your own!"
 
 
-def process_guesses(wordlist, WORDLE_list):
-    """Process WORDLE word guesses until a full round is complete."""
-    guess_list = []
-    can = []
-    at_least = {}
-    definite = []
-    for _ in range(WORDLE_LENGTH):
-        can.append(ALPHABET)
-        definite.append("")
-    possibles = wordlist.copy()
-    while True:
-        while True:
-            guess = get_guess(wordlist, WORDLE_list)
-            print("Now, enter your guess in WORDLE and indicate the results below:")
-            result = get_result(guess)
-            if CANCEL_WORD not in result:
-                break
-            print("Cancelling most recent guess")
-        guess_list.append(guess)
-        # if we have found the right word, terminate processing guesses
-        if result == RIGHT_RIGHT * WORDLE_LENGTH or RIGHT_WORD in result:
-            break
-        # cut out all the words that don't match our patterns
-        possibles = reduce_words(possibles, guess, result, can, at_least, definite)
-        # split the possibles list into non-used and previously-used words
-        new_possibles, old_possibles = split_possibles(possibles, WORDLE_list)
-        # calculate a probability of each word being correct (algorithm in progress)
-        scored_words = score_possibles(new_possibles, WORDLE_list)
-        # print some of the highest scoring words
-        show_scored_words(scored_words)
-        # print the list of words that is still viable
-        print(f"Unused possible words from vocabulary list ({len(new_possibles):,}):")
-        show_words(new_possibles, commas=False)
-        if len(old_possibles) > 0:
-            print(f"Previously used possible words from vocabulary list ({len(old_possibles):,}):")
-            show_words(old_possibles, commas=False)
-    print()
-    print(f"Success! You got it in {len(guess_list)}. The guess sequence is:")
-    show_words(guess_list, commas=False, lowercase=True, indent=True)
-    return guess_list
+def feedback_code(guess, answer) -> int:
+    """Return the result WORDLE would show for a guess against an answer, coded as a base 3 number."""
+    code = 0
+    # right letters in the right place come first, the answer letters they don't use are left for the others
+    unmatched = []
+    for g, a, weight in zip(guess, answer, PATTERN_WEIGHTS):
+        if g == a:
+            code += weight + weight
+        else:
+            unmatched.append(a)
+    # right letters in the wrong place, each one uses up one unmatched answer letter (to handle doubles and triples)
+    for g, a, weight in zip(guess, answer, PATTERN_WEIGHTS):
+        if g != a and g in unmatched:
+            code += weight
+            unmatched.remove(g)
+    return code
 
 
-def show_stats(rounds):
-    """Show the statistics and bar chart for all the WORDLE games the user has played."""
-    tries_table = [0 for _ in range(12)]
-    total_rounds = len(rounds)
-    for a_round in rounds:
-        tries = len(a_round) - 1
-        if tries < len(tries_table):
-            tries_table[tries] += 1
-    total_tries = 0
-    for i in range(len(tries_table)):
-        total_tries += (i+1) * tries_table[i]
-    print(f"Win tries chart (mean: {total_tries / total_rounds:.3} after {total_rounds} games):")
-    m = max(tries_table)
-    for i, v in enumerate(tries_table):
-        print(f"{i+1:2} ({v:3}) {'=' * int(v / m * LINE_LENGTH)}")
+def result_to_code(result) -> int:
+    """Convert a result string (as entered by the user) to its base 3 pattern code."""
+    return sum(PATTERN_DIGITS.get(c, 0) * weight for c, weight in zip(result, PATTERN_WEIGHTS))
 
 
-def main(setup_filename):
-    """main method for WORDLE word guessing program."""
-    # read the setup file for initial values
-    setup = read_setup(setup_filename)
-    apply_setup_values(setup)
+def code_to_result(code, word_len=0) -> str:
+    """Convert a base 3 pattern code back to a result string (for words of WORDLE_LENGTH by default)."""
+    word_len = word_len or WORDLE_LENGTH
+    symbols = (WRONG_WRONG, RIGHT_WRONG, RIGHT_RIGHT)
+    result = ""
+    for _ in range(word_len):
+        code, digit = divmod(code, 3)
+        result += symbols[digit]
+    return result
 
-    # read the list of possible WORDLE words (5-letter words only)
-    word_list = read_word_list(WORD_FILENAME, WORDLE_LENGTH)
-    print(f"5-letter vocabulary words loaded: {len(word_list):,} words")
 
-    # read the list of previous WORDLE words (also the list of guesses for each round)
-    WORDLE_list, WORDLE_rounds = read_WORDLE_list(WORDLE_FILENAME, PREVIOUS_WORDLE_FILENAME)
-    print(f"Previous WORDLE words loaded: {len(WORDLE_list):,} words")
+def word_list_hash(*word_lists) -> bytes:
+    """Return a SHA-256 digest that identifies the contents and order of one or more word lists."""
+    digest = hashlib.sha256()
+    for words in word_lists:
+        digest.update("\n".join(words).encode("ascii", "replace"))
+        digest.update(b"\0")
+    return digest.digest()
 
-    another = "Y"
-    while another == "Y":
-        # show current WORDLE guess statistics before we start this round
-        show_stats(WORDLE_rounds)
 
-        # process player's WORDLE guesses and make suggestions
-        guess_list = process_guesses(word_list, WORDLE_list)
+# word lists for the pattern matrix worker processes (set once per process by init_pattern_worker)
+_pattern_probes = []
+_pattern_answers = []
 
-        # see if player is done and if they want this round's results saved
-        while True:
-            print()
-            another = input("Play another round? Y/N/(X to exit without saving this round): ").upper().strip()
-            if (len(another) == 1) and (another in "YNX"):
-                break
-            print(f"'{another}' is not a valid action")
 
-        if another != "X":
-            # save round results to WORDLE file here
-            WORDLE_rounds.append(guess_list)
-            WORDLE_list.append(guess_list[-1])
-            save_WORDLE_file(WORDLE_FILENAME, WORDLE_rounds)
-        else:
-            print("Round results not saved")
+def init_pattern_worker(probes, answers) -> None:
+    """Give a pattern matrix worker process the word lists it computes rows for."""
+    global _pattern_probes
+    global _pattern_answers
+    _pattern_probes = probes
+    _pattern_answers = answers
 
-    # show new stats at end of play
-    show_stats(WORDLE_rounds)
 
-    print()
-    print("All done...thanks for playing")
+def pattern_code_type(word_len) -> str:
+    """Return the array type code of the smallest unsigned integer that holds every pattern code of a word length."""
+    for typecode in "BHI":
+        if PATTERN_WEIGHTS[word_len] <= 1 << (8 * array.array(typecode).itemsize):
+            return typecode
+    raise ValueError(f"{word_len}-letter words have too many pattern codes")
+
+
+def pattern_row(guess, answers) -> array.array:
+    """Compute the pattern code of a guess against each of the answer words."""
+    # letters that are not in the guess can only ever be wrong, so blank them out: answers that look the same
+    # after that share a pattern code, and each distinct look only needs to be worked out once
+    table = str.maketrans({lett: "_" for lett in ALPHABET if lett not in guess})
+    keys = [answer.translate(table) for answer in answers]
+    codes = {key: feedback_code(guess, key) for key in set(keys)}
+    return array.array(pattern_code_type(len(guess)), map(codes.__getitem__, keys))
+
+
+def pattern_rows(first_row) -> bytes:
+    """Compute PATTERN_ROWS_PER_TASK rows of the pattern matrix (one pattern code per answer word for each probe)."""
+    return b"".join(pattern_row(guess, _pattern_answers).tobytes()
+                    for guess in _pattern_probes[first_row:first_row + PATTERN_ROWS_PER_TASK])
+
+
+def build_pattern_matrix(probes, answers, filename, processes=None) -> None:
+    """Compute the pattern code of every probe word against every answer word, using all cores, and save it."""
+    word_len = len(answers[0]) if len(answers) > 0 else WORDLE_LENGTH
+    header = PATTERN_HEADER.pack(PATTERN_MAGIC, PATTERN_VERSION, word_len, len(probes), len(answers),
+                                 word_list_hash(probes, answers))
+    processes = processes or os.cpu_count() or 1
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, WRITE_BINARY) as f:
+        f.write(header)
+        first_rows = range(0, len(probes), PATTERN_ROWS_PER_TASK)
+        if processes == 1:
+            init_pattern_worker(probes, answers)
+            for first_row in first_rows:
+                f.write(pattern_rows(first_row))
+        else:
+            with multiprocessing.Pool(processes, init_pattern_worker, (probes, answers)) as pool:
+                # imap keeps the chunks in row order, so they can be written as they arrive
+                for rows in pool.imap(pattern_rows, first_rows):
+                    f.write(rows)
+    os.replace(temp_filename, filename)
+
+
+class PatternMatrix:
+    """Memory-mapped matrix of the pattern codes of every probe word against every answer word."""
+
+    def __init__(self, filename, probes, answers):
+        with open(filename, READ_BINARY) as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, word_len, probe_count, answer_count, words_hash = PATTERN_HEADER.unpack_from(self.mm, 0)
+        self.word_len = word_len
+        self.typecode = pattern_code_type(word_len)
+        self.code_size = array.array(self.typecode).itemsize
+        if magic != PATTERN_MAGIC or version != PATTERN_VERSION or words_hash != word_list_hash(probes, answers) or \
+                len(self.mm) != PATTERN_HEADER.size + probe_count * answer_count * self.code_size:
+            self.mm.close()
+            raise ValueError(f"Pattern matrix '{filename}' does not match the word lists")
+        self.probes = probes
+        self.answers = answers
+        self.answer_index = {word: i for i, word in enumerate(answers)}
+        # c * log2(c) for every possible group size, so the entropy of a split is a few table lookups
+        self.x_log_x = [0.0] + [c * math.log2(c) for c in range(1, len(answers) + 1)]
+
+    def row(self, i):
+        """Return the pattern codes of probe word i against all the answer words."""
+        row_size = len(self.answers) * self.code_size
+        start = PATTERN_HEADER.size + i * row_size
+        codes = self.mm[start:start + row_size]
+        return codes if self.code_size == 1 else memoryview(codes).cast(self.typecode)
+
+    @timed("rank")
+    def rank(self, candidates, method=ENTROPY, top=RECOMMENDED_WORDS) -> list:
+        """Rank every probe word by how well it splits the candidate words into groups with the same result.
+            method=ENTROPY: most expected information (in bits) first
+            method=MINIMAX: smallest worst-case group first
+            returns a list of (word, expected bits, worst-case group size) tuples, best first"""
+        columns = [self.answer_index[word] for word in candidates if word in self.answer_index]
+        total = len(columns)
+        if total == 0:
+            return []
+        # a histogram of the result codes is all that is needed from each row
+        if total == len(self.answers):
+            pick = None
+        elif total == 1:
+            pick = lambda row: (row[columns[0]],)
+        else:
+            pick = operator.itemgetter(*columns)
+        candidate_set = set(candidates)
+        log_total = math.log2(total)
+        x_log_x = self.x_log_x
+        ranked = []
+        for i, word in enumerate(self.probes):
+            row = self.row(i)
+            groups = Counter(row if pick is None else pick(row)).values()
+            bits = log_total - sum(map(x_log_x.__getitem__, groups)) / total
+            ranked.append((word, bits, max(groups)))
+        # a word that might be the answer wins a tie
+        if method == MINIMAX:
+            key = lambda w: (w[2], w[0] not in candidate_set, -w[1])
+        else:
+            key = lambda w: (-w[1], w[0] not in candidate_set, w[2])
+        return heapq.nsmallest(top, ranked, key=key)
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self.mm.close()
+
+
+def pattern_filename_for(word_len) -> str:
+    """Return the name of the pattern matrix file for words of a length."""
+    return PATTERN_FILENAME if PATTERN_FILENAME != "" else f"{vocabulary_name()}.{word_len}{PATTERN_SUFFIX}"
+
+
+def load_pattern_matrix(probes, answers, filename="", log=print):
+    """Memory-map the pattern matrix for these word lists, computing and saving it first if needed.
+        log is called with the progress message (GameData holds it back, as it may be loading in the background)"""
+    if filename == "":
+        filename = pattern_filename_for(len(answers[0]) if len(answers) > 0 else WORDLE_LENGTH)
+    try:
+        return PatternMatrix(filename, probes, answers)
+    except (OSError, ValueError, struct.error):
+        # missing, stale or damaged matrix
+        pass
+    log(f"Building the pattern matrix for {len(probes):,} x {len(answers):,} words (this is only done once)...")
+    build_pattern_matrix(probes, answers, filename)
+    return PatternMatrix(filename, probes, answers)
+
+
+def ranked_guess_lines(ranked, method=ENTROPY):
+    """Lay out a short list of the probe words that split the remaining possible words best."""
+    if len(ranked) > 0:
+        if method == MINIMAX:
+            yield f"Top {len(ranked)} probe words by smallest worst case (largest group: {ranked[0][2]:,} words):"
+        else:
+            yield f"Top {len(ranked)} probe words by expected information (best: {ranked[0][1]:.2f} bits):"
+        yield from word_lines([w[0] for w in ranked], commas=False)
+
+
+@timed("rank")
+def rank_boards(boards, method=ENTROPY, top=RECOMMENDED_WORDS, patterns=None) -> list:
+    """Rank probe words by how well they split the candidate words of several boards at once.
+        the expected information and the worst-case group size of a word are summed over the boards
+        with a pattern matrix every probe word is ranked, without one only the candidate words are (and only if
+        that takes at most BOARD_RANK_LIMIT results to work out, otherwise nothing is ranked)
+        returns a list of (word, expected bits, summed worst-case group size) tuples, best first"""
+    if patterns is not None:
+        boards = [[word for word in board if word in patterns.answer_index] for board in boards]
+    boards = [board for board in boards if len(board) > 0]
+    # the candidates of all the boards go in one list, so the codes of a probe word are worked out in one pass
+    answers = [word for board in boards for word in board]
+    if len(answers) == 0:
+        return []
+    bounds = list(itertools.accumulate(map(len, boards), initial=0))
+    spans = list(zip(bounds, bounds[1:], [math.log2(len(board)) for board in boards]))
+    if patterns is not None:
+        probes = patterns.probes
+        columns = [patterns.answer_index[word] for word in answers]
+        pick = operator.itemgetter(*columns) if len(columns) > 1 else lambda row: (row[columns[0]],)
+        codes_of = lambda i, probe: pick(patterns.row(i))
+    else:
+        probes = list(dict.fromkeys(answers))
+        if len(probes) * len(answers) > BOARD_RANK_LIMIT:
+            return []
+        codes_of = lambda i, probe: pattern_row(probe, answers)
+    candidate_set = set(answers)
+    x_log_x = [0.0] + [c * math.log2(c) for c in range(1, max(map(len, boards)) + 1)]
+    ranked = []
+    for i, word in enumerate(probes):
+        codes = codes_of(i, word)
+        bits = 0.0
+        worst = 0
+        for start, end, log_size in spans:
+            groups = Counter(codes[start:end]).values()
+            bits += log_size - sum(map(x_log_x.__getitem__, groups)) / (end - start)
+            worst += max(groups)
+        ranked.append((word, bits, worst))
+    # a word that might be the answer on some board wins a tie
+    if method == MINIMAX:
+        key = lambda w: (w[2], w[0] not in candidate_set, -w[1])
+    else:
+        key = lambda w: (-w[1], w[0] not in candidate_set, w[2])
+    return heapq.nsmallest(top, ranked, key=key)
+
+
+# what a game knows after a turn, kept immutable so a turn can be gone back to without working anything out again
+# (node is where the game is in the strategy tree, None if it has left the tree or there is no tree)
+Snapshot = namedtuple("Snapshot", "mask can at_least definite node")
+
+
+def normalize_result(result, word_len=0) -> str:
+    """Condition a result string from a non-interactive client and check it, raising ValueError if it is invalid."""
+    word_len = word_len or WORDLE_LENGTH
+    result = "".join(RESULT_ALIASES.get(c, c) for c in result.upper())
+    if result == RIGHT_WORD:
+        return RIGHT_RIGHT * word_len
+    result = result.ljust(word_len, WRONG_WRONG)
+    if len(result) != word_len or any(c not in (RIGHT_RIGHT, RIGHT_WRONG, WRONG_WRONG) for c in result):
+        raise ValueError(f"invalid result '{result}'")
+    return result
+
+
+class Solver:
+    """The state of one WORDLE game: the guesses so far, the clues they gave and the words that are still possible.
+        the vocabulary (index), history and pattern matrix are only read, so many solvers can share them
+        used is a set of the previous WORDLE words (built from WORDLE_list if not given)
+        a DecisionTree (tree) is followed for as long as the game stays in it"""
+
+    def __init__(self, index, WORDLE_list=(), patterns=None, recommender=None, model=None, used=None, book=None,
+                 used_mask=None, tree=None):
+        self.index = index
+        self.book = book
+        self.node = tree.root if tree is not None else None
+        self.WORDLE_list = WORDLE_list
+        self.used = used if used is not None else set(WORDLE_list)
+        self.used_mask = used_mask if used_mask is not None else index.mask_of(self.used)
+        self.patterns = patterns
+        self.model = model or FrequencyModel(WORDLE_list, index.word_len)
+        self.recommender = recommender or RECOMMENDER
+        self.guesses = []
+        self.results = []
+        self.can = [ALPHABET] * index.word_len
+        self.at_least = {}
+        self.definite = [""] * index.word_len
+        self.mask = index.all
+        # snapshots[k] is the state after the first k guesses
+        self.snapshots = [self.snapshot()]
+
+    def snapshot(self) -> Snapshot:
+        """Return an immutable copy of the current state."""
+        return Snapshot(self.mask, tuple(self.can), tuple(self.at_least.items()), tuple(self.definite), self.node)
+
+    @timed("filter")
+    def apply(self, guess, result) -> int:
+        """Apply the result of a guess and return the number of words that are still possible."""
+        guess = guess.strip().upper()
+        if len(guess) != self.index.word_len or not guess.isalpha():
+            raise ValueError(f"invalid guess '{guess}', must be {self.index.word_len} letters")
+        if len(result) != self.index.word_len:
+            raise ValueError(f"invalid result '{result}', must be {self.index.word_len} characters")
+        self.guesses.append(guess)
+        self.results.append(result)
+        update_constraints(guess, result, self.can, self.at_least, self.definite)
+        self.mask &= self.index.match(self.can, self.at_least, self.definite)
+        # the strategy tree has a branch for every result of its own guess, and nothing for any other guess
+        if self.node is not None:
+            self.node = self.node[1].get(result_to_code(result)) if self.node[0] == guess else None
+        # a branch that can't finish within the tries left is dropped for the ranked suggestions
+        if self.node is not None and len(self.guesses) + node_depth(self.node) > WORDLE_TRIES:
+            self.node = None
+        self.snapshots.append(self.snapshot())
+        return self.count()
+
+    def rewind(self, turn) -> int:
+        """Go back to the state after the first turn guesses and return the number of words that are still possible."""
+        if not 0 <= turn <= len(self.guesses):
+            raise ValueError(f"invalid turn {turn}, there have been {len(self.guesses)} guesses")
+        mask, can, at_least, definite, self.node = self.snapshots[turn]
+        self.mask = mask
+        self.can = list(can)
+        self.at_least = dict(at_least)
+        self.definite = list(definite)
+        del self.guesses[turn:], self.results[turn:], self.snapshots[turn + 1:]
+        return self.count()
+
+    def undo(self) -> int:
+        """Take back the last guess and return the number of words that are still possible."""
+        if len(self.guesses) == 0:
+            raise ValueError("there are no guesses to undo")
+        return self.rewind(len(self.guesses) - 1)
+
+    def edit(self, turn, result) -> int:
+        """Change the result of guess number turn (counting from 0): the guesses before it are kept as they are, and
+        only it and the guesses after it are applied again. returns the number of words that are still possible"""
+        if not 0 <= turn < len(self.guesses):
+            raise ValueError(f"invalid turn {turn}, there have been {len(self.guesses)} guesses")
+        guesses = self.guesses[turn:]
+        results = [result] + self.results[turn + 1:]
+        self.rewind(turn)
+        for guess, result in zip(guesses, results):
+            self.apply(guess, result)
+        return self.count()
+
+    def copy(self):
+        """Return an independent copy of this game (sharing the vocabulary, history and other read-only data).
+            the snapshots are immutable, so they are shared too, making a what-if branch cheap"""
+        twin = copy.copy(self)
+        twin.guesses = self.guesses.copy()
+        twin.results = self.results.copy()
+        twin.snapshots = self.snapshots.copy()
+        twin.can = self.can.copy()
+        twin.at_least = self.at_least.copy()
+        twin.definite = self.definite.copy()
+        return twin
+
+    def solved(self) -> bool:
+        """Has the last guess been the right word?"""
+        return len(self.results) > 0 and self.results[-1] == RIGHT_RIGHT * self.index.word_len
+
+    def count(self) -> int:
+        """Return the number of words that are still possible."""
+        return bin(self.mask).count("1")
+
+    def candidates(self) -> list:
+        """Return the words that are still possible, in vocabulary order."""
+        return self.index.words_of(self.mask)
+
+    @timed("split")
+    def split(self) -> tuple:
+        """Return the words that are still possible as two lists -- words that haven't been used before and those
+        that have."""
+        return self.index.words_of(self.mask & ~self.used_mask), self.index.words_of(self.mask & self.used_mask)
+
+    def recommendations(self) -> tuple:
+        """Return what to show for the current turn, from the opening book if it has the turn, or worked out live:
+        (top scored unused possible words, top probe words ranked by the pattern matrix (empty without one))"""
+        if self.book is not None:
+            entry = self.book.get(self.guesses, self.results)
+            if entry is not None:
+                return entry
+        new_possibles, old_possibles = self.split()
+        scored_words = score_possibles(new_possibles, self.WORDLE_list, self.model, RECOMMENDED_WORDS)
+        ranked = []
+        if self.patterns is not None and self.recommender != FREQUENCY and len(new_possibles) + len(old_possibles) > 1:
+            ranked = self.patterns.rank(new_possibles or old_possibles, self.recommender)
+        return scored_words, ranked
+
+    def tree_guess(self) -> str:
+        """Return the strategy tree's next guess, or an empty string if the game is not following a tree."""
+        return self.node[0] if self.node is not None else ""
+
+    def suggest(self, k=RECOMMENDED_WORDS) -> list:
+        """Return up to k recommended next guesses, best first (the strategy tree's guess comes first)."""
+        guess = self.tree_guess()
+        suggestions = self.recommended_words(k)
+        if guess != "":
+            suggestions = [guess] + [word for word in suggestions if word != guess][:k - 1]
+        return suggestions
+
+    def recommended_words(self, k=RECOMMENDED_WORDS) -> list:
+        """Return up to k recommended next guesses from the opening book or worked out live, best first."""
+        if self.book is not None and k <= RECOMMENDED_WORDS:
+            entry = self.book.get(self.guesses, self.results)
+            if entry is not None and len(entry[1] or entry[0]) > 0:
+                return [w[0] for w in (entry[1] or entry[0])[:k]]
+        new_possibles, old_possibles = self.split()
+        possibles = new_possibles + old_possibles
+        if self.patterns is not None and self.recommender != FREQUENCY and len(possibles) > 1:
+            return [w[0] for w in self.patterns.rank(new_possibles or possibles, self.recommender, k)]
+        return [w[0] for w in score_possibles(new_possibles or possibles, self.WORDLE_list, self.model, k)]
+
+
+def turn_lines(solver):
+    """Lay out the recommendations and the words that are still possible for a game, a line at a time."""
+    if solver.tree_guess() != "":
+        yield f"Next guess from the strategy tree: {solver.tree_guess()}"
+    # split the possibles list into non-used and previously-used words
+    new_possibles, old_possibles = solver.split()
+    # calculate a probability of each word being correct (algorithm in progress), and rank the probe words
+    # if there is a pattern matrix to rank them with (both come from the opening book for the early turns)
+    scored_words, ranked = solver.recommendations()
+    # some of the highest scoring words
+    yield from scored_word_lines(scored_words)
+    # the probe words that would tell us the most
+    yield from ranked_guess_lines(ranked, RECOMMENDER)
+    # the list of words that is still viable
+    yield f"Unused possible words from vocabulary list ({len(new_possibles):,}):"
+    yield from word_lines(new_possibles, commas=False)
+    if len(old_possibles) > 0:
+        yield f"Previously used possible words from vocabulary list ({len(old_possibles):,}):"
+        yield from word_lines(old_possibles, commas=False)
+
+
+def show_turn(solver) -> None:
+    """Show the recommendations and the words that are still possible for a game."""
+    # work the turn out first, so only writing it counts as rendering
+    lines = list(turn_lines(solver))
+    with METRICS.phase("render"):
+        write_lines(lines)
+
+
+def process_command(solver, command, known=None) -> None:
+    """Carry out an undo, edit or what-if command entered instead of a guess word.
+        a what-if guess is checked against known, the whole vocabulary (default the words that can be the answer)"""
+    if command == UNDO_GUESS:
+        if len(solver.guesses) == 0:
+            print("There are no guesses to undo")
+            return
+        guess = solver.guesses[-1]
+        solver.undo()
+        print(f"Took back {guess}")
+    elif command[0] == EDIT_RESULT:
+        turn = command[1:].strip()
+        if not turn.isdigit() or not 1 <= int(turn) <= len(solver.guesses):
+            print(f"Enter {EDIT_RESULT} and a guess number from 1 to {len(solver.guesses)} to change its result")
+            return
+        result = get_result(solver.guesses[int(turn) - 1])
+        if CANCEL_WORD in result or RIGHT_WORD in result:
+            print("Result not changed")
+            return
+        # only this guess and the ones after it are applied again
+        solver.edit(int(turn) - 1, result)
+        print(f"Changed the result of guess {turn}, {solver.guesses[int(turn) - 1]}")
+    elif command == WHAT_IF:
+        guess = get_guess(known if known is not None else solver.index.position, solver.used)
+        result = get_result(guess)
+        if CANCEL_WORD in result or RIGHT_WORD in result:
+            return
+        # play it on a branch of the game, which shares everything it can with the game itself
+        branch = solver.copy()
+        branch.apply(guess, result)
+        print(f"What if {guess} got that result:")
+        show_turn(branch)
+        print("(back to the game, that guess was not played)")
+        return
+    else:
+        print(f"Unknown command '{command}'")
+        return
+    if len(solver.guesses) > 0:
+        show_turn(solver)
+
+
+def process_guesses(data):
+    """Process WORDLE word guesses until a full round is complete.
+        the GameData may still be loading, it is only waited for once a guess has to be worked on"""
+    # the solver is made once the game data is needed (straight away if it is in already)
+    solver = data.new_solver() if data.ready() else None
+    if solver is not None and solver.tree_guess() != "":
+        print(f"The strategy tree opens with {solver.tree_guess()}")
+    print(f"Instead of a guess, enter '{UNDO_GUESS}' to take back the last guess, '{EDIT_RESULT}' and a guess number to "
+          f"change its result, or '{WHAT_IF}' to try a guess out")
+    while True:
+        while True:
+            # the index and the used set give hashed lookups for the vocabulary and previous WORDLE checks
+            guess = get_guess(data.known, data.used, commands=True)
+            if guess[0] in (UNDO_GUESS, EDIT_RESULT, WHAT_IF):
+                if solver is None:
+                    solver = data.new_solver()
+                process_command(solver, guess, data.known)
+                continue
+            print("Now, enter your guess in WORDLE and indicate the results below:")
+            result = get_result(guess)
+            if CANCEL_WORD not in result:
+                break
+            print("Cancelling most recent guess")
+        # if we have found the right word, terminate processing guesses
+        if result == RIGHT_RIGHT * WORDLE_LENGTH or RIGHT_WORD in result:
+            break
+        if solver is None:
+            solver = data.new_solver()
+        # cut out all the words that don't match our patterns (the state before is kept, so it can be undone)
+        solver.apply(guess, result)
+        show_turn(solver)
+    guess_list = (solver.guesses if solver is not None else []) + [guess]
+    print()
+    print(f"Success! You got it in {len(guess_list)}. The guess sequence is:")
+    show_words(guess_list, commas=False, lowercase=True, indent=True)
+    return guess_list
+
+
+class MultiSolver:
+    """Several WORDLE games played at once with the same guesses (Quordle has 4 boards, Octordle 8).
+        every board is a Solver, so filtering a board is a few bitset operations rather than a pass over its words,
+        and the boards share the vocabulary, history, pattern matrix and opening book"""
+
+    def __init__(self, boards):
+        self.boards = boards
+        self.index = boards[0].index
+        self.guesses = []
+
+    def apply(self, guess, results) -> int:
+        """Apply a guess to every unsolved board, with one result per board (the results for boards that are already
+        solved are ignored), and return the number of words that are still possible on the unsolved boards."""
+        guess = guess.strip().upper()
+        word_len = self.index.word_len
+        if len(results) != len(self.boards):
+            raise ValueError(f"expected {len(self.boards)} results, got {len(results)}")
+        # check everything before any board changes, so a bad result doesn't leave the boards out of step
+        if len(guess) != word_len or not guess.isalpha():
+            raise ValueError(f"invalid guess '{guess}', must be {word_len} letters")
+        for board, result in zip(self.boards, results):
+            if not board.solved() and len(result) != word_len:
+                raise ValueError(f"invalid result '{result}', must be {word_len} characters")
+        self.guesses.append(guess)
+        for board, result in zip(self.boards, results):
+            if not board.solved():
+                board.apply(guess, result)
+        return self.count()
+
+    def rewind(self, turn) -> int:
+        """Go back to the state after the first turn guesses and return the number of words that are still possible
+        on the unsolved boards (a board that was solved before then keeps all of its guesses)."""
+        if not 0 <= turn <= len(self.guesses):
+            raise ValueError(f"invalid turn {turn}, there have been {len(self.guesses)} guesses")
+        for board in self.boards:
+            if len(board.guesses) > turn:
+                board.rewind(turn)
+        del self.guesses[turn:]
+        return self.count()
+
+    def undo(self) -> int:
+        """Take back the last guess on every board it was played on."""
+        if len(self.guesses) == 0:
+            raise ValueError("there are no guesses to undo")
+        return self.rewind(len(self.guesses) - 1)
+
+    def copy(self):
+        """Return an independent copy of these games."""
+        twin = copy.copy(self)
+        twin.boards = [board.copy() for board in self.boards]
+        twin.guesses = self.guesses.copy()
+        return twin
+
+    def solved(self) -> bool:
+        """Has every board been solved?"""
+        return all(board.solved() for board in self.boards)
+
+    def unsolved(self) -> list:
+        """Return the boards that have not been solved yet."""
+        return [board for board in self.boards if not board.solved()]
+
+    def count(self) -> int:
+        """Return the number of words that are still possible, added up over the unsolved boards."""
+        return sum(board.count() for board in self.unsolved())
+
+    def counts(self) -> list:
+        """Return the number of words that are still possible on each board."""
+        return [board.count() for board in self.boards]
+
+    def candidates(self) -> list:
+        """Return the words that are still possible on each board."""
+        return [board.candidates() for board in self.boards]
+
+    def certain(self) -> list:
+        """Return the words that are the only possible word left on an unsolved board, in board order."""
+        return list(dict.fromkeys(board.candidates()[0] for board in self.unsolved() if board.count() == 1))
+
+    def recommendations(self) -> list:
+        """Return the probe words ranked by the information they give summed over the unsolved boards (see
+        rank_boards), an empty list if they can't be ranked."""
+        boards = self.unsolved()
+        if len(boards) == 0:
+            return []
+        method = boards[0].recommender if boards[0].recommender != FREQUENCY else ENTROPY
+        # boards that haven't been told apart yet (at the start) rank like one board, and the book may have that
+        if all(board.mask == boards[0].mask for board in boards):
+            ranked = boards[0].recommendations()[1]
+            if len(ranked) > 0:
+                return ranked
+        # like a single board, unused words are what the ranking aims at if there are any
+        candidates = [new_possibles or old_possibles for new_possibles, old_possibles in map(Solver.split, boards)]
+        return rank_boards(candidates, method, RECOMMENDED_WORDS, boards[0].patterns)
+
+    def suggest(self, k=RECOMMENDED_WORDS) -> list:
+        """Return up to k recommended next guesses, best first: words that are certain on a board come first."""
+        suggestions = self.certain()
+        boards = self.unsolved()
+        # like a single board, the frequency recommender (or nothing that could be ranked) means the most likely words
+        ranked = self.recommendations() if len(boards) > 0 and boards[0].recommender != FREQUENCY else []
+        if len(ranked) == 0 and len(boards) > 0:
+            candidates = [new_possibles or old_possibles for new_possibles, old_possibles in map(Solver.split, boards)]
+            possibles = list(dict.fromkeys(word for board in candidates for word in board))
+            ranked = score_possibles(possibles, boards[0].WORDLE_list, boards[0].model, k + len(suggestions))
+        suggestions.extend(w[0] for w in ranked if w[0] not in suggestions)
+        return suggestions[:k]
+
+
+def process_boards(data, board_count):
+    """Process guesses for several WORDLE boards at once until every board is solved.
+        the GameData may still be loading, it is only waited for once a guess has to be worked on"""
+    game = data.new_boards(board_count) if data.ready() else None
+    print(f"Instead of a guess, enter '{UNDO_GUESS}' to take back the last guess")
+    while game is None or not game.solved():
+        while True:
+            guess = get_guess(data.known, data.used, commands=True)
+            if guess == UNDO_GUESS and game is not None and len(game.guesses) > 0:
+                print(f"Took back {game.guesses[-1]}, {game.undo():,} possible words over the unsolved boards")
+                continue
+            if guess[0] in (UNDO_GUESS, EDIT_RESULT, WHAT_IF):
+                print("There are no guesses to undo" if guess == UNDO_GUESS else f"Unknown command '{guess}'")
+                continue
+            print("Now, enter your guess in WORDLE and indicate the results on each board below:")
+            results = []
+            for k in range(board_count):
+                if game is not None and game.boards[k].solved():
+                    results.append(RIGHT_RIGHT * WORDLE_LENGTH)
+                    continue
+                print(f"Board {k + 1}:")
+                result = get_result(guess)
+                if CANCEL_WORD in result:
+                    break
+                results.append(RIGHT_RIGHT * WORDLE_LENGTH if RIGHT_WORD in result else result)
+            else:
+                break
+            print("Cancelling most recent guess")
+        if game is None:
+            game = data.new_boards(board_count)
+        # cut out the words that don't match on each board
+        game.apply(guess, results)
+        print()
+        write_lines(boards_lines(game))
+    print()
+    print(f"Success! You solved all {board_count} boards in {len(game.guesses)}. The guess sequence is:")
+    show_words(game.guesses, commas=False, lowercase=True, indent=True)
+    return game.guesses
+
+
+def boards_lines(game):
+    """Lay out the words that are still possible on each board of a multi-board game, and the recommendations."""
+    for k, board in enumerate(game.boards):
+        if board.solved():
+            yield f"Board {k + 1}: solved with {board.guesses[-1]} in {len(board.guesses)}"
+        else:
+            count = board.count()
+            yield f"Board {k + 1}: {count:,} possible words"
+            # only the words shown are taken from the board's mask
+            yield from word_lines(board.index.iter_words(board.mask), commas=False, upper_limit=BOARD_WORDS_SHOWN,
+                                  count=count)
+    if not game.solved():
+        # a word that is certain on one board is worth playing, otherwise the words that tell us the most
+        certain = game.certain()
+        if len(certain) > 0:
+            yield "Words that solve a board:"
+            yield from word_lines(certain, commas=False)
+        suggestions = [word for word in game.suggest() if word not in certain]
+        if len(suggestions) > 0:
+            yield f"Top {len(suggestions)} recommended guesses over the unsolved boards:"
+            yield from word_lines(suggestions, commas=False)
+
+
+class OpeningBook:
+    """Recommendations worked out ahead of time for the first turns of a game.
+        entries are keyed by the (guess, pattern code) pairs so far, and hold what Solver.recommendations returns"""
+
+    def __init__(self, key, entries=None):
+        self.key = key
+        self.entries = entries if entries is not None else {}
+
+    def get(self, guesses, results):
+        """Return the book's recommendations after these guesses and results, or None if the book doesn't have them."""
+        return self.entries.get(tuple(zip(guesses, map(result_to_code, results))))
+
+    def save(self, filename, words) -> None:
+        """Write the book to a file, with words stored as their positions in the vocabulary word list."""
+        if len(words) > 0xFFFF:
+            raise ValueError("the vocabulary is too big for an opening book")
+        position = {word: i for i, word in enumerate(words)}
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, WRITE_BINARY) as f:
+            f.write(BOOK_HEADER.pack(BOOK_MAGIC, BOOK_VERSION, self.key, len(words), len(self.entries)))
+            for turns, (scored_words, ranked) in self.entries.items():
+                f.write(BOOK_COUNT.pack(len(turns)))
+                f.write(b"".join(BOOK_GUESS.pack(position[guess], code) for guess, code in turns))
+                f.write(BOOK_COUNT.pack(len(scored_words)))
+                f.write(b"".join(BOOK_SCORED.pack(position[word], score) for word, score in scored_words))
+                f.write(BOOK_COUNT.pack(len(ranked)))
+                f.write(b"".join(BOOK_RANKED.pack(position[word], bits, worst) for word, bits, worst in ranked))
+        os.replace(temp_filename, filename)
+
+    @classmethod
+    def load(cls, filename, words, key):
+        """Read a book from a file, returning None if there is none or it was built for other words or weights."""
+        try:
+            with open(filename, READ_BINARY) as f:
+                data = f.read()
+            magic, version, book_key, word_count, entry_count = BOOK_HEADER.unpack_from(data, 0)
+            if magic != BOOK_MAGIC or version != BOOK_VERSION or book_key != key or word_count != len(words):
+                return None
+            offset = BOOK_HEADER.size
+            entries = {}
+
+            def read_records(record):
+                nonlocal offset
+                count = BOOK_COUNT.unpack_from(data, offset)[0]
+                offset += BOOK_COUNT.size
+                records = [record.unpack_from(data, offset + i * record.size) for i in range(count)]
+                offset += count * record.size
+                return records
+
+            for _ in range(entry_count):
+                turns = tuple((words[i], code) for i, code in read_records(BOOK_GUESS))
+                scored_words = [(words[i], score) for i, score in read_records(BOOK_SCORED)]
+                ranked = [(words[i], bits, worst) for i, bits, worst in read_records(BOOK_RANKED)]
+                entries[turns] = (scored_words, ranked)
+            return cls(key, entries)
+        except (OSError, IndexError, struct.error):
+            # missing or damaged book
+            return None
+
+
+def game_filename(suffix, word_len=0) -> str:
+    """Return the name of a file worked out for the words of a length: the vocabulary name, the word length and (if
+    the setup has answer sources) the first answer source, then the suffix."""
+    answer_sources = source_list(ANSWER_FILENAME)
+    answers = f".{os.path.basename(answer_sources[0])}" if len(answer_sources) > 0 else ""
+    return f"{vocabulary_name()}.{word_len or WORDLE_LENGTH}{answers}{suffix}"
+
+
+def book_filename(word_len=0) -> str:
+    """Return the name of the opening book file for words of a length (default WORDLE_LENGTH)."""
+    return BOOK_FILENAME if BOOK_FILENAME != "" else game_filename(BOOK_SUFFIX, word_len)
+
+
+def book_key(word_list, WORDLE_list, answers) -> bytes:
+    """Return the hash an opening book is keyed by: the vocabulary, the history, the words that can be the answer, the
+    word length and the scoring weights"""
+    word_len = len(word_list[0]) if len(word_list) > 0 else WORDLE_LENGTH
+    digest = hashlib.sha256(word_list_hash(word_list, WORDLE_list, answers))
+    digest.update(f"{word_len},{','.join(map(str, score_weights()))},{RECOMMENDER}".encode("ascii"))
+    return digest.digest()
+
+
+def book_openers(WORDLE_rounds, word_list) -> list:
+    """Return the opening words for the opening book: the setup list, or the openers used most in the history (of
+    those in the vocabulary word list)."""
+    openers = OPENERS.replace(COMMA, " ").upper().split()
+    if len(openers) == 0:
+        vocabulary = set(word_list)
+        played = Counter(a_round[0] for a_round in WORDLE_rounds if a_round[0] in vocabulary)
+        openers = [word for word, _ in played.most_common(BOOK_OPENERS)]
+    return openers
+
+
+def build_opening_book(solver, openers, depth=BOOK_DEPTH) -> OpeningBook:
+    """Work out the recommendations for every result of each opener, and for the turns after that up to depth guesses
+    (following the best recommendation each time)."""
+    book = OpeningBook(b"")
+    word_len = solver.index.word_len
+
+    def branch(state, guess):
+        # every result this guess can give against the remaining possible words leads to a book entry
+        for code in sorted(set(pattern_row(guess, state.candidates()))):
+            if code == PATTERN_WEIGHTS[word_len] - 1:
+                # all letters right, the game is over
+                continue
+            child = state.copy()
+            child.apply(guess, code_to_result(code, word_len))
+            scored_words, ranked = child.recommendations()
+            book.entries[tuple(zip(child.guesses, map(result_to_code, child.results)))] = (scored_words, ranked)
+            best = ranked or scored_words
+            if len(child.guesses) < depth - 1 and len(best) > 0:
+                branch(child, best[0][0])
+
+    for opener in openers:
+        branch(solver, opener)
+    return book
+
+
+def load_opening_book(word_list, WORDLE_list, answers):
+    """Read the opening book, if there is one that still matches the vocabulary, history, answers and scoring
+    weights"""
+    return OpeningBook.load(book_filename(), word_list, book_key(word_list, WORDLE_list, answers))
+
+
+def build_book(setup_filename) -> None:
+    """Build the opening book for the current vocabulary, history and scoring weights, and save it."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    word_list, word_index, patterns, WORDLE_list, WORDLE_rounds, _, _ = load_game_data()
+    openers = book_openers(WORDLE_rounds, word_list)
+    if len(openers) == 0:
+        print("There are no openers for the opening book, set some with 'Openers' in the setup file")
+        return
+    vocabulary = set(word_list)
+    for opener in openers:
+        if len(opener) != WORDLE_LENGTH:
+            print(f"The book opener, {opener}, is not {WORDLE_LENGTH} letters long")
+            return
+        if opener not in vocabulary:
+            print(f"The book opener, {opener}, is not in the vocabulary list")
+            return
+    print(f"Building the opening book for {', '.join(openers)} ({BOOK_DEPTH} guesses deep)...")
+    start = time.perf_counter()
+    book = build_opening_book(Solver(word_index, WORDLE_list, patterns), openers, BOOK_DEPTH)
+    book.key = book_key(word_list, WORDLE_list, word_index.words)
+    book.save(book_filename(), word_list)
+    print(f"Opening book of {len(book.entries):,} entries written to '{book_filename()}' "
+          f"in {time.perf_counter() - start:.1f}s")
+
+
+class DecisionTree:
+    """A complete strategy for a set of answers: the guess to make at each node and the node each result leads to.
+        a node is (guess, {pattern code: child node}), so following the tree is one dict lookup per turn"""
+
+    def __init__(self, key, root, answer_count=0, total=0, depth=0):
+        self.key = key
+        self.root = root
+        self.answer_count = answer_count
+        self.total = total
+        self.depth = depth
+
+    def mean(self) -> float:
+        """Return the average number of guesses the tree takes over its answers."""
+        return self.total / self.answer_count if self.answer_count > 0 else 0.0
+
+    def save(self, filename, words) -> None:
+        """Write the tree to a file, with words stored as their positions in the vocabulary word list."""
+        if len(words) > 0xFFFF:
+            raise ValueError("the vocabulary is too big for a strategy tree")
+        position = {word: i for i, word in enumerate(words)}
+        records = []
+        node_count = 0
+
+        def write_node(node):
+            nonlocal node_count
+            node_count += 1
+            guess, children = node
+            records.append(TREE_NODE.pack(position[guess], len(children)))
+            for code, child in sorted(children.items()):
+                records.append(TREE_CODE.pack(code))
+                write_node(child)
+
+        write_node(self.root)
+        temp_filename = filename + ".tmp"
+        with open(temp_filename, WRITE_BINARY) as f:
+            f.write(TREE_HEADER.pack(TREE_MAGIC, TREE_VERSION, self.key, len(words), self.answer_count, node_count,
+                                     self.total, self.depth))
+            f.write(b"".join(records))
+        os.replace(temp_filename, filename)
+
+    @classmethod
+    def load(cls, filename, words, key):
+        """Read a tree from a file, returning None if there is none or it was built for another vocabulary."""
+        try:
+            with open(filename, READ_BINARY) as f:
+                data = f.read()
+            magic, version, tree_key, word_count, answer_count, node_count, total, depth = \
+                TREE_HEADER.unpack_from(data, 0)
+            if magic != TREE_MAGIC or version != TREE_VERSION or tree_key != key or word_count != len(words):
+                return None
+            offset = TREE_HEADER.size
+
+            def read_node():
+                nonlocal offset
+                guess, child_count = TREE_NODE.unpack_from(data, offset)
+                offset += TREE_NODE.size
+                children = {}
+                for _ in range(child_count):
+                    code = TREE_CODE.unpack_from(data, offset)[0]
+                    offset += TREE_CODE.size
+                    children[code] = read_node()
+                return words[guess], children
+
+            return cls(key, read_node(), answer_count, total, depth)
+        except (OSError, IndexError, struct.error):
+            # missing or damaged tree
+            return None
+
+
+def node_depth(node) -> int:
+    """Return the most guesses a strategy tree node can take to find the answer, its own guess included."""
+    guess, children = node
+    return 1 + max(map(node_depth, children.values()), default=0)
+
+
+def tree_filename(word_len=0) -> str:
+    """Return the name of the strategy tree file for words of a length (default WORDLE_LENGTH)."""
+    return TREE_FILENAME if TREE_FILENAME != "" else game_filename(TREE_SUFFIX, word_len)
+
+
+def tree_key(word_list, answers, covered, objective) -> bytes:
+    """Return the hash a strategy tree is keyed by: the vocabulary, the words that can be the answer, the answers the
+    tree covers, the objective and the word length"""
+    word_len = len(word_list[0]) if len(word_list) > 0 else WORDLE_LENGTH
+    digest = hashlib.sha256(word_list_hash(word_list, answers, covered))
+    digest.update(f"{word_len},{objective}".encode("ascii"))
+    return digest.digest()
+
+
+def tree_answers(word_list, answers, WORDLE_list) -> list:
+    """Return the answers the strategy tree covers (see TREE_ANSWERS), in vocabulary order."""
+    if TREE_ANSWERS == "history":
+        # only the previous WORDLE words that are in the vocabulary can be guessed
+        previous = set(WORDLE_list)
+        return [word for word in word_list if word in previous]
+    if TREE_ANSWERS == "unused":
+        previous = set(WORDLE_list)
+        return [word for word in answers if word not in previous]
+    return list(answers)
+
+
+# what a strategy tree worker process searches with (set once per process by init_tree_worker)
+_tree_matrix = None
+_tree_members = []
+_tree_probes = []
+_tree_letters = []
+_tree_objective = EXPECTED
+_tree_memo = {}
+_tree_x_log_x = []
+
+
+def tree_order(total, depth, objective=EXPECTED) -> tuple:
+    """Return what a tree (or subtree) is judged on, smaller is better: its total guesses over its answers and its
+    worst-case number of guesses, in the order the objective puts them."""
+    return (depth, total) if objective == WORST else (total, depth)
+
+
+def init_tree_worker(pattern_filename, word_list, answers, probes, objective) -> None:
+    """Give a strategy tree worker process the (memory-mapped) pattern matrix of the vocabulary against the answers,
+    the extra probe words it may guess and an empty table of solved subsets."""
+    global _tree_matrix
+    global _tree_members
+    global _tree_probes
+    global _tree_letters
+    global _tree_objective
+    global _tree_memo
+    global _tree_x_log_x
+    _tree_matrix = PatternMatrix(pattern_filename, word_list, answers)
+    position = {word: i for i, word in enumerate(word_list)}
+    _tree_members = [position[answer] for answer in answers]
+    _tree_probes = probes
+    # the letters of every vocabulary word as a bitmask, to pick the probe words for a set of answers
+    _tree_letters = [sum(1 << (ord(lett) - ord("A")) for lett in set(word)) for word in word_list]
+    _tree_objective = objective
+    _tree_memo = {}
+    _tree_x_log_x = [0.0] + [c * math.log2(c) for c in range(1, len(answers) + 1)]
+
+
+def subset_probes(subset):
+    """Yield the TREE_SUBSET_PROBES vocabulary words (as positions) with the most letters that some, but not all, of
+    the answers in a subset have. nothing is worked out until the first word is asked for"""
+    letters = [_tree_letters[_tree_members[a]] for a in subset]
+    telling = functools.reduce(operator.or_, letters) & ~functools.reduce(operator.and_, letters)
+    if telling != 0:
+        yield from heapq.nlargest(TREE_SUBSET_PROBES, range(len(_tree_letters)),
+                                  key=lambda p: (_tree_letters[p] & telling).bit_count())
+
+
+def solve_subset(subset) -> tuple:
+    """Build the best strategy subtree that can be found for a set of answers (a sorted tuple of answer numbers).
+        returns (total guesses over the answers, worst-case guesses, node), where the node's words are vocabulary
+        positions. the same subsets turn up again and again, so each one is only solved once per worker"""
+    cached = _tree_memo.get(subset)
+    if cached is not None:
+        return cached
+    n = len(subset)
+    if n == 1:
+        result = (1, 1, (_tree_members[subset[0]], {}))
+    elif n == 2:
+        # guess one, and the other one if that was wrong
+        first, second = subset
+        code = _tree_matrix.row(_tree_members[first])[second]
+        result = (3, 2, (_tree_members[first], {code: (_tree_members[second], {})}))
+    else:
+        result = None
+        pick = operator.itemgetter(*subset)
+        members = {_tree_members[a] for a in subset}
+        log_n = math.log2(n)
+        # rank the guesses by expected information, a word that might be the answer wins a tie
+        scored = []
+        # the subset's own probe words are only looked for if none of its answers tells all the others apart
+        tried = set()
+        for probe in itertools.chain(members, _tree_probes, subset_probes(subset)):
+            if probe in tried:
+                continue
+            tried.add(probe)
+            groups = Counter(pick(_tree_matrix.row(probe)))
+            if len(groups) == 1 and probe not in members:
+                # tells us nothing
+                continue
+            if len(groups) == n and probe in members:
+                # every other answer is told apart, nothing can do better than that
+                scored = [(0.0, False, probe)]
+                break
+            bits = log_n - sum(map(_tree_x_log_x.__getitem__, groups.values())) / n
+            scored.append((-bits, probe not in members, probe))
+        best_order = None
+        for _, _, probe in heapq.nsmallest(TREE_BEAM, scored):
+            row = _tree_matrix.row(probe)
+            groups = {}
+            for a in subset:
+                groups.setdefault(row[a], []).append(a)
+            # the answer itself needs no more guesses
+            groups.pop(PATTERN_WEIGHTS[_tree_matrix.word_len] - 1, None)
+            # every answer left needs at least one more guess, all but one of them at least two
+            bound = sum(2 * len(group) - 1 for group in groups.values())
+            depth_bound = 2 if len(groups) > 0 else 1
+            if best_order is not None and tree_order(n + bound, depth_bound, _tree_objective) >= best_order:
+                continue
+            total = n
+            depth = 1
+            children = {}
+            # the biggest groups first, they are the most likely to show this guess is no good
+            for code, group in sorted(groups.items(), key=lambda g: -len(g[1])):
+                sub_total, sub_depth, children[code] = solve_subset(tuple(group))
+                bound -= 2 * len(group) - 1
+                total += sub_total
+                depth = max(depth, sub_depth + 1)
+                if best_order is not None and \
+                        tree_order(total + bound, max(depth, depth_bound), _tree_objective) >= best_order:
+                    break
+            else:
+                result = (total, depth, (probe, children))
+                best_order = tree_order(total, depth, _tree_objective)
+    _tree_memo[subset] = result
+    return result
+
+
+def solve_branch(branch) -> tuple:
+    """Solve the subtree for one result of an opener. branch: (opener, pattern code, answer numbers)"""
+    opener, code, subset = branch
+    return (opener, code) + solve_subset(subset)
+
+
+def build_decision_tree(word_list, answers, objective=EXPECTED, opener="", processes=None) -> DecisionTree:
+    """Build a strategy tree for the answers: from the opener (or the best of the TREE_OPENERS openers with the most
+    expected information), branch on every result and pick each subtree's guess to minimize the objective.
+        the subtrees below the openers are spread across a process pool"""
+    word_len = len(answers[0]) if len(answers) > 0 else WORDLE_LENGTH
+    if TREE_ANSWERS == "vocabulary" or answers == word_list:
+        pattern_filename = pattern_filename_for(word_len)
+    else:
+        pattern_filename = f"{vocabulary_name()}.{word_len}.{TREE_ANSWERS}{PATTERN_SUFFIX}"
+    matrix = load_pattern_matrix(word_list, answers, pattern_filename)
+    # the words with the most expected information over all the answers are the openers and the extra probes
+    ranked = matrix.rank(answers, ENTROPY, len(word_list))
+    matrix.close()
+    position = {word: i for i, word in enumerate(word_list)}
+    answer_set = set(answers)
+    probes = [position[word] for word, _, _ in ranked if word not in answer_set][:TREE_PROBES]
+    openers = [opener] if opener != "" else [word for word, _, _ in ranked[:TREE_OPENERS]]
+
+    init_tree_worker(pattern_filename, word_list, answers, probes, objective)
+    branches = []
+    for word in openers:
+        row = _tree_matrix.row(position[word])
+        groups = {}
+        for a in range(len(answers)):
+            groups.setdefault(row[a], []).append(a)
+        groups.pop(PATTERN_WEIGHTS[word_len] - 1, None)
+        branches.extend((position[word], code, tuple(group)) for code, group in groups.items())
+    # the biggest subtrees first, so the pool isn't left waiting on one of them at the end
+    branches.sort(key=lambda b: -len(b[2]))
+
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        solved = list(map(solve_branch, branches))
+    else:
+        with multiprocessing.Pool(processes, init_tree_worker,
+                                  (pattern_filename, word_list, answers, probes, objective)) as pool:
+            solved = list(pool.imap_unordered(solve_branch, branches))
+    _tree_matrix.close()
+
+    # put each opener's subtrees together and keep the best opener
+    trees = {position[word]: [len(answers), 1, {}] for word in openers}
+    for opener_position, code, total, depth, node in solved:
+        tree = trees[opener_position]
+        tree[0] += total
+        tree[1] = max(tree[1], depth + 1)
+        tree[2][code] = node
+    opener_position, (total, depth, children) = min(trees.items(), key=lambda t: tree_order(t[1][0], t[1][1],
+                                                                                             objective))
+
+    def node_words(node):
+        guess, node_children = node
+        return word_list[guess], {code: node_words(child) for code, child in node_children.items()}
+
+    # the caller keys the tree by what it's looked up with
+    return DecisionTree(b"", node_words((opener_position, children)), len(answers), total, depth)
+
+
+def load_decision_tree(word_list, answers, WORDLE_list):
+    """Read the strategy tree, if there is one for this vocabulary, the words that can be the answer, the word length
+    and the tree answers and objective of the setup."""
+    covered = tree_answers(word_list, answers, WORDLE_list)
+    return DecisionTree.load(tree_filename(), word_list, tree_key(word_list, answers, covered, TREE_OBJECTIVE))
+
+
+def build_tree(setup_filename, opener="", processes=None) -> None:
+    """Build the strategy tree for the current vocabulary and the answers chosen in the setup file, and save it."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    vocabulary = Vocabulary(WORD_FILENAME)
+    word_list = vocabulary.words(WORDLE_LENGTH)
+    WORDLE_list, _ = read_WORDLE_list(*history_filenames())
+    answers = tree_answers(word_list, vocabulary.answers(WORDLE_LENGTH), WORDLE_list)
+    if len(answers) == 0:
+        print(f"There are no {TREE_ANSWERS} answers for the strategy tree")
+        return
+    opener = (opener or TREE_OPENER).upper()
+    if opener != "" and opener not in word_list:
+        print(f"The tree opener, {opener}, is not in the vocabulary list")
+        return
+    print(f"Building the strategy tree for {len(answers):,} answers ({TREE_OBJECTIVE.lower()} guesses, "
+          f"{'opening with ' + opener if opener != '' else f'trying {TREE_OPENERS} openers'})...")
+    start = time.perf_counter()
+    tree = build_decision_tree(word_list, answers, TREE_OBJECTIVE, opener, processes)
+    # games look the tree up by the words that can be the answer, whichever answers it was built for
+    tree.key = tree_key(word_list, vocabulary.answers(WORDLE_LENGTH), answers, TREE_OBJECTIVE)
+    tree.save(tree_filename(), word_list)
+    print(f"Strategy tree opening with {tree.root[0]} written to '{tree_filename()}' in "
+          f"{time.perf_counter() - start:.1f}s: {tree.mean():.3f} guesses on average, {tree.depth} at most")
+    if tree.depth > WORDLE_TRIES:
+        print(f"Warning: some answers take more than {WORDLE_TRIES} guesses, games leave the tree for the suggestions "
+              f"once a branch can't finish in the tries left")
+
+
+def show_stats(rounds, stats=None):
+    """Show the statistics and bar chart for all the WORDLE games the user has played.
+        the running totals in a RoundStats can be given to save counting the rounds again"""
+    if stats is None:
+        stats = RoundStats(rounds)
+    tries_table = stats.tries_table
+    total_rounds = stats.total_rounds
+    if total_rounds == 0:
+        print("No WORDLE games have been played yet")
+        return
+    total_tries = 0
+    for i in range(len(tries_table)):
+        total_tries += (i+1) * tries_table[i]
+    print(f"Win tries chart (mean: {total_tries / total_rounds:.3} after {total_rounds} games):")
+    m = max(max(tries_table), 1)
+    for i, v in enumerate(tries_table):
+        print(f"{i+1:2} ({v:3}) {'=' * int(v / m * LINE_LENGTH)}")
+
+
+# what a simulation worker process plays with (set once per process by init_simulation_worker)
+_simulation_index = None
+_simulation_history = []
+_simulation_patterns = None
+_simulation_strategy = FREQUENCY
+
+
+def init_simulation_worker(word_list, answers, WORDLE_list, strategy, pattern_filename) -> None:
+    """Give a simulation worker process its own index of the answer words, history and (memory-mapped) pattern
+    matrix of the vocabulary words against the answer words"""
+    global _simulation_index
+    global _simulation_history
+    global _simulation_patterns
+    global _simulation_strategy
+    _simulation_index = WordIndex(answers)
+    _simulation_history = WORDLE_list
+    _simulation_patterns = PatternMatrix(pattern_filename, word_list, answers) if strategy != FREQUENCY else None
+    _simulation_strategy = strategy
+
+
+def simulate_game(game) -> dict:
+    """Let the solver play one game against a known answer, using the history of the rounds before it.
+        game: (answer, number of history words known at the start of the game, opening guess)"""
+    answer, history_length, opener = game
+    start = time.perf_counter()
+    solver = Solver(_simulation_index, _simulation_history[:history_length], _simulation_patterns,
+                    _simulation_strategy)
+    phases = {"suggest": 0.0, "filter": 0.0}
+    guess = opener
+    while True:
+        # work out the result WORDLE would show and cut down the possible words with it
+        phase_start = time.perf_counter()
+        solver.apply(guess, code_to_result(feedback_code(guess, answer), len(answer)))
+        phases["filter"] += time.perf_counter() - phase_start
+        if guess == answer or len(solver.guesses) >= SIMULATION_TRY_LIMIT:
+            break
+        phase_start = time.perf_counter()
+        suggestions = solver.suggest(1)
+        phases["suggest"] += time.perf_counter() - phase_start
+        if len(suggestions) == 0:
+            # the answer isn't in the vocabulary, so the solver has nothing left to offer
+            break
+        guess = suggestions[0]
+    return {"answer": answer, "guesses": solver.guesses, "tries": len(solver.guesses), "solved": guess == answer,
+            "seconds": time.perf_counter() - start, "phases": phases}
+
+
+def counted_tries(tries) -> int:
+    """Return what a game adds to a mean number of tries: the tries it took, or one more than the limit if it wasn't
+    solved (0 tries), so giving up on the hard games can't improve the mean"""
+    return tries if tries > 0 else SIMULATION_TRY_LIMIT + 1
+
+
+def simulate(setup_filename, against="history", strategy=FREQUENCY, opener="", processes=None, limit=0,
+             output_filename=SIMULATION_FILENAME) -> dict:
+    """Play the solver against every historical WORDLE answer (or every word that can be the answer) and report how
+    it did.
+        games are spread across a process pool, and the results are written to a JSON file"""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    start = time.perf_counter()
+    vocabulary = Vocabulary(WORD_FILENAME)
+    word_list = vocabulary.words(WORDLE_LENGTH)
+    answers = vocabulary.answers(WORDLE_LENGTH)
+    WORDLE_list, _ = read_WORDLE_list(*history_filenames())
+    pattern_filename = pattern_filename_for(WORDLE_LENGTH)
+    if strategy != FREQUENCY:
+        load_pattern_matrix(word_list, answers, pattern_filename).close()
+
+    # a historical answer is played knowing only the rounds before it, a vocabulary word knowing all of them
+    if against == "history":
+        games = [(answer.upper(), i) for i, answer in enumerate(WORDLE_list)]
+    else:
+        games = [(answer, len(WORDLE_list)) for answer in answers]
+    if limit > 0:
+        games = games[:limit]
+
+    # every game opens with the same word, so it only has to be worked out once
+    init_simulation_worker(word_list, answers, WORDLE_list, strategy, pattern_filename)
+    if opener == "":
+        opener = Solver(_simulation_index, WORDLE_list, _simulation_patterns, strategy).suggest(1)[0]
+    opener = opener.upper()
+    games = [(answer, history_length, opener) for answer, history_length in games]
+    print(f"Simulating {len(games):,} games against the {against} with the {strategy.lower()} strategy, "
+          f"opening with {opener}...")
+
+    setup_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    processes = processes or os.cpu_count() or 1
+    if processes == 1:
+        results = [simulate_game(game) for game in games]
+    else:
+        with multiprocessing.Pool(processes, init_simulation_worker,
+                                  (word_list, answers, WORDLE_list, strategy, pattern_filename)) as pool:
+            results = pool.map(simulate_game, games, chunksize=max(1, len(games) // (processes * 8)))
+    play_seconds = time.perf_counter() - start
+
+    # summarize the games: distribution of tries, failures and where the time went
+    distribution = Counter(game["tries"] for game in results if game["solved"])
+    failures = sum(1 for game in results if not game["solved"] or game["tries"] > WORDLE_TRIES)
+    solved_tries = [game["tries"] for game in results if game["solved"]]
+    game_seconds = [game["seconds"] for game in results]
+    summary = {
+        "strategy": strategy.lower(),
+        "against": against,
+        "opener": opener,
+        "games": len(results),
+        "solved": len(solved_tries),
+        "failures": failures,
+        "failure_rate": failures / len(results) if len(results) > 0 else 0.0,
+        # over every game, as --tune counts them
+        "mean_tries": (sum(counted_tries(game["tries"] if game["solved"] else 0) for game in results) / len(results)
+                       if len(results) > 0 else 0.0),
+        "distribution": {str(tries): distribution[tries] for tries in range(1, SIMULATION_TRY_LIMIT + 1)},
+        "processes": processes,
+        "setup_seconds": setup_seconds,
+        "play_seconds": play_seconds,
+        "mean_game_seconds": sum(game_seconds) / len(game_seconds) if len(game_seconds) > 0 else 0.0,
+        "max_game_seconds": max(game_seconds, default=0.0),
+        "phase_seconds": {phase: sum(game["phases"][phase] for game in results) for phase in ("suggest", "filter")},
+        "results": results,
+    }
+    with open(output_filename, WRITE_FILE) as f:
+        json.dump(summary, f, indent=1)
+    show_simulation(summary)
+    print(f"Simulation results written to '{output_filename}'")
+    return summary
+
+
+def show_simulation(summary) -> None:
+    """Show the statistics and bar chart for a simulation run."""
+    print(f"Simulated tries chart (mean: {summary['mean_tries']:.3} after {summary['games']:,} games, "
+          f"{summary['failures']:,} failures = {summary['failure_rate']:.2%}):")
+    m = max(max(summary["distribution"].values()), 1)
+    for tries, v in summary["distribution"].items():
+        print(f"{int(tries):2} ({v:4}) {'=' * int(v / m * LINE_LENGTH)}")
+    phases = ", ".join(f"{phase} {seconds:.2f}s" for phase, seconds in summary["phase_seconds"].items())
+    print(f"Time: setup {summary['setup_seconds']:.2f}s, play {summary['play_seconds']:.2f}s on "
+          f"{summary['processes']} processes (per game: mean {summary['mean_game_seconds'] * 1000:.1f}ms, "
+          f"max {summary['max_game_seconds'] * 1000:.1f}ms; {phases})")
+
+
+# what a tuning worker process plays with (set once per process by init_tuning_worker)
+_tuning_index = None
+_tuning_history = []
+_tuning_weights = []
+_tuning_openers = []
+
+
+def init_tuning_worker(word_list, WORDLE_list, weight_sets, openers) -> None:
+    """Give a tuning worker process its own word index and history, and the weight sets (and their openers)."""
+    global _tuning_index
+    global _tuning_history
+    global _tuning_weights
+    global _tuning_openers
+    _tuning_index = WordIndex(word_list)
+    _tuning_history = WORDLE_list
+    _tuning_weights = weight_sets
+    _tuning_openers = openers
+
+
+def tune_game(game) -> list:
+    """Play one game against a known answer with each weight set, using the history of the rounds before it.
+        the words left after each run of guesses are worked out once and shared by every weight set that makes
+        those guesses, so mostly only the scoring is done again for each weight set
+        game: (answer, number of history words known at the start of the game)
+        returns the tries each weight set took (0 if it didn't solve the game)"""
+    answer, history_length = game
+    index = _tuning_index
+    history = _tuning_history[:history_length]
+    model = FrequencyModel(history, index.word_len)
+    unused_mask = index.all & ~index.mask_of(set(history))
+    # run of guesses -> (mask of the words left, the words the next guess is picked from)
+    words_left = {(): (index.all, [])}
+    tries = []
+    for weights, opener in zip(_tuning_weights, _tuning_openers):
+        guesses = (opener,)
+        while guesses[-1] != answer and len(guesses) < SIMULATION_TRY_LIMIT:
+            if guesses not in words_left:
+                # only the last guess cuts down the words left after the guesses before it
+                guess = guesses[-1]
+                can = [ALPHABET] * index.word_len
+                at_least = {}
+                definite = [""] * index.word_len
+                update_constraints(guess, code_to_result(feedback_code(guess, answer), index.word_len), can,
+                                   at_least, definite)
+                mask = words_left[guesses[:-1]][0] & index.match(can, at_least, definite)
+                words_left[guesses] = (mask, index.words_of(mask & unused_mask) or index.words_of(mask))
+            picks = words_left[guesses][1]
+            if len(picks) == 0:
+                # the answer isn't in the vocabulary
+                break
+            guesses += (max(picks, key=lambda word: weighted_score(model.features(word), weights)),)
+        tries.append(len(guesses) if guesses[-1] == answer else 0)
+    return tries
+
+
+def tuning_weight_sets(search, samples, seed=0) -> list:
+    """Return the weight sets a tuning sweep tries: every mix of the TUNING_GRID values, or a random sample of them.
+        the setup's own weights come first, to compare the others with"""
+    grid = [values for _, values in TUNING_GRID]
+    if search == "grid":
+        weight_sets = [ScoreWeights(*values) for values in itertools.product(*grid)]
+    else:
+        # pick grid points by number, so none is picked twice and the whole grid is never built
+        size = math.prod(len(values) for values in grid)
+        weight_sets = []
+        for number in random.Random(seed).sample(range(size), min(samples, size)):
+            values = []
+            for choices in reversed(grid):
+                number, k = divmod(number, len(choices))
+                values.append(choices[k])
+            weight_sets.append(ScoreWeights(*reversed(values)))
+    setup_weights = score_weights()
+    return [setup_weights] + [weights for weights in weight_sets if weights != setup_weights]
+
+
+def format_setup_value(value) -> str:
+    """Return a number as it is written in the setup file (whole numbers without a decimal point)."""
+    return str(int(value)) if float(value).is_integer() else f"{value:g}"
+
+
+def write_setup_values(setup_filename, filename, values, comment="") -> None:
+    """Write a copy of a setup file with new values for some of its names (keeping its other lines and comments).
+        names that aren't in the setup file are added at the end, after the comment"""
+    try:
+        with open(setup_filename, READ_FILE) as f:
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        lines = []
+    missing = {name.upper(): (name, value) for name, value in values.items()}
+    for i, line in enumerate(lines):
+        setting, hash_mark, line_comment = line.partition("#")
+        name = setting.split("=", 1)[0]
+        if "=" in setting and name.strip().upper() in missing:
+            _, value = missing.pop(name.strip().upper())
+            lines[i] = f"{name.rstrip()} = {format_setup_value(value)}"
+            if hash_mark != "":
+                # keep the comment where it was
+                lines[i] += f"{setting[len(setting.rstrip()):] or ' '}{hash_mark}{line_comment}"
+    if len(missing) > 0:
+        lines.append("")
+        if comment != "":
+            lines.append(f"# {comment}")
+        lines.extend(f"{name} = {format_setup_value(value)}" for name, value in missing.values())
+    temp_filename = filename + ".tmp"
+    with open(temp_filename, WRITE_FILE) as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(temp_filename, filename)
+
+
+def tune(setup_filename, search="random", samples=TUNING_SAMPLES, processes=None, limit=0,
+         output_filename=TUNING_FILENAME, seed=0) -> list:
+    """Replay every historical WORDLE answer with many sets of scoring weights and find the ones that lose the fewest
+    games, then take the fewest tries.
+        games are spread across a process pool, and the best weights are written to a setup file
+        returns the summary of each weight set, best first"""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    start = time.perf_counter()
+    # only the words that can be the answer are filtered and scored
+    word_list = Vocabulary(WORD_FILENAME).answers(WORDLE_LENGTH)
+    WORDLE_list, _ = read_WORDLE_list(*history_filenames())
+    weight_sets = tuning_weight_sets(search, samples, seed)
+
+    # like --simulate, every game opens with the best word for the whole history, which depends on the weights
+    index = WordIndex(word_list)
+    model = FrequencyModel(WORDLE_list, index.word_len)
+    picks = index.words_of(index.all & ~index.mask_of(set(WORDLE_list))) or word_list
+    features = [model.features(word) for word in picks]
+    openers = [picks[max(range(len(picks)), key=lambda i: weighted_score(features[i], weights))]
+               for weights in weight_sets]
+
+    games = [(answer.upper(), i) for i, answer in enumerate(WORDLE_list)]
+    if limit > 0:
+        games = games[:limit]
+    processes = processes or os.cpu_count() or 1
+    print(f"Tuning the scoring weights over {len(games):,} games with {len(weight_sets):,} weight sets "
+          f"({search} search) on {processes} processes...")
+    if processes == 1:
+        init_tuning_worker(word_list, WORDLE_list, weight_sets, openers)
+        game_tries = [tune_game(game) for game in games]
+    else:
+        with multiprocessing.Pool(processes, init_tuning_worker,
+                                  (word_list, WORDLE_list, weight_sets, openers)) as pool:
+            game_tries = pool.map(tune_game, games, chunksize=max(1, len(games) // (processes * 8)))
+
+    # add up the tries of each weight set (see counted_tries)
+    solved = [0] * len(weight_sets)
+    total_tries = [0] * len(weight_sets)
+    failures = [0] * len(weight_sets)
+    for tries in game_tries:
+        for k, game_tries_taken in enumerate(tries):
+            if game_tries_taken > 0:
+                solved[k] += 1
+            total_tries[k] += counted_tries(game_tries_taken)
+            if game_tries_taken == 0 or game_tries_taken > WORDLE_TRIES:
+                failures[k] += 1
+
+    results = [{"weights": weights._asdict(), "opener": opener, "solved": solved[k], "failures": failures[k],
+                "mean_tries": total_tries[k] / len(games) if len(games) > 0 else 0.0}
+               for k, (weights, opener) in enumerate(zip(weight_sets, openers))]
+    setup_result = results[0]
+    # losing a game (more than WORDLE_TRIES tries) matters more than a fraction of a try on average
+    results.sort(key=lambda result: (result["failures"], result["mean_tries"]))
+    show_tuning(results, setup_result, time.perf_counter() - start)
+
+    best = results[0]
+    names = [name for name, _ in TUNING_GRID]
+    write_setup_values(setup_filename, output_filename, dict(zip(names, best["weights"].values())),
+                       "scoring weights found by --tune")
+    print(f"Best weights written to '{output_filename}' (use it with --setup)")
+    return results
+
+
+def show_tuning(results, setup_result, seconds) -> None:
+    """Show the best weight sets of a tuning sweep, and how the setup's own weights did."""
+    print(f"Best {min(TUNING_SHOWN, len(results))} of {len(results):,} weight sets "
+          f"(letter, first, last, plural, duplicate):")
+    for result in results[:TUNING_SHOWN] + ([setup_result] if setup_result not in results[:TUNING_SHOWN] else []):
+        weights = ", ".join(format_setup_value(value) for value in result["weights"].values())
+        print(f"  {weights:<22} {result['opener']}  mean {result['mean_tries']:.4f} tries, "
+              f"{result['failures']:,} failures{' (setup)' if result is setup_result else ''}")
+    print(f"Time: {seconds:.1f}s")
+
+
+def load_vocabulary_data(log=print) -> tuple:
+    """Read the vocabulary and build the index (and pattern matrix) of the possible WORDLE words.
+        returns (vocabulary, word_list, word_index, pattern matrix or None), where word_index only has the words that
+        can be the answer (all of word_list, unless the setup has answer sources)"""
+    # read the vocabulary once for all word lengths, then pick out the list of possible WORDLE words
+    vocabulary = Vocabulary(WORD_FILENAME)
+    word_list = vocabulary.words(WORDLE_LENGTH)
+    answers = vocabulary.answers(WORDLE_LENGTH)
+    log(f"{WORDLE_LENGTH}-letter vocabulary words loaded: {len(word_list):,} words" +
+        (f", {len(answers):,} of them can be the answer" if len(answers) < len(word_list) else ""))
+    # games only filter and score the words that can be the answer
+    word_index = vocabulary.answer_index(WORDLE_LENGTH)
+    # the information-based recommenders rank every vocabulary word against every possible answer
+    patterns = load_pattern_matrix(word_list, answers, log=log) if RECOMMENDER != FREQUENCY else None
+    return vocabulary, word_list, word_index, patterns
+
+
+def load_history_data(log=print) -> tuple:
+    """Read the list of previous WORDLE words (also the list of guesses for each round).
+        returns (WORDLE_list, WORDLE_rounds)"""
+    WORDLE_list, WORDLE_rounds = read_WORDLE_list(*history_filenames())
+    log(f"Previous WORDLE words loaded: {len(WORDLE_list):,} words")
+    return WORDLE_list, WORDLE_rounds
+
+
+def load_game_data(log=print) -> tuple:
+    """Read the vocabulary and the WORDLE history, and build what the solver needs from them.
+        returns (word_list, word_index, pattern matrix or None, WORDLE_list, WORDLE_rounds, opening book or None,
+                 vocabulary)"""
+    vocabulary, word_list, word_index, patterns = load_vocabulary_data(log)
+    WORDLE_list, WORDLE_rounds = load_history_data(log)
+
+    # the opening book is only good for the vocabulary, history and weights it was built with
+    book = load_opening_book(word_list, WORDLE_list, word_index.words)
+    if book is not None:
+        log(f"Opening book loaded: {len(book.entries):,} entries")
+    return word_list, word_index, patterns, WORDLE_list, WORDLE_rounds, book, vocabulary
+
+
+class GameData:
+    """The vocabulary, the WORDLE history and everything built from them, loaded on background threads that start as
+    soon as the setup file has been read, so the first prompt doesn't wait for them.
+        each part is only waited for when it is first needed: the vocabulary and history lookups (known and used)
+        once a guess has been entered, everything else (wait) once a guess has to be worked on"""
+
+    def __init__(self):
+        # messages from the loading threads are held back until wait(), so they don't land in the middle of a prompt
+        self.messages = []
+        self.vocabulary_data = Deferred(load_vocabulary_data, self.messages.append)
+        self.history_data = Deferred(self.load_history)
+        self.extras = Deferred(self.load_extras)
+        self.known = Deferred(lambda: frozenset(self.vocabulary_data.get()[1]))
+        self.used = Deferred(lambda: self.history_data.get()[2])
+        self.loaded = False
+
+    def load_history(self) -> tuple:
+        """Read the history, with its stats (and letter frequencies) and the set of previous WORDLE words."""
+        WORDLE_list, WORDLE_rounds = load_history_data(self.messages.append)
+        # the tries chart and the letter frequencies of the previous WORDLE words come from the stats sidecar (or
+        # are counted once), then they are kept up to date round by round
+        stats = load_round_stats(history_filenames()[0], WORDLE_rounds)
+        return WORDLE_list, WORDLE_rounds, set(WORDLE_list), stats
+
+    def load_extras(self) -> tuple:
+        """Read the opening book and the strategy tree, which need the vocabulary and the history."""
+        _, word_list, word_index, _ = self.vocabulary_data.get()
+        WORDLE_list = self.history_data.get()[0]
+        # the opening book is only good for the vocabulary, history, answers and weights it was built with
+        book = load_opening_book(word_list, WORDLE_list, word_index.words)
+        if book is not None:
+            self.messages.append(f"Opening book loaded: {len(book.entries):,} entries")
+        # the strategy tree (built with --build-tree) is followed for as long as a round stays in it
+        tree = load_decision_tree(word_list, word_index.words, WORDLE_list)
+        if tree is not None:
+            self.messages.append(f"Strategy tree loaded: {tree.answer_count:,} answers, "
+                                 f"{tree.mean():.3f} guesses on average")
+        return book, tree
+
+    def ready(self) -> bool:
+        """Has everything been loaded?"""
+        return self.loaded or (self.vocabulary_data.ready() and self.history_data.ready() and self.extras.ready())
+
+    def history(self) -> tuple:
+        """Return the WORDLE rounds and their stats, waiting for the history only (not for the vocabulary)."""
+        _, WORDLE_rounds, _, stats = self.history_data.get()
+        return WORDLE_rounds, stats
+
+    def wait(self):
+        """Wait for everything to be loaded, and show what was."""
+        if not self.loaded:
+            with METRICS.phase("wait_for_data"):
+                self.vocabulary, self.word_list, self.word_index, self.patterns = self.vocabulary_data.get()
+                self.WORDLE_list, self.WORDLE_rounds, self.WORDLE_set, self.stats = self.history_data.get()
+                self.book, self.tree = self.extras.get()
+            for message in self.messages:
+                print(message)
+            self.loaded = True
+        return self
+
+    def new_solver(self) -> Solver:
+        """Return a Solver for a new game, waiting for the data if need be."""
+        self.wait()
+        return Solver(self.word_index, self.WORDLE_list, self.patterns, model=self.stats.model, used=self.WORDLE_set,
+                      book=self.book, tree=self.tree)
+
+    def new_boards(self, board_count) -> MultiSolver:
+        """Return a MultiSolver for a new multi-board game, waiting for the data if need be."""
+        self.wait()
+        used_mask = self.word_index.mask_of(self.WORDLE_set)
+        return MultiSolver([Solver(self.word_index, self.WORDLE_list, self.patterns, model=self.stats.model,
+                                   used=self.WORDLE_set, book=self.book, used_mask=used_mask)
+                            for _ in range(board_count)])
+
+
+def handle_request(request, sessions, new_solver) -> dict:
+    """Carry out one JSON request against the table of game sessions and return the JSON response.
+        requests: {"op": "new"|"apply"|"undo"|"rewind"|"edit"|"branch"|"candidates"|"suggest"|"close", "session": id,
+                   ...}
+        "rewind" goes back to the state after "turn" guesses, "edit" changes the result of guess "turn" (from 0) and
+        "branch" copies a game to a new session ("to", or the next free id) for what-if play
+        a "new" request with "boards": n starts a multi-board game, whose "apply" requests take a list of "results",
+        and it only replaces a session that already exists with "reset": true
+        new_solver makes the Solver for a new game of a word length (0 for WORDLE_LENGTH)"""
+    op = request.get("op", "")
+    session = request.get("session")
+    response = {"session": session}
+    if "id" in request:
+        response["id"] = request["id"]
+    try:
+        if op == "new":
+            if session is None:
+                session = len(sessions)
+                while session in sessions:
+                    session += 1
+                response["session"] = session
+            elif session in sessions and not request.get("reset", False):
+                raise ValueError(f"session '{session}' already exists, close it or start it again with \"reset\"")
+            length = int(request.get("length", 0))
+            boards = int(request.get("boards", 1))
+            if boards < 1:
+                raise ValueError(f"invalid number of boards {boards}")
+            solver = new_solver(length) if boards == 1 else MultiSolver([new_solver(length) for _ in range(boards)])
+            sessions[session] = solver
+            response["remaining"] = sessions[session].count()
+        elif op not in ("apply", "undo", "rewind", "edit", "branch", "candidates", "suggest", "close"):
+            raise ValueError(f"unknown op '{op}'")
+        elif session not in sessions:
+            raise ValueError(f"unknown session '{session}'")
+        elif op == "apply":
+            solver = sessions[session]
+            if isinstance(solver, MultiSolver):
+                if not isinstance(request["results"], list):
+                    raise ValueError("results must be a list, one result per board")
+                results = [normalize_result(str(result), solver.index.word_len) for result in request["results"]]
+                response["remaining"] = solver.apply(str(request["guess"]), results)
+                response["boards"] = solver.counts()
+            else:
+                result = normalize_result(str(request["result"]), solver.index.word_len)
+                response["remaining"] = solver.apply(str(request["guess"]), result)
+            response["solved"] = solver.solved()
+        elif op == "undo":
+            response["remaining"] = sessions[session].undo()
+        elif op == "rewind":
+            response["remaining"] = sessions[session].rewind(int(request["turn"]))
+        elif op == "edit":
+            solver = sessions[session]
+            if isinstance(solver, MultiSolver):
+                raise ValueError("results can't be edited in multi-board games, rewind instead")
+            result = normalize_result(str(request["result"]), solver.index.word_len)
+            response["remaining"] = solver.edit(int(request["turn"]), result)
+        elif op == "branch":
+            branch = request.get("to")
+            if branch is None:
+                branch = len(sessions)
+                while branch in sessions:
+                    branch += 1
+            elif branch in sessions:
+                raise ValueError(f"session '{branch}' already exists")
+            sessions[branch] = sessions[session].copy()
+            response["branch"] = branch
+            response["remaining"] = sessions[branch].count()
+        elif op == "candidates":
+            solver = sessions[session]
+            if isinstance(solver, MultiSolver):
+                boards = solver.candidates()
+                response["count"] = [len(candidates) for candidates in boards]
+                response["candidates"] = [candidates[:int(request.get("limit", len(candidates)))]
+                                          for candidates in boards]
+            else:
+                candidates = solver.candidates()
+                response["count"] = len(candidates)
+                response["candidates"] = candidates[:int(request.get("limit", len(candidates)))]
+        elif op == "suggest":
+            response["suggestions"] = sessions[session].suggest(int(request.get("k", RECOMMENDED_WORDS)))
+        else:
+            del sessions[session]
+        response["ok"] = True
+    except KeyError as e:
+        response["ok"] = False
+        response["error"] = f"missing '{e.args[0]}'"
+    except (ValueError, TypeError) as e:
+        response["ok"] = False
+        response["error"] = str(e)
+    return response
+
+
+def serve_json_lines(instream, outstream, sessions, new_solver, lock=None) -> None:
+    """Read JSON-lines requests from a stream and write one JSON-lines response for each of them."""
+    for line in instream:
+        line = line.strip()
+        if len(line) == 0:
+            continue
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            response = {"ok": False, "error": f"invalid request: {e}"}
+        else:
+            if lock is None:
+                response = handle_request(request, sessions, new_solver)
+            else:
+                with lock:
+                    response = handle_request(request, sessions, new_solver)
+        outstream.write(json.dumps(response) + "\n")
+        outstream.flush()
+
+
+def serve(setup_filename, socket_path=None) -> None:
+    """Serve game sessions that share one loaded vocabulary to JSON-lines clients on stdin/stdout or a Unix socket."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    # stdout may be the response stream, so progress messages go to stderr
+    log = lambda message: print(message, file=sys.stderr)
+    word_list, word_index, patterns, WORDLE_list, _, book, vocabulary = load_game_data(log)
+    model = FrequencyModel(WORDLE_list)
+    used = frozenset(WORDLE_list)
+    used_masks = {WORDLE_LENGTH: word_index.mask_of(used)}
+    tree = load_decision_tree(word_list, word_index.words, WORDLE_list)
+    # every other word length has its own history, read the first time a game of that length is started
+    histories = {}
+
+    def new_solver(length):
+        # every word length is served from the same vocabulary, the matrix, book and tree are for WORDLE_LENGTH
+        length = length or WORDLE_LENGTH
+        if length == WORDLE_LENGTH:
+            return Solver(word_index, WORDLE_list, patterns, model=model, used=used, book=book,
+                          used_mask=used_masks[length], tree=tree)
+        index = vocabulary.answer_index(length)
+        if len(index.words) == 0:
+            raise ValueError(f"there are no {length}-letter words in the vocabulary")
+        if length not in histories:
+            history = read_WORDLE_list(*history_filenames(length))[0]
+            histories[length] = history, FrequencyModel(history, length), frozenset(history)
+            used_masks[length] = index.mask_of(histories[length][2])
+        history, length_model, length_used = histories[length]
+        return Solver(index, history, model=length_model, used=length_used, used_mask=used_masks[length])
+
+    sessions = {}
+
+    if socket_path is None:
+        serve_json_lines(sys.stdin, sys.stdout, sessions, new_solver)
+        return
+
+    # every connection can use any session, so requests take turns with the session table
+    lock = threading.Lock()
+
+    class JSONLinesHandler(socketserver.StreamRequestHandler):
+        def handle(self):
+            serve_json_lines(io.TextIOWrapper(self.rfile, encoding="utf-8", errors="replace"),
+                             io.TextIOWrapper(self.wfile, encoding="utf-8", write_through=True),
+                             sessions, new_solver, lock)
+
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    with socketserver.ThreadingUnixStreamServer(socket_path, JSONLinesHandler) as server:
+        log(f"Serving JSON-lines requests on '{socket_path}'")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(socket_path)
+
+
+class LRUCache:
+    """A bounded mapping that forgets its least recently used entry when it is full.
+        it counts its hits, misses and evictions"""
+
+    def __init__(self, capacity=SERVICE_CACHE_SIZE):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        """Return the entry for a key (making it the most recently used), or the default if there is none."""
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return default
+
+    def put(self, key, value) -> None:
+        """Add or replace an entry, evicting the least recently used ones if the cache is over capacity."""
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.capacity:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """Return the size and the hit, miss and eviction counts of the cache."""
+        lookups = self.hits + self.misses
+        return {"size": len(self.entries), "capacity": self.capacity, "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions, "hit_rate": self.hits / lookups if lookups > 0 else 0.0}
+
+
+def constraint_key(guesses, results, word_len) -> tuple:
+    """Return the canonical form of the constraints a game's guesses and results add up to.
+        games that reach the same constraints, whatever the guesses, have the same possible words and suggestions"""
+    can = [ALPHABET] * word_len
+    at_least = {}
+    definite = [""] * word_len
+    for guess, result in zip(guesses, results):
+        update_constraints(guess, result, can, at_least, definite)
+    return (word_len, tuple("".join(sorted(letters)) for letters in can),
+            tuple(sorted((lett, count) for lett, count in at_least.items() if count > 0)), tuple(definite))
+
+
+# what a suggestion service worker process works with (set once per process by init_service_worker)
+_service_vocabulary = None
+_service_index = None
+_service_patterns = None
+_service_history = []
+_service_model = None
+_service_used = frozenset()
+_service_histories = {}
+
+
+def init_service_worker(setup_filename) -> None:
+    """Give a suggestion service worker process its own vocabulary, history and (memory-mapped) pattern matrix."""
+    global _service_vocabulary
+    global _service_index
+    global _service_patterns
+    global _service_history
+    global _service_model
+    global _service_used
+    apply_setup_values(read_setup(setup_filename))
+    quiet = lambda message: None
+    _service_vocabulary, _, _service_index, _service_patterns = load_vocabulary_data(quiet)
+    _service_history, _ = load_history_data(quiet)
+    _service_model = FrequencyModel(_service_history)
+    _service_used = frozenset(_service_history)
+
+
+def service_suggestions(guesses, results, word_len, k, limit) -> dict:
+    """Play a game's guesses and results, and return its possible words and suggested next guesses."""
+    if word_len == WORDLE_LENGTH:
+        solver = Solver(_service_index, _service_history, _service_patterns, model=_service_model,
+                        used=_service_used)
+    else:
+        index = _service_vocabulary.answer_index(word_len)
+        if len(index.words) == 0:
+            raise ValueError(f"there are no {word_len}-letter words in the vocabulary")
+        # every other word length has its own history, read the first time this worker gets a game of that length
+        if word_len not in _service_histories:
+            history = read_WORDLE_list(*history_filenames(word_len))[0]
+            _service_histories[word_len] = history, FrequencyModel(history, word_len), frozenset(history)
+        history, model, used = _service_histories[word_len]
+        solver = Solver(index, history, model=model, used=used)
+    for guess, result in zip(guesses, results):
+        solver.apply(guess, result)
+    candidates = solver.candidates()
+    return {"remaining": len(candidates), "candidates": candidates[:limit], "suggestions": solver.suggest(k)}
+
+
+class SuggestionService:
+    """Suggestions for games given as their guesses and results, worked out in a pool of worker processes.
+        responses are kept in an LRU cache keyed by the canonical constraints the game has reached, and identical
+        requests that arrive while one is being worked out wait for that one instead of starting their own"""
+
+    def __init__(self, executor, capacity=SERVICE_CACHE_SIZE):
+        self.executor = executor
+        self.cache = LRUCache(capacity)
+        self.pending = {}
+        self.requests = 0
+        self.coalesced = 0
+
+    async def suggest(self, request) -> dict:
+        """Return the possible words and suggestions for a request:
+            {"guesses": [...], "results": [...], "length": word length, "k": suggestions, "limit": candidates}"""
+        self.requests += 1
+        word_len = int(request.get("length", 0)) or WORDLE_LENGTH
+        guesses = [str(guess).strip().upper() for guess in request.get("guesses", [])]
+        results = [normalize_result(str(result), word_len) for result in request.get("results", [])]
+        if len(guesses) != len(results):
+            raise ValueError(f"{len(guesses)} guesses but {len(results)} results")
+        for guess in guesses:
+            if len(guess) != word_len or not guess.isalpha():
+                raise ValueError(f"invalid guess '{guess}', must be {word_len} letters")
+        k = int(request.get("k", RECOMMENDED_WORDS))
+        limit = int(request.get("limit", SERVICE_CANDIDATES))
+        if k < 1 or limit < 1:
+            raise ValueError(f"k ({k}) and limit ({limit}) must be at least 1")
+        key = constraint_key(guesses, results, word_len) + (k, limit)
+
+        response = self.cache.get(key)
+        if response is not None:
+            return dict(response, cached=True)
+        if key in self.pending:
+            self.coalesced += 1
+            response = await asyncio.shield(self.pending[key])
+            return dict(response, cached=True)
+        future = asyncio.get_running_loop().run_in_executor(self.executor, service_suggestions, guesses, results,
+                                                            word_len, k, limit)
+        self.pending[key] = future
+        try:
+            response = await future
+        finally:
+            del self.pending[key]
+        self.cache.put(key, response)
+        return dict(response, cached=False)
+
+    def stats(self) -> dict:
+        """Return the request counts and the cache stats."""
+        return {"requests": self.requests, "coalesced": self.coalesced, "pending": len(self.pending),
+                "cache": self.cache.stats()}
+
+    async def respond(self, method, path, body) -> tuple:
+        """Route one HTTP request and return (status, JSON response)."""
+        if path == "/suggest" and method == "POST":
+            try:
+                request = json.loads(body or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("request must be a JSON object")
+                return 200, await self.suggest(request)
+            except (ValueError, TypeError) as e:
+                return 400, {"error": str(e)}
+            except concurrent.futures.BrokenExecutor as e:
+                # a worker process died, the pool can't take any more work
+                return 503, {"error": f"the worker pool is not available: {e}"}
+            except Exception as e:
+                return 500, {"error": f"{type(e).__name__}: {e}"}
+        if path == "/stats" and method == "GET":
+            return 200, self.stats()
+        if path == "/health" and method == "GET":
+            return 200, {"ok": True}
+        return 404, {"error": f"no such endpoint: {method} {path}"}
+
+    async def handle(self, reader, writer) -> None:
+        """Serve the HTTP requests of one connection (kept open between requests unless the client says not to)."""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if len(request_line.strip()) == 0:
+                    break
+                method, path, version = (request_line.decode("latin-1").split() + ["", "", ""])[:3]
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if len(line.strip()) == 0:
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                status, response = await self.respond(method.upper(), path, body)
+                payload = json.dumps(response).encode("utf-8")
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                writer.write(f"{version or 'HTTP/1.1'} {status} {http.client.responses.get(status, '')}\r\n"
+                             f"Content-Type: application/json\r\nContent-Length: {len(payload)}\r\n"
+                             f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1"))
+                writer.write(payload)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+
+def run_service(setup_filename, socket_path=None, port=0, processes=None) -> None:
+    """Serve suggestions over HTTP on localhost (or a Unix socket) until interrupted, see SuggestionService."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    port = port or SERVICE_PORT
+    processes = processes or os.cpu_count() or 1
+    # build the vocabulary cache and the pattern matrix (if they need it) once, before the workers start, so the
+    # workers only ever open files that are already there
+    log = lambda message: print(message, file=sys.stderr)
+    _, _, _, patterns = load_vocabulary_data(log)
+    if patterns is not None:
+        patterns.close()
+
+    async def serve_forever(service):
+        if socket_path is not None:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            server = await asyncio.start_unix_server(service.handle, socket_path)
+            where = f"'{socket_path}'"
+        else:
+            server = await asyncio.start_server(service.handle, SERVICE_HOST, port)
+            where = f"http://{SERVICE_HOST}:{port}"
+        print(f"Serving suggestions on {where} with {processes} worker processes", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+    with concurrent.futures.ProcessPoolExecutor(processes, initializer=init_service_worker,
+                                                initargs=(setup_filename,)) as executor:
+        try:
+            asyncio.run(serve_forever(SuggestionService(executor, SERVICE_CACHE_SIZE)))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            if socket_path is not None and os.path.exists(socket_path):
+                os.remove(socket_path)
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """An HTTP connection over a Unix socket."""
+
+    def __init__(self, socket_path, timeout=SERVICE_TIMEOUT):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def service_request(method, path, payload=None, socket_path=None, port=0) -> dict:
+    """Send one request to the suggestion service and return its JSON response."""
+    if socket_path is not None:
+        connection = UnixHTTPConnection(socket_path)
+    else:
+        connection = http.client.HTTPConnection(SERVICE_HOST, port or SERVICE_PORT, timeout=SERVICE_TIMEOUT)
+    try:
+        body = json.dumps(payload) if payload is not None else None
+        connection.request(method, path, body, {"Content-Type": "application/json"})
+        return json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+
+def run_client(setup_filename, turns, socket_path=None, port=0) -> dict:
+    """Ask the suggestion service about a game given as GUESS=RESULT turns (or for its stats, with 'stats')."""
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    if turns == ["stats"]:
+        response = service_request("GET", "/stats", socket_path=socket_path, port=port)
+    else:
+        guesses, results = [], []
+        for turn in turns:
+            guess, _, result = turn.partition("=")
+            guesses.append(guess)
+            results.append(result)
+        response = service_request("POST", "/suggest", {"guesses": guesses, "results": results},
+                                   socket_path=socket_path, port=port)
+    print(json.dumps(response, indent=1))
+    return response
+
+
+def main(setup_filename, boards=0):
+    """main method for WORDLE word guessing program.
+        boards > 1 plays that many boards at once (default is the Boards setup value)"""
+    # read the setup file for initial values
+    setup = read_setup(setup_filename)
+    apply_setup_values(setup)
+    boards = boards or BOARDS
+
+    # the vocabulary, history and everything built from them load in the background while the player gets going
+    data = GameData()
+
+    another = "Y"
+    while another == "Y":
+        # show current WORDLE guess statistics before we start this round (only the history is waited for, it is
+        # small and read first, the vocabulary keeps loading in the background)
+        show_stats(*data.history())
+
+        # multi-board rounds aren't WORDLE rounds, so they don't go in the history
+        if boards > 1:
+            process_boards(data, boards)
+            print()
+            another = input("Play another round? Y/N: ").upper().strip()
+            if another != "Y":
+                break
+            continue
+
+        # process player's WORDLE guesses and make suggestions
+        guess_list = process_guesses(data)
+
+        # see if player is done and if they want this round's results saved
+        while True:
+            print()
+            another = input("Play another round? Y/N/(X to exit without saving this round): ").upper().strip()
+            if (len(another) == 1) and (another in "YNX"):
+                break
+            print(f"'{another}' is not a valid action")
+
+        if another != "X":
+            # save round results to WORDLE file here (the stats, including the letter frequencies, are updated too)
+            data.wait()
+            data.WORDLE_rounds.append(guess_list)
+            data.WORDLE_list.append(guess_list[-1])
+            data.WORDLE_set.add(guess_list[-1])
+            append_WORDLE_round(history_filenames()[0], guess_list, data.stats)
+            # the history has changed, so the opening book no longer applies
+            if data.book is not None:
+                data.book = None
+                print("The opening book is now out of date, rebuild it with --build-book")
+        else:
+            print("Round results not saved")
+
+    # show new stats at end of play
+    show_stats(*data.history())
+
+    print()
+    print("All done...thanks for playing")
+
+
+def parse_arguments(args=None):
+    """Parse the command line."""
+    parser = argparse.ArgumentParser(description="Suggest the next word to try while playing WORDLE.")
+    parser.add_argument("--setup", default=SETUP_FILENAME, help="setup file (default: %(default)s)")
+    parser.add_argument("--serve", action="store_true",
+                        help="answer JSON-lines requests instead of playing interactively")
+    parser.add_argument("--socket", metavar="PATH",
+                        help="with --serve or --service, use this Unix socket (instead of stdin or localhost HTTP)")
+    parser.add_argument("--service", action="store_true",
+                        help="serve cached suggestions over HTTP on localhost (or --socket) with a pool of workers")
+    parser.add_argument("--port", type=int, default=0, help="with --service or --client, the localhost HTTP port")
+    parser.add_argument("--client", nargs="*", metavar="GUESS=RESULT",
+                        help="ask the suggestion service about a game (e.g. STARE=BBYBG), or for its 'stats'")
+    parser.add_argument("--compact", action="store_true",
+                        help="fold the round log back into the plain WORDLE file and exit")
+    parser.add_argument("--build-book", action="store_true",
+                        help="build the opening book for the setup's openers and exit")
+    parser.add_argument("--query", metavar="PATTERN",
+                        help="show the vocabulary words that fit a pattern, e.g. 'S?A?E +R -T', and exit")
+    parser.add_argument("--build-tree", action="store_true",
+                        help="build the strategy tree for the setup's tree answers and objective, and exit")
+    parser.add_argument("--simulate", choices=("history", "vocabulary"),
+                        help="let the solver play every historical answer or every vocabulary word")
+    parser.add_argument("--strategy", choices=(FREQUENCY.lower(), ENTROPY.lower(), MINIMAX.lower()),
+                        default=FREQUENCY.lower(), help="with --simulate, how the solver picks guesses")
+    parser.add_argument("--opener", default="",
+                        help="with --simulate, the first guess of every game, with --build-tree, the tree's opener")
+    parser.add_argument("--processes", type=int, default=0, help="worker processes (default: one per core)")
+    parser.add_argument("--tune", choices=("random", "grid"),
+                        help="find the scoring weights that solve the historical answers in the fewest tries")
+    parser.add_argument("--samples", type=int, default=TUNING_SAMPLES,
+                        help="with --tune random, how many weight sets to try (default: %(default)s)")
+    parser.add_argument("--seed", type=int, default=0, help="with --tune random, the random seed")
+    parser.add_argument("--limit", type=int, default=0, help="with --simulate or --tune, only play this many games")
+    parser.add_argument("--output", default="",
+                        help=f"with --simulate, the JSON results file (default: {SIMULATION_FILENAME}), "
+                             f"with --tune, the setup file to write (default: {TUNING_FILENAME})")
+    parser.add_argument("--boards", type=int, default=0,
+                        help="play this many boards at once, e.g. 4 for Quordle, 8 for Octordle (rounds aren't saved)")
+    parser.add_argument("--profile", action="store_true", help="report the time spent in each phase at the end")
+    parser.add_argument("--metrics", metavar="FILE", default="", help="write the phase metrics to this file")
+    parser.add_argument("--metrics-format", choices=("json", "prometheus"), default="",
+                        help="format of the --metrics file (default: prometheus for .prom files, otherwise json)")
+    parser.add_argument("--cprofile", metavar="FILE", default="",
+                        help="run under cProfile, save the stats to this file and report the top functions")
+    parser.add_argument("--tracemalloc", action="store_true",
+                        help="trace memory allocations and report the peak and the top allocating lines")
+    return parser.parse_args(args)
+
+
+def run(arguments) -> None:
+    """Run the mode of the app chosen on the command line."""
+    if arguments.serve:
+        serve(arguments.setup, arguments.socket)
+    elif arguments.service:
+        run_service(arguments.setup, arguments.socket, arguments.port, arguments.processes)
+    elif arguments.client is not None:
+        run_client(arguments.setup, arguments.client, arguments.socket, arguments.port)
+    elif arguments.compact:
+        apply_setup_values(read_setup(arguments.setup))
+        filename, old_filename = history_filenames()
+        print(f"Compacted {compact_WORDLE_file(filename, old_filename):,} rounds into '{filename}'")
+    elif arguments.build_book:
+        build_book(arguments.setup)
+    elif arguments.query is not None:
+        run_query(arguments.setup, arguments.query)
+    elif arguments.build_tree:
+        build_tree(arguments.setup, arguments.opener, arguments.processes)
+    elif arguments.simulate:
+        simulate(arguments.setup, arguments.simulate, arguments.strategy.upper(), arguments.opener,
+                 arguments.processes, arguments.limit, arguments.output or SIMULATION_FILENAME)
+    elif arguments.tune:
+        tune(arguments.setup, arguments.tune, arguments.samples, arguments.processes, arguments.limit,
+             arguments.output or TUNING_FILENAME, arguments.seed)
+    else:
+        main(arguments.setup, arguments.boards)
+
+
+def run_instrumented(arguments) -> None:
+    """Run the app, wrapped in whatever timing, profiling and memory tracing the command line asked for."""
+    METRICS.enabled = arguments.profile or arguments.metrics != ""
+    if arguments.tracemalloc:
+        tracemalloc.start()
+    profiler = cProfile.Profile() if arguments.cprofile != "" else None
+    try:
+        if profiler is not None:
+            profiler.runcall(run, arguments)
+        else:
+            run(arguments)
+    finally:
+        # reports go to stderr, so they don't get mixed up with JSON-lines responses
+        if profiler is not None:
+            profiler.dump_stats(arguments.cprofile)
+            pstats.Stats(arguments.cprofile, stream=sys.stderr).sort_stats("cumulative").print_stats(PROFILE_LINES)
+        if arguments.tracemalloc:
+            snapshot = tracemalloc.take_snapshot()
+            print(f"Peak traced memory: {tracemalloc.get_traced_memory()[1] / 1e6:,.1f} MB", file=sys.stderr)
+            for statistic in snapshot.statistics("lineno")[:PROFILE_LINES]:
+                print(statistic, file=sys.stderr)
+            tracemalloc.stop()
+        if arguments.profile:
+            print(METRICS.report(), file=sys.stderr)
+        if arguments.metrics != "":
+            metrics_format = arguments.metrics_format or ("prometheus" if arguments.metrics.endswith(".prom")
+                                                          else "json")
+            with open(arguments.metrics, WRITE_FILE) as f:
+                if metrics_format == "prometheus":
+                    f.write(METRICS.to_prometheus())
+                else:
+                    json.dump(METRICS.to_dict(), f, indent=1)
 
 
 # start the main app
 if __name__ == '__main__':
-    main(SETUP_FILENAME)
+    run_instrumented(parse_arguments())
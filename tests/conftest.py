@@ -0,0 +1,45 @@
+"""Shared fixtures: the tests import main.py from the directory above and use its vocabulary file."""
+import os
+import random
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import main as wordle  # noqa: E402
+
+SAMPLE_WORDS = 3000
+
+
+@pytest.fixture(scope="session")
+def all_vocabulary_words():
+    """All the words of the vocabulary file, of every length, read directly (without building any cache files)."""
+    with open(os.path.join(ROOT, wordle.WORD_FILENAME), wordle.READ_FILE) as f:
+        return [word for word in map(str.upper, map(str.strip, f)) if word != ""]
+
+
+@pytest.fixture(scope="session")
+def vocabulary_words(all_vocabulary_words):
+    """All the 5-letter words of the vocabulary file."""
+    return [word for word in all_vocabulary_words if len(word) == 5]
+
+
+@pytest.fixture(scope="session")
+def words(vocabulary_words):
+    """A fixed random sample of the 5-letter words, in (alphabetical) vocabulary order, small enough for brute-force
+    checks."""
+    return sorted(random.Random(5).sample(vocabulary_words, SAMPLE_WORDS))
+
+
+@pytest.fixture(scope="session")
+def index(words):
+    """The WordIndex of the sample words."""
+    return wordle.WordIndex(words)
+
+
+@pytest.fixture(scope="session")
+def result_of():
+    """The function that returns the result string WORDLE shows for a guess against an answer."""
+    return lambda guess, answer: wordle.code_to_result(wordle.feedback_code(guess, answer), len(answer))
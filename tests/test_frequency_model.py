@@ -0,0 +1,78 @@
+"""The letter frequency model and the 'most likely' scores against the scoring it replaced."""
+import random
+
+import pytest
+
+import main as wordle
+
+
+def baseline_scores(possibles, WORDLE_list) -> list:
+    """Score the words the way score_possibles did before the FrequencyModel: count the letters of the whole history
+    again, then score each word letter by letter (best first)"""
+    all_letter_freq = dict.fromkeys(wordle.ALPHABET, 0.0)
+    first_letter_freq = dict.fromkeys(wordle.ALPHABET, 0.0)
+    last_letter_freq = dict.fromkeys(wordle.ALPHABET, 0.0)
+    total_letters = 0
+    for word in WORDLE_list:
+        first_letter_freq[word[0]] += 1
+        last_letter_freq[word[-1]] += 1
+        for letter in word:
+            all_letter_freq[letter] += 1
+            total_letters += 1
+    scored_words = []
+    for word in possibles:
+        score = (first_letter_freq[word[0]] / len(WORDLE_list) * wordle.FIRST_MULTIPLIER +
+                 last_letter_freq[word[-1]] / len(WORDLE_list) * wordle.LAST_MULTIPLIER)
+        for letter in word:
+            score += all_letter_freq[letter] / total_letters * wordle.LETTER_MULTIPLIER
+        if word.endswith("ED") or word.endswith("ES") or word.endswith("S"):
+            score -= wordle.PLURAL_PENALTY
+        for letter in word:
+            if word.count(letter) > 1:
+                score -= wordle.DUPLICATE_PENALTY
+        scored_words.append((word, score))
+    scored_words.sort(reverse=True, key=lambda w: w[1])
+    return scored_words
+
+
+@pytest.fixture(scope="module")
+def history(words):
+    """A made-up history of previous WORDLE words."""
+    return random.Random(6).sample(words, 400)
+
+
+def assert_same_scores(scored, expected) -> None:
+    """The same words with the same scores, best first (the letter frequencies are added up in another order, so
+    scores may differ in the last bits and words that nearly tie may swap places)"""
+    assert len(scored) == len(expected)
+    assert dict(scored) == pytest.approx(dict(expected))
+    assert all(a[1] >= b[1] for a, b in zip(scored, scored[1:]))
+
+
+def test_scores_match_baseline(words, history):
+    assert_same_scores(wordle.score_possibles(words, history), baseline_scores(words, history))
+
+
+def test_added_words_match_a_fresh_model(words, history):
+    """A model kept up to date one round at a time scores like one built from the whole history."""
+    model = wordle.FrequencyModel(history[:100])
+    # score with the smaller history first, so the cached scores have to be thrown away as rounds are added
+    wordle.score_possibles(words, history[:100], model)
+    for count in range(101, len(history) + 1):
+        model.add(history[count - 1])
+        if count % 100 == 0:
+            assert_same_scores(wordle.score_possibles(words, history[:count], model),
+                               baseline_scores(words, history[:count]))
+    assert model.to_dict() == wordle.FrequencyModel(history).to_dict()
+    assert wordle.FrequencyModel.from_dict(model.to_dict()).to_dict() == model.to_dict()
+
+
+@pytest.mark.parametrize("history_size", [0, 3, 400])
+def test_top_matches_full_sort(words, history, history_size):
+    """The best top words are the first words of the full ranking, ties in the same (word list) order."""
+    model = wordle.FrequencyModel(history[:history_size])
+    ranked = wordle.score_possibles(words, (), model)
+    # with no history only the penalties score, so most words tie
+    assert len({score for _, score in ranked}) < len(ranked)
+    for top in (1, 2, 5, wordle.RECOMMENDED_WORDS, 500, len(words), len(words) + 1):
+        assert wordle.score_possibles(words, (), model, top) == ranked[:top]
@@ -0,0 +1,84 @@
+"""The round log and its compaction into the WORDLE file, including compactions that stop part way."""
+import os
+
+import pytest
+
+import main as wordle
+
+ROUNDS = [["CRANE", "MOIST", "PLUMB"], ["SLATE", "BRINY"], ["TRACE", "ROUND", "ROUND"]]
+# the last logged round is the same as the last round in the file, which must not be taken as already folded in
+LOGGED = [["ADIEU", "CHORD"], ["TRACE", "ROUND", "ROUND"]]
+
+
+class Crash(Exception):
+    """What a compaction stopped part way by a crash raises."""
+
+
+@pytest.fixture
+def history(tmp_path):
+    """A WORDLE file and a round log with rounds appended to it."""
+    filename = str(tmp_path / "WORDLEs.txt")
+    wordle.save_WORDLE_file(filename, ROUNDS)
+    for a_round in LOGGED:
+        wordle.append_WORDLE_round(filename, a_round)
+    return filename
+
+
+def leftovers(filename) -> list:
+    """Return the compaction files that are left next to a WORDLE file."""
+    names = [wordle.log_filename_for(filename), wordle.compacting_filename_for(filename),
+             wordle.folding_filename_for(filename)]
+    return [name for name in names if os.path.exists(name)]
+
+
+def test_append_and_compact(history):
+    old_filename = history + ".old"
+    assert wordle.read_WORDLE_list(history, old_filename)[1] == ROUNDS + LOGGED
+    assert wordle.compact_WORDLE_file(history, old_filename) == len(ROUNDS + LOGGED)
+    assert wordle.read_WORDLE_rounds(history, old_filename) == ROUNDS + LOGGED
+    assert leftovers(history) == []
+    # nothing new to fold in
+    assert wordle.compact_WORDLE_file(history, old_filename) == len(ROUNDS + LOGGED)
+    assert wordle.read_WORDLE_list(history, old_filename)[1] == ROUNDS + LOGGED
+
+
+# the file operations of a compaction, in order: record the marker, set the log aside, replace the WORDLE file, remove
+# the set aside log, remove the marker
+@pytest.mark.parametrize("crash_at", range(5))
+def test_crash_during_compaction(history, monkeypatch, crash_at):
+    """Stop a compaction before each of its file operations: every round is still read exactly once, and the next
+    compaction finishes the job, keeping the rounds logged in between"""
+    old_filename = history + ".old"
+    calls = 0
+    real_replace, real_remove = os.replace, os.remove
+
+    def crashing(operation):
+        def call(*args):
+            nonlocal calls
+            calls += 1
+            if calls > crash_at:
+                raise Crash()
+            return operation(*args)
+        return call
+
+    monkeypatch.setattr(wordle.os, "replace", crashing(real_replace))
+    monkeypatch.setattr(wordle.os, "remove", crashing(real_remove))
+    with pytest.raises(Crash):
+        wordle.compact_WORDLE_file(history, old_filename)
+    monkeypatch.setattr(wordle.os, "replace", real_replace)
+    monkeypatch.setattr(wordle.os, "remove", real_remove)
+
+    assert wordle.read_WORDLE_list(history, old_filename)[1] == ROUNDS + LOGGED
+    played = ["GHOST", "FLUNK"]
+    wordle.append_WORDLE_round(history, played)
+    assert wordle.read_WORDLE_list(history, old_filename)[1] == ROUNDS + LOGGED + [played]
+    assert wordle.compact_WORDLE_file(history, old_filename) == len(ROUNDS + LOGGED) + 1
+    assert wordle.read_WORDLE_rounds(history, old_filename) == ROUNDS + LOGGED + [played]
+    assert leftovers(history) == []
+
+
+def test_fold_logged_rounds():
+    assert wordle.fold_logged_rounds(ROUNDS, LOGGED) == ROUNDS + LOGGED
+    assert wordle.fold_logged_rounds(ROUNDS, LOGGED, len(ROUNDS)) == ROUNDS + LOGGED
+    assert wordle.fold_logged_rounds(ROUNDS + LOGGED, LOGGED, len(ROUNDS)) == ROUNDS + LOGGED
+    assert wordle.fold_logged_rounds(ROUNDS, []) == ROUNDS
@@ -0,0 +1,116 @@
+"""Multi-board games: every board filters like its own game, and the boards are ranked together."""
+import math
+import random
+from collections import Counter
+
+import pytest
+
+import main as wordle
+
+
+def reference_rank(boards, probe) -> tuple:
+    """Work out a probe word's summed expected information and worst-case group size over the boards, directly."""
+    bits = 0.0
+    worst = 0
+    for board in boards:
+        groups = Counter(wordle.feedback_code(probe, answer) for answer in board).values()
+        bits += -sum(size / len(board) * math.log2(size / len(board)) for size in groups)
+        worst += max(groups)
+    return bits, worst
+
+
+def new_game(index, boards, recommender=wordle.ENTROPY, patterns=None):
+    return wordle.MultiSolver([wordle.Solver(index, patterns=patterns, recommender=recommender)
+                               for _ in range(boards)])
+
+
+def test_boards_filter_like_single_games(words, index, result_of):
+    rng = random.Random(12)
+    for _ in range(20):
+        answers = rng.sample(words, 4)
+        game = new_game(index, 4)
+        singles = [wordle.Solver(index) for _ in answers]
+        for guess in rng.sample(words, 4) + answers:
+            results = [result_of(guess, answer) for answer in answers]
+            game.apply(guess, results)
+            for single, result in zip(singles, results):
+                if not single.solved():
+                    single.apply(guess, result)
+            assert game.candidates() == [single.candidates() for single in singles]
+            assert game.count() == sum(single.count() for single in singles if not single.solved())
+        assert game.solved()
+        # a board keeps the guesses that solved it when the game goes back to before the others were solved
+        game.rewind(len(game.guesses) - 1)
+        assert [board.solved() for board in game.boards] == [answer != answers[-1] for answer in answers]
+
+
+def test_apply_checks_results_before_changing_any_board(index):
+    game = new_game(index, 2)
+    with pytest.raises(ValueError):
+        game.apply("SLATE", [wordle.WRONG_WRONG * 5, "??"])
+    assert game.guesses == [] and all(len(board.guesses) == 0 for board in game.boards)
+
+
+@pytest.mark.parametrize("method", [wordle.ENTROPY, wordle.MINIMAX])
+def test_rank_boards_matches_reference(words, method):
+    rng = random.Random(3)
+    boards = [rng.sample(words, size) for size in (1, 7, 30)]
+    ranked = wordle.rank_boards(boards, method, top=len(words))
+    probes = set(word for board in boards for word in board)
+    assert {word for word, _, _ in ranked} == probes
+    for word, bits, worst in ranked:
+        expected_bits, expected_worst = reference_rank(boards, word)
+        assert bits == pytest.approx(expected_bits)
+        assert worst == expected_worst
+    # best first
+    keys = [(-bits, worst) if method == wordle.ENTROPY else (worst, -bits) for _, bits, worst in ranked]
+    assert [key[0] for key in keys] == sorted(key[0] for key in keys)
+
+
+def test_rank_boards_with_a_pattern_matrix(tmp_path, words):
+    probes = words[::10]
+    answers = words[::3]
+    filename = str(tmp_path / "words.patterns")
+    wordle.build_pattern_matrix(probes, answers, filename, processes=1)
+    matrix = wordle.PatternMatrix(filename, probes, answers)
+    try:
+        boards = [answers[:40], answers[100:125]]
+        ranked = wordle.rank_boards(boards, wordle.ENTROPY, top=len(probes), patterns=matrix)
+        assert len(ranked) == len(probes)
+        for word, bits, worst in ranked:
+            expected_bits, expected_worst = reference_rank(boards, word)
+            assert bits == pytest.approx(expected_bits)
+            assert worst == expected_worst
+    finally:
+        matrix.close()
+
+
+def test_suggest_falls_back_to_the_most_likely_words(words, index, result_of, monkeypatch):
+    # too many results to rank without a pattern matrix: the suggestions still come, from the frequency scores
+    monkeypatch.setattr(wordle, "BOARD_RANK_LIMIT", 100)
+    game = new_game(index, 4)
+    game.apply("SLATE", [result_of("SLATE", answer) for answer in words[:4]])
+    assert game.recommendations() == []
+    suggestions = game.suggest(5)
+    assert len(suggestions) == 5
+    candidates = set(word for board in game.candidates() for word in board)
+    assert set(suggestions) <= candidates
+    assert any("recommended guesses" in line for line in wordle.boards_lines(game))
+
+
+def test_suggest_with_the_frequency_recommender(words, index):
+    game = new_game(index, 2, recommender=wordle.FREQUENCY)
+    assert len(game.suggest(3)) == 3
+
+
+def test_suggest_puts_certain_words_first(words, index, result_of):
+    game = new_game(index, 2)
+    answers = [words[0], words[1500]]
+    # play guesses until one board has a single word left
+    for guess in words[::97]:
+        if any(board.count() == 1 for board in game.unsolved()):
+            break
+        game.apply(guess, [result_of(guess, answer) for answer in answers])
+    certain = game.certain()
+    assert len(certain) > 0
+    assert game.suggest()[:len(certain)] == certain
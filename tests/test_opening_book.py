@@ -0,0 +1,81 @@
+"""The opening book: saving and reading it back, and throwing it away when what it was built from changes."""
+import pytest
+
+import main as wordle
+
+BOOK_WORDS = 400
+
+
+@pytest.fixture(scope="module")
+def book_words(words):
+    return words[::len(words) // BOOK_WORDS]
+
+
+@pytest.fixture(scope="module")
+def patterns(book_words, tmp_path_factory):
+    """The pattern matrix of the book words against themselves."""
+    filename = str(tmp_path_factory.mktemp("book") / "words.patterns")
+    wordle.build_pattern_matrix(book_words, book_words, filename, processes=1)
+    matrix = wordle.PatternMatrix(filename, book_words, book_words)
+    yield matrix
+    matrix.close()
+
+
+@pytest.fixture(scope="module")
+def history(book_words):
+    return book_words[::9]
+
+
+def test_book_round_trip(tmp_path, book_words, patterns, history):
+    index = wordle.WordIndex(book_words)
+    solver = wordle.Solver(index, history, patterns, wordle.ENTROPY)
+    book = wordle.build_opening_book(solver, [book_words[0], book_words[1]], depth=2)
+    book.key = wordle.book_key(book_words, history, book_words)
+    filename = str(tmp_path / "words.book")
+    book.save(filename, book_words)
+    loaded = wordle.OpeningBook.load(filename, book_words, book.key)
+    assert loaded is not None and loaded.entries.keys() == book.entries.keys()
+    for turns, (scored_words, ranked) in book.entries.items():
+        loaded_scored, loaded_ranked = loaded.entries[turns]
+        # scores and bits are stored as 32-bit floats
+        assert [word for word, _ in loaded_scored] == [word for word, _ in scored_words]
+        assert [score for _, score in loaded_scored] == pytest.approx([score for _, score in scored_words], rel=1e-6)
+        assert [(word, worst) for word, _, worst in loaded_ranked] == [(word, worst) for word, _, worst in ranked]
+        assert [bits for _, bits, _ in loaded_ranked] == pytest.approx([bits for _, bits, _ in ranked], rel=1e-6)
+    # a game that follows the book gets the book's recommendations
+    game = wordle.Solver(index, history, patterns, wordle.ENTROPY, book=loaded)
+    turns = next(iter(book.entries))
+    game.apply(turns[0][0], wordle.code_to_result(turns[0][1], 5))
+    assert game.recommendations() == loaded.entries[turns]
+
+
+def test_stale_book_is_not_used(tmp_path, book_words, history, monkeypatch):
+    key = wordle.book_key(book_words, history, book_words)
+    filename = str(tmp_path / "words.book")
+    wordle.OpeningBook(key).save(filename, book_words)
+    assert wordle.OpeningBook.load(filename, book_words, key) is not None
+    # another history, other answers, other scoring weights or other words make another key
+    stale_keys = [wordle.book_key(book_words, history + [book_words[1]], book_words),
+                  wordle.book_key(book_words, history, book_words[1:])]
+    monkeypatch.setattr(wordle, "LETTER_MULTIPLIER", wordle.LETTER_MULTIPLIER + 1)
+    stale_keys.append(wordle.book_key(book_words, history, book_words))
+    for stale_key in stale_keys:
+        assert stale_key != key
+        assert wordle.OpeningBook.load(filename, book_words, stale_key) is None
+    assert wordle.OpeningBook.load(filename, book_words[1:], key) is None
+    assert wordle.OpeningBook.load(str(tmp_path / "missing.book"), book_words, key) is None
+    # a damaged book is rebuilt too
+    with open(filename, "r+b") as f:
+        f.truncate(10)
+    assert wordle.OpeningBook.load(filename, book_words, key) is None
+
+
+def test_book_openers(book_words, monkeypatch):
+    rounds = [["ZZZZZ", book_words[0]], [book_words[1], book_words[2]], [book_words[1], book_words[3]],
+              ["ZZZZZ", book_words[4]], ["ZZZZZ", book_words[5]], [book_words[2], book_words[3]]]
+    monkeypatch.setattr(wordle, "OPENERS", "")
+    monkeypatch.setattr(wordle, "BOOK_OPENERS", 2)
+    # only the openers in the vocabulary, most used first
+    assert wordle.book_openers(rounds, book_words) == [book_words[1], book_words[2]]
+    monkeypatch.setattr(wordle, "OPENERS", "slate, crane")
+    assert wordle.book_openers(rounds, book_words) == ["SLATE", "CRANE"]
@@ -0,0 +1,72 @@
+"""Word list output: cutting long lists short with a count, and paging on a terminal."""
+import sys
+
+import pytest
+
+import main as wordle
+
+
+def shown_words(lines) -> list:
+    """Return the words laid out in some lines (not counting the '... and N more' footer)."""
+    return [word for line in lines if "... and" not in line for word in line.replace(",", " ").split()]
+
+
+@pytest.fixture
+def word_list(vocabulary_words):
+    return vocabulary_words[:25]
+
+
+def test_long_list_is_cut_short(word_list, monkeypatch):
+    monkeypatch.setattr(wordle, "WORDS_SHOWN", 10)
+    lines = list(wordle.word_lines(word_list))
+    assert shown_words(lines) == word_list[:10]
+    assert lines[-1] == f"{wordle.WORD_LIST_INDENT}... and 15 more"
+    # the last word shown has no comma after it
+    assert not lines[-2].endswith(wordle.COMMA)
+    # only the words shown are taken from an iterator
+    remaining = iter(word_list)
+    lines = list(wordle.word_lines(remaining, count=len(word_list)))
+    assert shown_words(lines) == word_list[:10] and lines[-1].endswith("... and 15 more")
+    assert next(remaining) == word_list[10]
+
+
+@pytest.mark.parametrize("words_shown", [0, 25, 100])
+def test_short_list_is_shown_whole(word_list, monkeypatch, words_shown):
+    monkeypatch.setattr(wordle, "WORDS_SHOWN", words_shown)
+    lines = list(wordle.word_lines(word_list))
+    assert shown_words(lines) == word_list
+    assert "... and" not in lines[-1]
+
+
+def test_upper_limit_cuts_quietly(word_list, monkeypatch):
+    monkeypatch.setattr(wordle, "WORDS_SHOWN", 10)
+    lines = list(wordle.word_lines(word_list, commas=False, upper_limit=20, lowercase=True))
+    assert shown_words(lines) == [word.lower() for word in word_list[:20]]
+    assert "... and" not in lines[-1]
+    # only the last word of the whole list keeps its capitals
+    assert shown_words(wordle.word_lines(word_list, upper_limit=-1, lowercase=True))[-1] == word_list[9].lower()
+    monkeypatch.setattr(wordle, "WORDS_SHOWN", 0)
+    assert shown_words(wordle.word_lines(word_list, lowercase=True))[-1] == word_list[-1]
+
+
+def test_lines_are_written_at_once_when_not_a_terminal(capsys, monkeypatch):
+    monkeypatch.setattr(wordle, "PAGE_LINES", 3)
+    wordle.write_lines(str(i) for i in range(10))
+    assert capsys.readouterr().out.split() == [str(i) for i in range(10)]
+
+
+@pytest.mark.parametrize("answers, lines_shown, prompts", [([""] * 3, 10, 3), (["", "q"], 6, 2), (["Q"], 3, 1)])
+def test_pages_on_a_terminal(capsys, monkeypatch, answers, lines_shown, prompts):
+    monkeypatch.setattr(wordle, "PAGE_LINES", 3)
+    monkeypatch.setattr(sys.stdout, "isatty", lambda: True)
+    replies = iter(answers)
+    asked = []
+
+    def reply(prompt):
+        asked.append(prompt)
+        return next(replies)
+
+    monkeypatch.setattr("builtins.input", reply)
+    wordle.write_lines(str(i) for i in range(10))
+    assert capsys.readouterr().out.split() == [str(i) for i in range(lines_shown)]
+    assert len(asked) == prompts
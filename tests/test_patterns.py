@@ -0,0 +1,96 @@
+"""Feedback codes: the result WORDLE shows for a guess, as a base 3 number, and the pattern matrix that stores them."""
+import itertools
+import random
+
+import pytest
+
+import main as wordle
+
+SYMBOLS = {"B": wordle.WRONG_WRONG, "Y": wordle.RIGHT_WRONG, "G": wordle.RIGHT_RIGHT}
+
+
+def reference_result(guess, answer) -> str:
+    """Score a guess the way the game does: greens first, then yellows from the letters the greens left over."""
+    result = ["B"] * len(guess)
+    left = [a for g, a in zip(guess, answer) if g != a]
+    for i, (g, a) in enumerate(zip(guess, answer)):
+        if g == a:
+            result[i] = "G"
+        elif g in left:
+            result[i] = "Y"
+            left.remove(g)
+    return "".join(SYMBOLS[c] for c in result)
+
+
+def result_of(colors) -> str:
+    return "".join(SYMBOLS[c] for c in colors)
+
+
+@pytest.mark.parametrize("guess, answer, colors", [
+    ("CRANE", "CRANE", "GGGGG"),
+    ("SPEED", "ABIDE", "BBYBY"),  # only one E in the answer, so only the first E gets it
+    ("EERIE", "THERE", "YBYBG"),  # the green E uses up one of the two E's
+    ("LLAMA", "ALLOT", "YGYBB"),
+    ("GEESE", "EERIE", "BGYBG"),
+    ("ABBEY", "KEBAB", "YYGYB"),
+])
+def test_feedback_code_doubles(guess, answer, colors):
+    code = wordle.feedback_code(guess, answer)
+    assert wordle.code_to_result(code, len(guess)) == result_of(colors)
+    assert reference_result(guess, answer) == result_of(colors)
+
+
+def test_feedback_code_matches_reference(words):
+    rng = random.Random(6)
+    # words with repeated letters are where scoring goes wrong, so half the pairs use them
+    doubles = [word for word in words if len(set(word)) < len(word)]
+    for _ in range(20000):
+        guess = rng.choice(doubles if rng.random() < 0.5 else words)
+        answer = rng.choice(doubles if rng.random() < 0.5 else words)
+        code = wordle.feedback_code(guess, answer)
+        assert wordle.code_to_result(code, 5) == reference_result(guess, answer), (guess, answer)
+
+
+@pytest.mark.parametrize("word_len", [3, 5, 6])
+def test_codes_round_trip(word_len):
+    results = set()
+    for code in range(3 ** word_len):
+        result = wordle.code_to_result(code, word_len)
+        assert len(result) == word_len
+        assert wordle.result_to_code(result) == code
+        results.add(result)
+    # every result string has its own code
+    assert results == {"".join(r) for r in itertools.product(SYMBOLS.values(), repeat=word_len)}
+
+
+def test_normalize_result_aliases():
+    assert wordle.normalize_result("gybb_") == result_of("GYBBB")
+    assert wordle.normalize_result("G") == result_of("GBBBB")
+    assert wordle.normalize_result(wordle.RIGHT_WORD) == result_of("GGGGG")
+    with pytest.raises(ValueError):
+        wordle.normalize_result("GGXGG")
+
+
+def test_pattern_row_matches_feedback_code(words):
+    for guess in ("SLATE", "EERIE", "QAJAQ", words[0], words[-1]):
+        assert list(wordle.pattern_row(guess, words)) == [wordle.feedback_code(guess, word) for word in words]
+
+
+@pytest.mark.parametrize("word_len", [5, 6])
+def test_pattern_matrix_round_trip(tmp_path, word_len):
+    # made-up words from a few letters, so most of them repeat a letter (6-letter codes take two bytes each)
+    rng = random.Random(word_len)
+    probes = sorted({"".join(rng.choice("ABCDEF") for _ in range(word_len)) for _ in range(300)})
+    answers = probes[::3]
+    filename = str(tmp_path / "words.patterns")
+    wordle.build_pattern_matrix(probes, answers, filename, processes=1)
+    matrix = wordle.PatternMatrix(filename, probes, answers)
+    try:
+        assert matrix.word_len == word_len
+        for i, probe in enumerate(probes):
+            assert list(matrix.row(i)) == [wordle.feedback_code(probe, answer) for answer in answers]
+    finally:
+        matrix.close()
+    # a matrix for other word lists is not used
+    with pytest.raises(ValueError):
+        wordle.PatternMatrix(filename, probes, answers[1:])
@@ -0,0 +1,78 @@
+"""The suggestion service's LRU cache and the constraint keys it caches suggestions under."""
+import random
+
+import main as wordle
+
+
+def test_lru_eviction_order():
+    cache = wordle.LRUCache(3)
+    for key in "abc":
+        cache.put(key, key.upper())
+    # reading a makes b the least recently used
+    assert cache.get("a") == "A"
+    cache.put("d", "D")
+    assert list(cache.entries) == ["c", "a", "d"]
+    assert cache.get("b") is None
+    # replacing an entry makes it the most recently used, without evicting anything
+    cache.put("c", "C2")
+    assert list(cache.entries) == ["a", "d", "c"]
+    cache.put("e", "E")
+    cache.put("f", "F")
+    assert list(cache.entries) == ["c", "e", "f"]
+    assert cache.get("c") == "C2"
+    assert cache.get("a", "missing") == "missing"
+
+
+def test_lru_counts():
+    cache = wordle.LRUCache(2)
+    assert cache.stats() == {"size": 0, "capacity": 2, "hits": 0, "misses": 0, "evictions": 0, "hit_rate": 0.0}
+    cache.put(1, "one")
+    cache.put(2, "two")
+    cache.get(1)
+    cache.get(1)
+    cache.get(3)
+    cache.put(3, "three")
+    cache.put(4, "four")
+    cache.get(1)
+    assert cache.stats() == {"size": 2, "capacity": 2, "hits": 2, "misses": 2, "evictions": 2, "hit_rate": 0.5}
+
+
+def test_constraint_key_ignores_order_and_repeats(words, index, result_of):
+    rng = random.Random(7)
+    for _ in range(50):
+        answer = rng.choice(words)
+        guesses = rng.sample(words, 3)
+        results = [result_of(guess, answer) for guess in guesses]
+        key = wordle.constraint_key(guesses, results, 5)
+        order = [2, 0, 1]
+        assert wordle.constraint_key([guesses[i] for i in order], [results[i] for i in order], 5) == key
+        assert wordle.constraint_key(guesses + guesses[:1], results + results[:1], 5) == key
+        # the same key means the same possible words
+        solver = wordle.Solver(index)
+        for i in order:
+            solver.apply(guesses[i], results[i])
+        replay = wordle.Solver(index)
+        for guess, result in zip(guesses, results):
+            replay.apply(guess, result)
+        assert solver.candidates() == replay.candidates()
+
+
+def test_constraint_key_tells_constraints_apart(words, index, result_of):
+    """Games that leave different possible words never share a key."""
+    rng = random.Random(8)
+    differing = 0
+    for _ in range(100):
+        guesses = rng.sample(words, 2)
+        games = []
+        for answer in rng.sample(words, 2):
+            results = [result_of(guess, answer) for guess in guesses]
+            solver = wordle.Solver(index)
+            for guess, result in zip(guesses, results):
+                solver.apply(guess, result)
+            games.append((wordle.constraint_key(guesses, results, 5), solver.candidates()))
+        (first_key, first_words), (second_key, second_words) = games
+        if first_words != second_words:
+            differing += 1
+            assert first_key != second_key
+    assert differing > 0
+    assert wordle.constraint_key([], [], 5) != wordle.constraint_key([], [], 6)
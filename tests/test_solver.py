@@ -0,0 +1,130 @@
+"""Solver filtering with the WordIndex bitsets against a brute-force pass over the words."""
+import random
+
+import main as wordle
+
+GAMES = 100
+
+
+def fits(word, can, at_least, definite) -> bool:
+    """Does a word fit the can/at_least/definite patterns? (the word by word check the bitsets replace)"""
+    return (all(d == "" or c == d for c, d in zip(word, definite)) and
+            all(c in letters for c, letters in zip(word, can)) and
+            all(word.count(letter) >= count for letter, count in at_least.items()))
+
+
+def brute_force_turns(words, guesses, results):
+    """Filter the words through every guess in turn, one word at a time, yielding the words left after each one."""
+    can = [wordle.ALPHABET] * 5
+    at_least = {}
+    definite = [""] * 5
+    for guess, result in zip(guesses, results):
+        wordle.update_constraints(guess, result, can, at_least, definite)
+        words = [word for word in words if fits(word, can, at_least, definite)]
+        yield words
+
+
+def brute_force(words, guesses, results) -> list:
+    """Return the words left after every guess (see brute_force_turns)."""
+    left = words
+    for left in brute_force_turns(words, guesses, results):
+        pass
+    return left
+
+
+def random_games(words, count, result_of, seed=0):
+    """Yield (answer, guesses, results) for random games: random guesses, with the answer's repeated letters showing up
+    more often than chance would have them, until the answer is found or six guesses are made."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        answer = rng.choice(words)
+        guesses = []
+        while len(guesses) < 6 and (len(guesses) == 0 or guesses[-1] != answer):
+            guesses.append(rng.choice(words) if rng.random() < 0.9 else answer)
+        yield answer, guesses, [result_of(guess, answer) for guess in guesses]
+
+
+def test_apply_matches_brute_force(words, index, result_of):
+    for answer, guesses, results in random_games(words, GAMES, result_of):
+        solver = wordle.Solver(index)
+        turns = brute_force_turns(words, guesses, results)
+        for turn, (guess, result, expected) in enumerate(zip(guesses, results, turns), 1):
+            remaining = solver.apply(guess, result)
+            assert solver.candidates() == expected, (answer, guesses[:turn])
+            assert remaining == len(expected)
+            assert answer in expected
+        # every word that would have shown the same results is still possible
+        rows = [wordle.pattern_row(guess, words) for guess in guesses]
+        codes = [wordle.result_to_code(result) for result in results]
+        same = [word for i, word in enumerate(words) if all(row[i] == code for row, code in zip(rows, codes))]
+        assert set(same) <= set(solver.candidates())
+        assert solver.solved() == (guesses[-1] == answer)
+
+
+def test_rewind_and_edit_match_replaying(words, index, result_of):
+    for answer, guesses, results in random_games(words, GAMES // 4, result_of, seed=1):
+        solver = wordle.Solver(index)
+        for guess, result in zip(guesses, results):
+            solver.apply(guess, result)
+        expected = [words] + list(brute_force_turns(words, guesses, results))
+        for turn in range(len(guesses), -1, -1):
+            branch = solver.copy()
+            assert branch.rewind(turn) == len(expected[turn])
+            assert branch.candidates() == expected[turn]
+        # changing the first result applies every guess after it again
+        edited = [wordle.WRONG_WRONG * 5] + results[1:]
+        solver.edit(0, edited[0])
+        assert solver.candidates() == brute_force(words, guesses, edited)
+        assert solver.results == edited
+
+
+def test_split_separates_used_words(words, index, result_of):
+    used = set(words[::7])
+    solver = wordle.Solver(index, used=used)
+    solver.apply("SLATE", result_of("SLATE", words[100]))
+    new_words, old_words = solver.split()
+    candidates = solver.candidates()
+    assert new_words == [word for word in candidates if word not in used]
+    assert old_words == [word for word in candidates if word in used]
+
+
+def test_list_helpers_match_the_solver(words, index, result_of):
+    """reduce_words and split_possibles, with or without an index, give what the Solver gives."""
+    used = set(words[::7])
+    for answer, guesses, results in random_games(words, GAMES // 4, result_of, seed=2):
+        solver = wordle.Solver(index, used=used)
+        possible, indexed = words, words
+        can, at_least, definite = [wordle.ALPHABET] * 5, {}, [""] * 5
+        indexed_can, indexed_at_least, indexed_definite = [wordle.ALPHABET] * 5, {}, [""] * 5
+        for guess, result in zip(guesses, results):
+            solver.apply(guess, result)
+            possible = wordle.reduce_words(possible, guess, result, can, at_least, definite)
+            indexed = wordle.reduce_words(indexed, guess, result, indexed_can, indexed_at_least, indexed_definite,
+                                          index)
+            assert possible == indexed == solver.candidates(), (answer, guesses)
+        assert wordle.split_possibles(possible, used) == wordle.split_possibles(possible, list(used)) == \
+            tuple(solver.split())
+
+
+def test_tree_is_left_when_a_branch_cannot_finish(index, result_of):
+    """The solver follows a strategy tree while its branch can finish within WORDLE_TRIES, then drops it."""
+    answer = index.words[0]
+    guess, probe = index.words[1], index.words[2]
+    code = wordle.feedback_code(guess, answer)
+    # a branch that needs one guess after the opener, and one that needs WORDLE_TRIES more
+    chain = (answer, {})
+    for _ in range(wordle.WORDLE_TRIES - 1):
+        chain = (probe, {0: chain})
+    short = wordle.DecisionTree(b"", (guess, {code: (answer, {})}))
+    long = wordle.DecisionTree(b"", (guess, {code: chain}))
+    solver = wordle.Solver(index, tree=short)
+    assert solver.tree_guess() == guess
+    solver.apply(guess, result_of(guess, answer))
+    assert solver.tree_guess() == answer
+    solver = wordle.Solver(index, tree=long)
+    solver.apply(guess, result_of(guess, answer))
+    assert solver.tree_guess() == ""
+    # a guess off the tree leaves it too
+    solver = wordle.Solver(index, tree=short)
+    solver.apply(probe, result_of(probe, answer))
+    assert solver.tree_guess() == ""
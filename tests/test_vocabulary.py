@@ -0,0 +1,95 @@
+"""The vocabulary cache: reading it back, rebuilding it when a word source changes or it is damaged, and the answer
+flags."""
+import gzip
+import os
+
+import main as wordle
+
+VOCABULARY = """slate crane Crane moist
+plumb adieu
+ghosts flunks
+slate zebra
+"""
+MORE_WORDS = ["quart", "quarts", "ox"]
+ANSWERS = "zebra plumb aback\n"
+
+
+def write_sources(tmp_path) -> tuple:
+    """Write a plain and a compressed vocabulary source and an answer source, returning their names as the setup
+    lists them."""
+    plain = tmp_path / "words.txt"
+    plain.write_text(VOCABULARY)
+    with gzip.open(tmp_path / "more.txt.gz", "wt") as f:
+        f.write(" ".join(MORE_WORDS))
+    (tmp_path / "answers.txt").write_text(ANSWERS)
+    return f"{plain}, {tmp_path / 'more.txt.gz'}", str(tmp_path / "answers.txt")
+
+
+def contents(vocabulary) -> dict:
+    return {length: (vocabulary.words(length), vocabulary.flags(length), vocabulary.answers(length))
+            for length in vocabulary.lengths()}
+
+
+def test_cache_round_trip(tmp_path):
+    sources, answers = write_sources(tmp_path)
+    built = wordle.Vocabulary(sources, answers)
+    assert built.mm is None and os.path.exists(built.cache_filename)
+    assert built.lengths() == [2, 5, 6]
+    # the words of each length in the order they first come in, without duplicates
+    assert built.words(5) == ["SLATE", "CRANE", "MOIST", "PLUMB", "ADIEU", "ZEBRA", "QUART", "ABACK"]
+    assert built.words(6) == ["GHOSTS", "FLUNKS", "QUARTS"]
+    cached = wordle.Vocabulary(sources, answers)
+    assert cached.mm is not None
+    assert contents(cached) == contents(built)
+
+
+def test_answer_flags(tmp_path):
+    sources, answers = write_sources(tmp_path)
+    vocabulary = wordle.Vocabulary(sources, answers)
+    flags = dict(zip(vocabulary.words(5), vocabulary.flags(5)))
+    assert {word for word, flag in flags.items() if flag & wordle.WORD_ANSWER} == {"ZEBRA", "PLUMB", "ABACK"}
+    # answers in vocabulary order, the answer sources' words that aren't in the vocabulary are added to it
+    assert vocabulary.answers(5) == ["PLUMB", "ZEBRA", "ABACK"]
+    # the answer sources have no 6-letter words, so any of them can be the answer
+    assert vocabulary.answers(6) is vocabulary.words(6)
+    # without answer sources every word can be the answer
+    everything = wordle.Vocabulary(sources, "")
+    assert everything.mm is None
+    assert everything.answers(5) is everything.words(5)
+    assert set(everything.flags(5)) == {wordle.WORD_ANSWER}
+    assert wordle.Vocabulary(sources, "").mm is not None
+
+
+def test_changed_source_rebuilds_cache(tmp_path):
+    sources, answers = write_sources(tmp_path)
+    wordle.Vocabulary(sources, answers)
+    # touched but the same words: the cache is still good
+    plain = tmp_path / "words.txt"
+    os.utime(plain, ns=(0, 0))
+    assert wordle.Vocabulary(sources, answers).mm is not None
+    plain.write_text(VOCABULARY + "tiger\n")
+    rebuilt = wordle.Vocabulary(sources, answers)
+    assert rebuilt.mm is None and "TIGER" in rebuilt.words(5)
+    assert "TIGER" in wordle.Vocabulary(sources, answers).words(5)
+    # other answer sources
+    (tmp_path / "answers.txt").write_text("tiger\n")
+    rebuilt = wordle.Vocabulary(sources, answers)
+    assert rebuilt.mm is None and rebuilt.answers(5) == ["TIGER"]
+
+
+def test_damaged_cache_is_rebuilt(tmp_path):
+    sources, answers = write_sources(tmp_path)
+    expected = contents(wordle.Vocabulary(sources, answers))
+    cache_filename = wordle.cache_filename_for(sources)
+    with open(cache_filename, "rb") as f:
+        data = f.read()
+    damaged = [b"", data[:10], data[:wordle.CACHE_HEADER.size + 5], b"XXXX" + data[4:],
+               data[:4] + (wordle.CACHE_VERSION + 1).to_bytes(2, "little") + data[6:]]
+    for cache in damaged:
+        with open(cache_filename, "wb") as f:
+            f.write(cache)
+        rebuilt = wordle.Vocabulary(sources, answers)
+        assert rebuilt.mm is None
+        assert contents(rebuilt) == expected
+        with open(cache_filename, "rb") as f:
+            assert f.read() == data
@@ -0,0 +1,95 @@
+"""Pattern queries over the vocabulary's word graph against a brute-force pass over the words."""
+import random
+
+import pytest
+
+import main as wordle
+
+QUERIES = 150
+
+
+def matches(word, length=0, positions=(), include=None, exclude="") -> bool:
+    """Does a word fit a WordGraph.search pattern? (checked letter by letter)"""
+    length = length or len(positions)
+    if length > 0 and len(word) != length:
+        return False
+    if any(letters != "" and word[j] not in letters for j, letters in enumerate(positions)):
+        return False
+    if any(letter in exclude for letter in word):
+        return False
+    return all(word.count(letter) >= count for letter, count in (include or {}).items())
+
+
+def random_query(rng) -> dict:
+    """A random search pattern: mostly open positions, some fixed letters or letter sets, and letter counts."""
+    length = rng.choice([0, 0, 3, 4, 5, 5, 5, 6, 7, 8])
+    positions = []
+    if length > 0 and rng.random() < 0.8:
+        for _ in range(length):
+            roll = rng.random()
+            if roll < 0.6:
+                positions.append("")
+            elif roll < 0.85:
+                positions.append(rng.choice(wordle.ALPHABET))
+            else:
+                positions.append("".join(rng.sample(wordle.ALPHABET, rng.randint(2, 8))))
+        if rng.random() < 0.5:
+            # the length comes from the pattern
+            length = 0
+    include = {letter: rng.choice([1, 1, 2]) for letter in rng.sample("AEIORSTLNCDU", rng.randint(0, 2))}
+    exclude = "".join(rng.sample("BFGHJKMPQVWXYZ", rng.randint(0, 4)))
+    return {"length": length, "positions": positions, "include": include, "exclude": exclude}
+
+
+@pytest.fixture(scope="module")
+def graph_words(all_vocabulary_words):
+    return sorted(random.Random(15).sample(all_vocabulary_words, 10000))
+
+
+@pytest.fixture(scope="module")
+def graph(graph_words):
+    return wordle.WordGraph.build(graph_words)
+
+
+def test_graph_holds_exactly_the_words(graph, graph_words, all_vocabulary_words):
+    assert graph.word_count == len(graph_words)
+    assert list(graph.search()) == graph_words
+    assert all(word in graph for word in graph_words[::50])
+    chosen = set(graph_words)
+    left_out = [word for word in all_vocabulary_words[::50] if word not in chosen]
+    assert not any(word in graph for word in left_out)
+    # prefixes of words are only in the graph if they are words themselves
+    assert all((word[:-1] in graph) == (word[:-1] in chosen) for word in graph_words[::50])
+
+
+def test_search_matches_brute_force(graph, graph_words):
+    rng = random.Random(1)
+    for _ in range(QUERIES):
+        query = random_query(rng)
+        expected = [word for word in graph_words if matches(word, **query)]
+        assert list(graph.search(**query)) == expected, query
+
+
+def test_query_strings(graph, graph_words):
+    for query in ("S?A?E", "[^AEIOU]???? +E", "???? -AEIOU", "6 +ZZ", "?R??? +E -S", "[BCD]A?E"):
+        arguments = wordle.parse_query(query)
+        assert list(graph.search(**arguments)) == [word for word in graph_words if matches(word, **arguments)]
+    assert wordle.parse_query("S?A?E +RR -T 5") == {"length": 5, "positions": ["S", "", "A", "", "E"],
+                                                    "include": {"R": 2}, "exclude": "T"}
+    for query in ("S?A?E 4", "S?A?E ?R", "[12]????", "S!A"):
+        with pytest.raises(ValueError):
+            wordle.parse_query(query)
+
+
+def test_save_and_load(tmp_path, graph, graph_words):
+    source = tmp_path / "words.txt"
+    source.write_text("\n".join(graph_words) + "\n")
+    filename = str(tmp_path / "words.dawg")
+    graph.save(filename, str(source))
+    loaded = wordle.WordGraph.load(filename, str(source))
+    assert loaded is not None and loaded.word_count == graph.word_count
+    query = {"length": 5, "positions": ["", "", "A"], "include": {"E": 1}}
+    assert list(loaded.search(**query)) == list(graph.search(**query))
+    # a changed vocabulary file means the graph has to be built again
+    source.write_text("\n".join(graph_words[1:]) + "\n")
+    assert wordle.WordGraph.load(filename, str(source)) is None